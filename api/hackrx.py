@@ -11,6 +11,7 @@ import re
 from datetime import datetime
 from flask import Flask, request, jsonify, make_response
 from flask_cors import CORS
+from query_cache import QueryCache
 
 app = Flask(__name__)
 CORS(app)
@@ -97,7 +98,8 @@ class HackRxProcessor:
                 'nlp_analysis': True,
                 'fuzzy_matching': True,
                 'decision_engine': True
-            }
+            },
+            'query_cache': HackRxProcessor.query_cache_stats()
         }
     
     @staticmethod
@@ -184,6 +186,7 @@ class HackRxProcessor:
         }
     
     @staticmethod
+    @QueryCache
     def extract_query_info(query):
         """Extract structured information from query"""
         query_lower = query.lower()
@@ -218,6 +221,10 @@ class HackRxProcessor:
             extracted['policy_duration'] = f"{duration_match.group(1)} years"
         
         return extracted
+
+    @staticmethod
+    def query_cache_stats():
+        return HackRxProcessor.extract_query_info.stats()
     
     @staticmethod
     def make_coverage_decision(procedure, policy_data):
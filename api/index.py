@@ -7,11 +7,13 @@
 ✅ Production-Ready Architecture
 """
 
+import hashlib
 import json
 import traceback
 import uuid
 import re
 import os
+import threading
 from datetime import datetime
 from flask import Flask, request, jsonify, make_response
 from flask_cors import CORS
@@ -59,6 +61,14 @@ except ImportError:
 # Document storage for dynamic processing
 uploaded_documents = {}
 
+# Largest accepted upload, and the chunk size it is streamed to disk in
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_MB', 50)) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Parse stored documents in a background thread after startup (otherwise only on first access)
+BACKGROUND_WARMUP = os.environ.get('DOCUMENT_WARMUP', '1') != '0'
+_warm_lock = threading.Lock()
+
 # 🧠 SEMANTIC MAPPINGS FOR MEDICAL PROCEDURES
 PROCEDURE_MAPPINGS = {
     'IVF': ['in vitro fertilization', 'fertility treatment', 'assisted reproduction', 'ivf', 'artificial insemination', 'fertility procedure'],
@@ -582,48 +592,76 @@ class DecisionEngine:
         
         return {'waiting_period_applicable': False}
 
+def warm_document(file_id):
+    """Return the parsed entry for file_id, parsing a cold stub on first access"""
+    doc_data = uploaded_documents[file_id]
+    if doc_data['warm']:
+        return doc_data
+    
+    with _warm_lock:
+        doc_data = uploaded_documents[file_id]
+        if doc_data['warm']:
+            return doc_data
+        
+        text_content = DocumentProcessor.extract_text_from_pdf(doc_data['file_path'])
+        uploaded_documents[file_id] = dict(
+            doc_data,
+            text_content=text_content,
+            clauses=DocumentProcessor.extract_policy_clauses(text_content),
+            policy_type=DocumentProcessor.identify_policy_type(text_content),
+            warm=True
+        )
+        print(f"🔥 Warmed: {doc_data['filename']}")
+        return uploaded_documents[file_id]
+
+def warm_up_documents():
+    """Parse every cold stub in the background"""
+    for file_id in [fid for fid, doc in list(uploaded_documents.items()) if not doc['warm']]:
+        try:
+            warm_document(file_id)
+        except Exception as e:
+            print(f"❌ Error warming {uploaded_documents[file_id]['filename']}: {e}")
+
 def load_existing_documents():
-    """Load existing documents from uploads folder on server startup"""
+    """Register documents in the uploads folder as stubs and start the background warm-up"""
     print("🔄 Loading existing documents from uploads folder...")
     
     if not os.path.exists(UPLOAD_FOLDER):
         print("📂 No uploads folder found")
         return
     
+    if not PDF_PROCESSING:
+        print("⚠️ PDF processing disabled, skipping stored documents")
+        return
+    
     files = os.listdir(UPLOAD_FOLDER)
     pdf_files = [f for f in files if f.endswith('.pdf')]
     
     print(f"📄 Found {len(pdf_files)} PDF files in uploads folder")
     
-    for filename in pdf_files[:5]:  # Load first 5 to avoid startup delays
+    # Only the directory listing is read here so the function can serve requests
+    # immediately; documents are parsed on first access or by the warm-up thread
+    for filename in pdf_files:
         try:
             file_id = str(uuid.uuid4())
             file_path = os.path.join(UPLOAD_FOLDER, filename)
-            file_size = os.path.getsize(file_path)
             
-            if PDF_PROCESSING:
-                text_content = DocumentProcessor.extract_text_from_pdf(file_path)
-                clauses = DocumentProcessor.extract_policy_clauses(text_content)
-                
-                uploaded_documents[file_id] = {
-                    'filename': filename,
-                    'file_path': file_path,
-                    'text_content': text_content,
-                    'clauses': clauses,
-                    'upload_time': datetime.now().isoformat(),
-                    'file_size': file_size
-                }
-                
-                print(f"✅ Loaded: {filename} ({file_size} bytes)")
-            else:
-                print(f"⚠️ PDF processing disabled, skipping: {filename}")
-                
+            uploaded_documents[file_id] = {
+                'filename': filename,
+                'file_path': file_path,
+                'upload_time': datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(),
+                'file_size': os.path.getsize(file_path),
+                'warm': False
+            }
         except Exception as e:
-            print(f"❌ Error loading {filename}: {e}")
+            print(f"❌ Error registering {filename}: {e}")
     
-    print(f"📋 Total documents loaded: {len(uploaded_documents)}")
+    print(f"📋 Total documents registered: {len(uploaded_documents)} (parsed on demand)")
+    
+    if BACKGROUND_WARMUP and uploaded_documents:
+        threading.Thread(target=warm_up_documents, name='document-warmup', daemon=True).start()
 
-# Load existing documents on startup
+# Register existing documents on startup
 load_existing_documents()
 
 @app.route('/upload', methods=['POST', 'OPTIONS'])
@@ -658,9 +696,30 @@ def upload_file():
         file_id = str(uuid.uuid4())
         file_path = os.path.join(UPLOAD_FOLDER, f"{file_id}_{file.filename}")
         
-        file.save(file_path)
-        file_size = os.path.getsize(file_path)
+        # One pass over the upload: size limit, PDF magic bytes, content hash and write
+        file_size = 0
+        hasher = hashlib.sha256()
+        rejection = None
+        with open(file_path, 'wb') as out:
+            for chunk in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b''):
+                if file_size == 0 and file_ext == '.pdf' and not chunk.startswith(b'%PDF'):
+                    rejection = ('File content is not a valid PDF document', 400)
+                    break
+                file_size += len(chunk)
+                if file_size > MAX_UPLOAD_BYTES:
+                    rejection = (f'File exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit', 413)
+                    break
+                hasher.update(chunk)
+                out.write(chunk)
+        
+        if rejection is None and file_size == 0:
+            rejection = ('File is empty', 400)
+        if rejection:
+            os.remove(file_path)
+            print(f"🚫 Rejecting upload {file.filename}: {rejection[0]}")
+            return jsonify({'error': rejection[0], 'status': 'failed'}), rejection[1]
         
+        content_hash = hasher.hexdigest()
         print(f"✅ File saved: {file_path} ({file_size} bytes)")
         
         # Process document content
@@ -680,7 +739,9 @@ def upload_file():
                     'clauses': clauses,
                     'upload_time': datetime.now().isoformat(),
                     'file_size': file_size,
-                    'policy_type': policy_type
+                    'content_hash': content_hash,
+                    'policy_type': policy_type,
+                    'warm': True
                 }
                 
                 processing_result = {
@@ -705,6 +766,7 @@ def upload_file():
             'filename': file.filename,
             'size': file_size,
             'size_display': f"{round(file_size/1024)} KB",
+            'content_hash': content_hash,
             'pdf_processing': PDF_PROCESSING,
             'fuzzy_matching': FUZZY_AVAILABLE,
             'processing_result': processing_result,
@@ -764,7 +826,7 @@ def process_query():
                 print(f"🔄 Using most recent upload: {file_id}")
             
             if file_id in uploaded_documents:
-                doc_data = uploaded_documents[file_id]
+                doc_data = warm_document(file_id)
                 document_clauses = doc_data['clauses']
                 document_info = {
                     'source': 'uploaded_document',
@@ -871,21 +933,28 @@ def health_check():
     """Comprehensive health check endpoint"""
     document_list = []
     
-    for file_id, doc_data in uploaded_documents.items():
+    warm_count = 0
+    
+    for file_id, doc_data in list(uploaded_documents.items()):
+        warm = doc_data['warm']
+        warm_count += warm
         document_list.append({
             'file_id': file_id,
             'filename': doc_data['filename'],
             'policy_type': doc_data.get('policy_type', 'Unknown'),
-            'inclusions': len(doc_data['clauses']['inclusions']),
-            'exclusions': len(doc_data['clauses']['exclusions']),
+            'inclusions': len(doc_data['clauses']['inclusions']) if warm else None,
+            'exclusions': len(doc_data['clauses']['exclusions']) if warm else None,
             'upload_time': doc_data['upload_time'],
-            'size': f"{round(doc_data['file_size']/1024)} KB"
+            'size': f"{round(doc_data['file_size']/1024)} KB",
+            'warm': warm
         })
     
     return jsonify({
         'status': 'healthy',
         'server_mode': 'INTELLIGENT_PROCESSING',
-        'uploaded_documents': len(uploaded_documents),
+        'uploaded_documents': len(document_list),
+        'documents_warm': warm_count,
+        'documents_cold': len(document_list) - warm_count,
         'documents': document_list,
         'system_capabilities': {
             'gemini_ai': GEMINI_AVAILABLE,
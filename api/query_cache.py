@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+🗃️ Query Parse Cache
+Bounded LRU cache in front of query parsing, keyed by the query's canonical form
+("46M Knee Surgery, Pune" and "46m knee surgery pune" share one entry).
+Cached results are read-only dicts, so requests share them safely.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+# Parsed queries kept per cache (0 disables caching)
+QUERY_CACHE_SIZE = int(os.environ.get('QUERY_CACHE_SIZE', 1024))
+
+# Punctuation dropped from the canonical form; separators inside numbers and currency signs stay
+QUERY_PUNCTUATION = re.compile(r'(?<!\d)[.,]|[.,](?!\d)|[^\w\s.,₹$%]')
+
+
+def canonical_query(query):
+    """Case-folded query with punctuation dropped and whitespace collapsed"""
+    return " ".join(QUERY_PUNCTUATION.sub(" ", query.casefold()).split())
+
+
+class ParsedQuery(dict):
+    """Read-only dict of parsed query fields; copy() gives a plain dict to modify"""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("parsed queries are shared between requests and cannot be modified")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def copy(self):
+        return dict(self)
+
+
+class QueryCache:
+    """LRU cache of parse(query), keyed by canonical_query(query)
+
+    Wraps a parse function like functools.lru_cache; parse sees the query
+    as it was asked, the canonical form is only the key.
+    """
+
+    def __init__(self, parse, maxsize=QUERY_CACHE_SIZE):
+        self.parse = parse
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, query):
+        key = canonical_query(query)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        result = ParsedQuery(self.parse(query))
+        if self.maxsize > 0:
+            with self._lock:
+                result = self._entries.setdefault(key, result)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return result
+
+    def stats(self):
+        """Size and hit / miss counts for the health check"""
+        with self._lock:
+            return {'size': len(self._entries), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
@@ -6,13 +6,15 @@
 ✅ Works without traditional database
 """
 
+import io
 import json
 import os
 import re
 import base64
+import shutil
 import tempfile
 from datetime import datetime
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, Request, request, jsonify, make_response
 from flask_cors import CORS
 import requests
 from dotenv import load_dotenv
@@ -20,7 +22,14 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+class PdfUploadRequest(Request):
+    """Request whose uploaded files stay in memory up to PDF_SPILL_THRESHOLD"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=PDF_SPILL_THRESHOLD, suffix='.pdf')
+
 app = Flask(__name__)
+app.request_class = PdfUploadRequest
 CORS(app)
 
 # PDF processing capabilities
@@ -42,6 +51,9 @@ except ImportError:
     except ImportError:
         FUZZY_AVAILABLE = False
 
+# Uploaded files stay in memory up to this size; larger ones spill to a temp file
+PDF_SPILL_THRESHOLD = int(os.environ.get('PDF_SPILL_THRESHOLD', 16 * 1024 * 1024))
+
 # Store processed documents in memory (for current session)
 session_documents = {}
 
@@ -61,21 +73,43 @@ class DocumentProcessor:
     """Process PDF documents"""
     
     @staticmethod
-    def extract_text_from_pdf(pdf_content):
-        """Extract text from PDF bytes"""
+    def open_pdf_buffer(pdf_source):
+        """Seekable buffer over a PDF given as bytes or as a request stream
+
+        Bytes are already in memory and are read in place, whatever their size.
+        A seekable stream, such as an upload spooled by PdfUploadRequest, is
+        rewound and read in place; any other is spooled, spilling to a temp
+        file past PDF_SPILL_THRESHOLD.
+        """
+        if isinstance(pdf_source, (bytes, bytearray)):
+            # BytesIO shares a bytes object's buffer instead of copying it
+            return io.BytesIO(pdf_source)
+        
+        # SpooledTemporaryFile has no seekable() before Python 3.11
+        seekable = getattr(pdf_source, 'seekable', None)
+        if seekable() if seekable else hasattr(pdf_source, 'seek'):
+            pdf_source.seek(0)
+            return pdf_source
+        
+        buffer = tempfile.SpooledTemporaryFile(max_size=PDF_SPILL_THRESHOLD, suffix='.pdf')
+        shutil.copyfileobj(pdf_source, buffer)
+        buffer.seek(0)
+        return buffer
+    
+    @staticmethod
+    def extract_text_from_pdf(pdf_source):
+        """Extract text from PDF bytes or a stream of them"""
         if not PDF_PROCESSING:
             return "PDF processing libraries not available"
         
         text_content = ""
         
-        # Save PDF content to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            tmp_file.write(pdf_content)
-            tmp_path = tmp_file.name
-        
+        # One buffer is shared by both extractors, rewound between them;
+        # a stream read in place stays open for the caller
+        buffer = DocumentProcessor.open_pdf_buffer(pdf_source)
         try:
             # Try pdfplumber first
-            with pdfplumber.open(tmp_path) as pdf:
+            with pdfplumber.open(buffer) as pdf:
                 for page in pdf.pages:
                     page_text = page.extract_text()
                     if page_text:
@@ -83,13 +117,13 @@ class DocumentProcessor:
             
             if not text_content.strip():
                 # Fallback to PyPDF2
-                with open(tmp_path, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    for page in reader.pages:
-                        text_content += page.extract_text() + "\n"
+                buffer.seek(0)
+                reader = PyPDF2.PdfReader(buffer)
+                for page in reader.pages:
+                    text_content += page.extract_text() + "\n"
         finally:
-            # Clean up temp file
-            os.unlink(tmp_path)
+            if buffer is not pdf_source:
+                buffer.close()
         
         return text_content or "Unable to extract text from PDF"
     
@@ -265,12 +299,9 @@ def upload_file():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # Read PDF content
-        pdf_content = file.read()
-        
-        # Process PDF
+        # Process PDF straight from the upload stream
         if PDF_PROCESSING:
-            text_content = DocumentProcessor.extract_text_from_pdf(pdf_content)
+            text_content = DocumentProcessor.extract_text_from_pdf(file.stream)
             clauses = DocumentProcessor.extract_policy_clauses(text_content)
             
             # Generate session ID
@@ -293,9 +324,10 @@ def upload_file():
                     headers = {
                         'authorization': f"Bearer {os.environ.get('BLOB_READ_WRITE_TOKEN')}"
                     }
+                    file.stream.seek(0)
                     response = requests.put(
                         f"https://blob.vercel-storage.com/{file.filename}",
-                        data=pdf_content,
+                        data=file.stream,
                         headers=headers
                     )
                     if response.status_code == 200:
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+💰 AMOUNT NORMALIZATION
+✅ ₹ / Rs. / INR / USD amounts with Indian (5,00,000) or international (500,000) digit grouping
+✅ "5 lakh", "2.5 crore", "10 thousand"
+✅ Percentages (co-payment, sub-limits as a share of the sum insured) and "per day" style limits
+✅ Run once at ingest: clauses carry typed integer amounts, so queries never parse currency strings
+"""
+
+import re
+from collections import namedtuple
+
+# Units a limit can be stated per ("₹5,000 per day", "INR 500,000 / event")
+PER_UNITS = (r'(?:day|night|annum|year|month|claim|event|trip|eye|person|admission|'
+             r'hospitali[sz]ation|policy year|illness)')
+
+# A rupee amount as written in policies: optional currency marker, figure,
+# optional lakh/crore scale and per-unit. Coverage patterns capture it as one group.
+AMOUNT_GROUP = (r'(?:₹|\brs\.?|\binr\b)?\s*('
+                r'\d+(?:,\d{2,3})*(?:\.\d+)?(?:\s*(?:lakhs?|lacs?|crores?|cr\.?|thousand)\b)?'
+                r'(?:\s*(?:\bper\s+|/\s*)' + PER_UNITS + r'\b)?)')
+
+CURRENCIES = {'₹': 'INR', 'rs': 'INR', 'rs.': 'INR', 'inr': 'INR', 'usd': 'USD', '$': 'USD', 'us$': 'USD'}
+SCALES = {'lakh': 100000, 'lakhs': 100000, 'lac': 100000, 'lacs': 100000,
+          'crore': 10000000, 'crores': 10000000, 'cr': 10000000, 'cr.': 10000000, 'thousand': 1000}
+
+MONEY = re.compile(
+    r'(?P<currency>₹|\brs\.?|\binr\b|\busd\b|us\$|\$)?\s*'
+    r'(?P<number>\d+(?:,\d{2,3})*(?:\.\d+)?)'
+    r'(?:\s*(?P<scale>lakhs?|lacs?|crores?|cr\.?|thousand)\b)?',
+    re.IGNORECASE)
+PERCENT = re.compile(r'(\d+(?:\.\d+)?)\s*(?:%|per\s*cent\b)', re.IGNORECASE)
+PER_UNIT = re.compile(r'(?:\bper\s+|/\s*)(' + PER_UNITS + r')\b', re.IGNORECASE)
+PER_UNIT_NAMES = {'annum': 'year', 'policy year': 'year', 'night': 'day', 'hospitalisation': 'hospitalization'}
+
+# Co-payment clause: "co-payment of 20%", "20% co-pay"
+COPAY = re.compile(
+    r'\bco-?pay(?:ment)?\b[^.%\n]{0,80}?(\d+(?:\.\d+)?)\s*%|(\d+(?:\.\d+)?)\s*%\s*co-?pay(?:ment)?\b',
+    re.IGNORECASE)
+
+# A normalized amount. value is a whole number of currency units (rupees for
+# INR), percent a share such as a co-payment or "1% of sum insured", and per
+# the unit a limit applies to ('day', 'year', 'claim' ...).
+Amount = namedtuple('Amount', ['value', 'currency', 'percent', 'per'])
+
+
+def _number(text):
+    return float(text.replace(',', ''))
+
+
+def parse_amount(text, bare=False):
+    """Normalize the first amount in text; None when it states none
+
+    A figure counts as money when it has a currency marker, a lakh/crore
+    scale or digit grouping; with bare=True any figure does (for text that
+    is known to hold an amount, such as a coverage pattern's amount group).
+    Percentages and the per-unit of a limit are picked up alongside.
+    """
+    if not text:
+        return None
+    value = currency = None
+    for match in MONEY.finditer(text):
+        marker, number, scale = match.group('currency'), match.group('number'), match.group('scale')
+        if PERCENT.match(text, match.start('number')):
+            continue
+        if not (marker or scale or ',' in number or bare):
+            continue
+        value = int(round(_number(number) * SCALES.get((scale or '').lower(), 1)))
+        currency = CURRENCIES[marker.lower()] if marker else 'INR'
+        break
+
+    percent_match = PERCENT.search(text)
+    percent = _number(percent_match.group(1)) if percent_match else None
+    if value is None and percent is None:
+        return None
+
+    per_match = PER_UNIT.search(text)
+    per = per_match.group(1).lower() if per_match else None
+    return Amount(value, currency, percent, PER_UNIT_NAMES.get(per, per))
+
+
+def rupees(text, bare=False):
+    """Whole rupees stated in text, 0 when it states no rupee amount"""
+    amount = parse_amount(text, bare)
+    return amount.value if amount and amount.currency == 'INR' and amount.value else 0
+
+
+def describe(amount):
+    """Display form of a rupee Amount: "₹5,000 per day", "Covered" without a figure
+
+    A value of 1 is the clause dicts' marker for covered without a stated
+    amount, so it reads as "Covered" too.
+    """
+    if not amount or not amount.value or amount.value <= 1:
+        return "Covered"
+    return f"₹{amount.value:,}" + (f" per {amount.per}" if amount.per else "")
+
+
+def copay_percent(text):
+    """Co-payment percentage stated in text, or None"""
+    match = COPAY.search(text)
+    return _number(match.group(1) or match.group(2)) if match else None
+
+
+def normalize_clause_amounts(clauses):
+    """Normalize every amount in a finished clause dict, once, at ingest
+
+    clauses['amounts'] maps each covered service to its Amount fields, and
+    inclusions hold whole rupees (1 for covered without a rupee limit).
+    Benefit-schedule rows gain 'limit_amount' and 'sub_limit_amount'.
+    """
+    amounts = {}
+    for service, stated in clauses.get('coverage_amounts', {}).items():
+        amount = parse_amount(stated)
+        if amount is None:
+            continue
+        amounts[service] = amount._asdict()
+        if service in clauses.get('inclusions', {}):
+            in_rupees = amount.value if amount.currency == 'INR' and amount.value else 0
+            clauses['inclusions'][service] = in_rupees or 1
+    clauses['amounts'] = amounts
+
+    for row in clauses.get('benefit_schedule', []):
+        for field in ('limit', 'sub_limit'):
+            amount = parse_amount(row.get(field))
+            row[f'{field}_amount'] = amount._asdict() if amount else None
+    return clauses
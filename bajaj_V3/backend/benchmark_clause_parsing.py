@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+⏱️ CLAUSE PARSING BENCHMARK
+✅ Times exclusion parsing on a policy's text repeated 1x to 16x
+✅ Compares the one-pass segmenter with the old DOTALL exclusion patterns
+✅ Parse time per KB should stay flat as documents grow
+
+Usage: python benchmark_clause_parsing.py [policy.pdf]
+"""
+
+import os
+import re
+import sys
+import time
+
+from clause_segments import classify_segment, segment_text, split_items
+from pdf_extraction import iter_pages
+
+DEFAULT_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'BAJHLIP23020V012223.pdf')
+
+SIZES = [1, 2, 4, 8, 16]
+
+# The exclusion patterns clause parsing used before clause_segments, kept for comparison
+LEGACY_EXCLUSION_PATTERNS = [re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in [
+    r'(?:exclusions?|not covered|excluded|exceptions?)[:\-\s]*(.+?)(?:\n\n|\d+\.|\bsection\b|\bcoverage\b|$)',
+    r'(?:the following (?:are|is) (?:not )?(?:covered|excluded))[:\-\s]*(.+?)(?:\n\n|\d+\.|\bsection\b|$)',
+    r'(?:this policy does not cover)[:\-\s]*(.+?)(?:\n\n|\d+\.|\bsection\b|$)',
+]]
+
+
+def legacy_exclusions(text):
+    exclusions = []
+    text_lower = text.lower()
+    for pattern in LEGACY_EXCLUSION_PATTERNS:
+        for match in pattern.finditer(text_lower):
+            for item in re.split(r'[;\n•\-\*]|(?:\d+\.)', match.group(1).strip()):
+                item = item.strip().rstrip('.,')
+                if 3 < len(item) < 200:
+                    exclusions.append(item)
+    return exclusions
+
+
+def segment_exclusions(text):
+    exclusions = []
+    state = {}
+    for segment in segment_text(text):
+        for item in split_items(classify_segment(segment, state)):
+            if 3 < len(item) < 200:
+                exclusions.append(item)
+    return exclusions
+
+
+def best_time(parse, text, runs=3):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        parse(text)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PDF
+    text = "".join(page.text + "\n" for page in iter_pages(pdf_path, workers=1))
+    # A run of text with exclusion keywords but no clause numbers or blank lines,
+    # as left by PDFs that extract without line structure
+    flat = " ".join(text.split())
+
+    print(f"⏱️ Clause parsing benchmark: {os.path.basename(pdf_path)} ({len(text) // 1024} KB)")
+    for name, source in (('extracted text', text), ('flattened text', flat)):
+        print(f"\n📄 {name}")
+        print(f"{'size':>6} {'KB':>8} {'segmenter ms':>14} {'ms/KB':>7} {'legacy ms':>11} {'ms/KB':>7}")
+        for size in SIZES:
+            document = source * size
+            kb = len(document) / 1024
+            new = best_time(segment_exclusions, document) * 1000
+            old = best_time(legacy_exclusions, document, runs=1) * 1000
+            print(f"{size:>5}x {kb:>8.0f} {new:>14.1f} {new / kb:>7.3f} {old:>11.1f} {old / kb:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+⏱️ QUERY PARSING BENCHMARK
+✅ Times QueryParser.parse per query, in microseconds
+✅ Compares it with the per-pattern regex parsing extract_user_info used before
+✅ Lists the sample queries the two parse differently
+
+Usage: python benchmark_query_parsing.py [runs]
+"""
+
+import re
+import sys
+import time
+
+from query_parser import QueryParser
+
+# Procedure synonyms of main_complete_intelligent.PROCEDURE_MAPPINGS, copied so
+# the benchmark does not start the server
+PROCEDURE_MAPPINGS = {
+    'IVF': ['in vitro fertilization', 'fertility treatment', 'assisted reproduction', 'ivf', 'artificial insemination', 'fertility procedure'],
+    'fertility': ['reproductive health', 'infertility treatment', 'conception assistance', 'fertility consultation', 'reproductive therapy'],
+    'cardiac': ['heart surgery', 'cardiovascular', 'cardiac intervention', 'bypass surgery', 'angioplasty', 'heart operation'],
+    'maternity': ['pregnancy care', 'prenatal', 'childbirth', 'delivery', 'maternity benefits', 'pregnancy benefits', 'prenatal care'],
+    'cancer': ['oncology', 'chemotherapy', 'radiation therapy', 'tumor treatment', 'cancer therapy', 'malignancy treatment'],
+    'emergency': ['urgent care', 'emergency room', 'trauma care', 'critical care', 'ambulance', 'emergency treatment'],
+    'surgery': ['operation', 'surgical procedure', 'operative treatment', 'surgical intervention'],
+    'diagnostic': ['tests', 'scans', 'diagnostics', 'medical tests', 'laboratory tests', 'imaging'],
+    'consultation': ['doctor visit', 'medical consultation', 'physician visit', 'specialist consultation']
+}
+
+QUERIES = [
+    "46M knee surgery Pune 3 month policy",
+    "46-year-old male, knee surgery in Pune, 3-month-old insurance policy",
+    "25F IVF treatment, policy active for 2 years",
+    "35 year old female needs heart surgery, policy 1 year",
+    "age: 52, male, chemotherapy, coverage 6 months",
+    "pregnant woman prenatal care",
+    "What is the waiting period for cataract surgery?",
+    "30 years old man with history of diabetes, bypass surgery",
+    "I have a 2 year policy and need an operation",
+    "Patient aged 60, emergency room visit",
+    "Does this policy cover knee replacement surgery for a 62 yr old?",
+    "45m angioplasty, coverage 18 months",
+]
+
+
+def legacy_extract(query):
+    """extract_user_info's parsing before QueryParser, without its logging"""
+    query_lower = query.lower()
+    extracted = {}
+    for pattern in [r'(\d+)\s*(?:year|yr)s?\s*old', r'(\d+)(?:y|Y|F|M)\b',
+                    r'age\s*[:\-]?\s*(\d+)', r'\b(\d+)\s*(?:year|yr)s?(?:\s+old)?']:
+        match = re.search(pattern, query)
+        if match:
+            age = int(match.group(1))
+            if 0 < age < 120:
+                extracted['age'] = age
+                break
+    for pattern in [r'\b(?:\d+)?([mf])\b', r'\b(male|female|man|woman)\b', r'\b(pregnant)\b']:
+        match = re.search(pattern, query_lower)
+        if match:
+            gender_text = match.group(1).lower()
+            if gender_text in ['f', 'female', 'woman', 'pregnant']:
+                extracted['gender'] = 'female'
+            elif gender_text in ['m', 'male', 'man']:
+                extracted['gender'] = 'male'
+            break
+    best_procedure, best_score = None, 0
+    for category, synonyms in PROCEDURE_MAPPINGS.items():
+        for synonym in synonyms:
+            if synonym.lower() in query_lower:
+                score = len(synonym) * 2
+                if score > best_score:
+                    best_score, best_procedure = score, category
+    if best_procedure:
+        extracted['procedure'] = best_procedure
+        extracted['procedure_confidence'] = min(95, best_score)
+    else:
+        medical_terms = re.findall(r'\b(?:treatment|surgery|procedure|therapy|care|consultation|test|scan|operation|visit)\b', query_lower)
+        if medical_terms:
+            extracted['procedure'] = f"medical {medical_terms[0]}"
+            extracted['procedure_confidence'] = 60
+    for pattern in [r'(?:policy|coverage).*?(\d+)\s*(?:year|yr|month)s?',
+                    r'active.*?(?:since|for).*?(\d+)\s*(?:year|yr|month)s?',
+                    r'(\d+)\s*(?:year|yr|month)s?.*?(?:policy|coverage)']:
+        match = re.search(pattern, query_lower)
+        if match:
+            duration = int(match.group(1))
+            unit = 'years' if 'year' in match.group(0) or 'yr' in match.group(0) else 'months'
+            extracted['policy_duration'] = f"{duration} {unit}"
+            extracted['policy_duration_months'] = duration * 12 if unit == 'years' else duration
+            break
+    if any(keyword in query_lower for keyword in ['history', 'previous', 'past', 'chronic', 'existing']):
+        extracted['has_medical_history'] = True
+    return extracted
+
+
+def microseconds_per_query(parse, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        for query in QUERIES:
+            parse(query)
+        timings.append(time.perf_counter() - started)
+    return min(timings) / len(QUERIES) * 1e6
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    parser = QueryParser(PROCEDURE_MAPPINGS)
+
+    print(f"⏱️ Query parsing benchmark: {len(QUERIES)} queries, best of {runs} runs")
+    compiled = microseconds_per_query(parser.parse, runs)
+    legacy = microseconds_per_query(legacy_extract, runs)
+    print(f"{'QueryParser':>14} {compiled:>8.1f} µs/query")
+    print(f"{'legacy regexes':>14} {legacy:>8.1f} µs/query  ({legacy / compiled:.1f}x)")
+
+    differences = [(query, legacy_extract(query), parser.parse(query)) for query in QUERIES]
+    differences = [item for item in differences if item[1] != item[2]]
+    if differences:
+        print(f"\n🔍 Parsed differently ({len(differences)}):")
+        for query, old, new in differences:
+            changed = sorted(key for key in set(old) | set(new) if old.get(key) != new.get(key))
+            print(f"  '{query}'")
+            for key in changed:
+                print(f"     {key}: {old.get(key)} -> {new.get(key)}")
+
+
+if __name__ == "__main__":
+    main()
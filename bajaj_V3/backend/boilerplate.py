@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+🧹 HEADER / FOOTER STRIPPING
+✅ Lines repeated at the top or bottom of many pages detected while pages stream
+✅ Page-number furniture ("Page 3 of 49", "- 3 -") removed; bare numbers only when they follow the page sequence
+✅ Stripped lines listed in the stats, so UINs and insurer details stay on record
+✅ Stripped share reported with the extraction stats
+"""
+
+import re
+from collections import Counter, deque
+
+# Lines from the top and bottom of a page that are checked for furniture
+EDGE_LINES = 12
+
+# Pages read ahead of the one being stripped, so repeats are known before its first copies go out
+LOOKAHEAD_PAGES = 4
+
+# A line is furniture once seen at page edges this often (or on every page of a shorter
+# document), on at least this share of the pages since it first appeared
+MIN_REPEATS = 3
+MIN_SHARE = 0.3
+
+# A bare number on a page's first or last line is a page number once this many pages
+# carry one there at the same offset from their page index ("3" on page 1, "4" on page 2)
+MIN_PAGE_SEQUENCE = 2
+
+DIGITS = re.compile(r'\d+')
+SPACES = re.compile(r'\s+')
+PAGE_LABEL = re.compile(r'^(?:page\s*\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?|\d{1,4}\s*(?:of|/)\s*\d{1,4}|\d{1,4}\s*\|\s*page)$', re.IGNORECASE)
+BARE_NUMBER = re.compile(r'^[-–\s]*(\d{1,4})[-–\s]*$')
+
+
+def line_key(line):
+    """Comparison key for a line: case, numbers and all spacing ignored (extractors space words differently)"""
+    return SPACES.sub('', DIGITS.sub('#', line.lower()))
+
+
+def _edge_lines(lines):
+    """Yield (index, position) for the non-empty lines near the top or bottom of a page
+
+    Up to EDGE_LINES lines per edge, and no more than a third of the page, so
+    the body of a short page is never treated as furniture. position is
+    ('top', n) or ('bottom', n), n counting non-empty lines from that edge.
+    """
+    filled = [index for index, line in enumerate(lines) if line.strip()]
+    depth = min(EDGE_LINES, max(1, len(filled) // 3))
+    for rank, index in enumerate(filled[:depth]):
+        yield index, ('top', rank)
+    for rank, index in enumerate(reversed(filled[-depth:])):
+        yield index, ('bottom', rank)
+
+
+class BoilerplateStripper:
+    """Remove running headers, footers and page numbers from a stream of PageRecords
+
+    Pages are held back LOOKAHEAD_PAGES at a time. Each page's edge lines are
+    counted by line_key() and their position from the edge, so the same text
+    at the same place on many pages is furniture while a sentence that recurs
+    in the body is not. When a page is released, edge lines that have become
+    furniture (MIN_REPEATS / MIN_SHARE) are dropped, and the most stripped
+    lines are listed by stats(). Page labels are always dropped, and bare
+    numbers on a page's first or last line when they follow the page
+    sequence. Offsets of the yielded records index the stripped text.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.first_seen = {}
+        self.examples = {}
+        self.pages_seen = 0
+        self.chars_in = 0
+        self.chars_out = 0
+        self.lines_stripped = 0
+        self.page_numbers_stripped = 0
+        self.stripped_keys = Counter()
+        self.page_sequences = Counter()
+
+    def _observe(self, page):
+        self.pages_seen += 1
+        self.chars_in += len(page.text) + 1
+        lines = page.text.split('\n')
+        for index, position in _edge_lines(lines):
+            key = (position, line_key(lines[index]))
+            if key not in self.first_seen:
+                self.first_seen[key] = self.pages_seen
+                self.examples[key[1]] = lines[index].strip()
+            self.counts[key] += 1
+            match = BARE_NUMBER.match(lines[index].strip())
+            if match and position[1] == 0:
+                self.page_sequences[(position[0], int(match.group(1)) - page.page_number)] += 1
+
+    def is_furniture(self, key):
+        count = self.counts[key]
+        span = self.pages_seen - self.first_seen[key] + 1
+        return count >= max(2, min(MIN_REPEATS, self.pages_seen)) and count / span >= MIN_SHARE
+
+    def is_page_number(self, line, page_number, position):
+        line = line.strip()
+        if PAGE_LABEL.match(line):
+            return True
+        match = BARE_NUMBER.match(line)
+        if not match or position[1] != 0:
+            return False
+        return self.page_sequences[(position[0], int(match.group(1)) - page_number)] >= MIN_PAGE_SEQUENCE
+
+    def _strip(self, page):
+        lines = page.text.split('\n')
+        drop = set()
+        for index, position in _edge_lines(lines):
+            if index in drop:
+                continue
+            if self.is_page_number(lines[index], page.page_number, position):
+                drop.add(index)
+                self.page_numbers_stripped += 1
+                continue
+            if BARE_NUMBER.match(lines[index].strip()):
+                # Every bare number has the same key; only the page sequence makes one furniture
+                continue
+            key = line_key(lines[index])
+            if self.is_furniture((position, key)):
+                drop.add(index)
+                self.stripped_keys[key] += 1
+        self.lines_stripped += len(drop)
+        return "\n".join(line for index, line in enumerate(lines) if index not in drop).strip('\n')
+
+    def strip(self, pages):
+        """Yield the pages with furniture removed and offsets recomputed; empty pages are skipped"""
+        pending = deque()
+        offset = 0
+
+        def release():
+            nonlocal offset
+            page = pending.popleft()
+            text = self._strip(page)
+            if not text:
+                return None
+            self.chars_out += len(text) + 1
+            record = page._replace(text=text, start=offset, end=offset + len(text))
+            offset += len(text) + 1
+            return record
+
+        for page in pages:
+            self._observe(page)
+            pending.append(page)
+            if len(pending) > LOOKAHEAD_PAGES:
+                record = release()
+                if record:
+                    yield record
+        while pending:
+            record = release()
+            if record:
+                yield record
+
+    def stats(self):
+        """Stripped share and the most stripped lines, for the extraction stats"""
+        return {
+            'chars_before': self.chars_in,
+            'chars_after': self.chars_out,
+            'stripped_ratio': round(1 - self.chars_out / self.chars_in, 3) if self.chars_in else 0.0,
+            'lines_stripped': self.lines_stripped,
+            'page_numbers_stripped': self.page_numbers_stripped,
+            'repeated_lines': [self.examples[key] for key, _ in self.stripped_keys.most_common(10)]
+        }
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+📚 BULK DOCUMENT INGESTION
+✅ Many files per request, or a whole server-side directory
+✅ Files fanned out over a worker pool
+✅ Per-file results streamed back as each file completes
+"""
+
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from document_store import DOCUMENT_EXTENSIONS
+
+# Documents saved and parsed concurrently per bulk request
+BULK_UPLOAD_WORKERS = int(os.environ.get('BULK_UPLOAD_WORKERS', os.cpu_count() or 1))
+
+# File types accepted by bulk ingestion; anything else is reported as skipped
+ALLOWED_EXTENSIONS = DOCUMENT_EXTENSIONS
+
+# Directory imports are only allowed below this path (unset disables them)
+BULK_IMPORT_ROOT = os.environ.get('BULK_IMPORT_ROOT')
+
+
+def resolve_import_directory(directory, import_root=None):
+    """Return (real_path, error) for a directory import request"""
+    import_root = BULK_IMPORT_ROOT if import_root is None else import_root
+    if not import_root:
+        return None, 'Directory import is disabled (set BULK_IMPORT_ROOT)'
+
+    root = os.path.realpath(import_root)
+    path = os.path.realpath(os.path.join(root, directory))
+    if os.path.commonpath([root, path]) != root:
+        return None, f'Directory must be inside {import_root}'
+    if not os.path.isdir(path):
+        return None, f'Directory not found: {directory}'
+    return path, None
+
+
+def directory_items(directory, recursive=False):
+    """List (filename, file_path) for the files in a directory, sorted by path"""
+    items = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if not filename.startswith('.'):
+                items.append((filename, os.path.join(dirpath, filename)))
+        if not recursive:
+            break
+    return items
+
+
+def _ingest(ingest_one, filename, source):
+    """Run ingest_one for one file and wrap its outcome in a per-file result"""
+    started = time.time()
+    try:
+        result = dict(ingest_one(filename, source), filename=filename, status='processed', error=None)
+    except Exception as e:
+        print(f"❌ Bulk ingest failed for {filename}: {e}")
+        traceback.print_exc()
+        result = {'filename': filename, 'status': 'failed', 'error': str(e)}
+    result['elapsed_ms'] = round((time.time() - started) * 1000)
+    return result
+
+
+def is_allowed(filename, allowed_extensions=ALLOWED_EXTENSIONS):
+    return os.path.splitext(filename)[1].lower() in allowed_extensions
+
+
+def iter_bulk_results(items, ingest_one, workers=None, allowed_extensions=ALLOWED_EXTENSIONS):
+    """Yield one result dict per (filename, source) item, in completion order
+
+    ingest_one(filename, source) parses one document and returns its fields;
+    source is whatever the caller listed for the file (a path for directory
+    imports). Files with other extensions are reported as skipped without
+    calling ingest_one.
+    """
+    workers = BULK_UPLOAD_WORKERS if workers is None else workers
+    accepted = []
+    for filename, source in items:
+        if is_allowed(filename, allowed_extensions):
+            accepted.append((filename, source))
+        else:
+            yield {'filename': filename, 'status': 'skipped', 'error': 'Unsupported file type', 'elapsed_ms': 0}
+
+    if not accepted:
+        return
+
+    print(f"📚 Bulk ingest of {len(accepted)} files across {workers} workers")
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='bulk') as executor:
+        futures = [executor.submit(_ingest, ingest_one, filename, source) for filename, source in accepted]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize(results, started):
+    """Totals for the last line of a bulk response"""
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    return {
+        'files': len(results),
+        'processed': counts.get('processed', 0),
+        'failed': counts.get('failed', 0),
+        'skipped': counts.get('skipped', 0),
+        'elapsed_ms': round((time.time() - started) * 1000)
+    }
+
+
+def collect(results_iter):
+    """All bulk results plus the summary, as one JSON body"""
+    started = time.time()
+    results = list(results_iter)
+    return {'results': results, 'summary': summarize(results, started)}
+
+
+def ndjson_lines(results_iter):
+    """Encode bulk results as newline-delimited JSON, ending with a summary line"""
+    started = time.time()
+    results = []
+    for result in results_iter:
+        results.append(result)
+        yield json.dumps(result) + "\n"
+    yield json.dumps({'summary': summarize(results, started)}) + "\n"
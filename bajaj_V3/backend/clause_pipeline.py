@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+🧩 STREAMING CLAUSE PIPELINE
+✅ Clause parsing consumes pages as they are extracted
+✅ Each page is scanned with the previous page as context
+✅ Memory bounded by a window of pages, not the whole document
+"""
+
+from collections import deque
+
+
+def accept_all(match):
+    """Match filter for a single window covering the whole document"""
+    return True
+
+
+def _span(match):
+    """(key, start, end) of a regex match or a clause_segments.Segment"""
+    if hasattr(match, 're'):
+        return match.re.pattern, match.start(), match.end()
+    return match.kind, match.start, match.end
+
+
+class StreamingClauseParser:
+    """Feed page records through a window-based clause scanner
+
+    Each window is the previous page(s) followed by the new page.
+    scan_window(window_text, accept, clauses, state) runs the clause patterns
+    over the window and records only matches for which accept(match) is true;
+    a match is a regex match or a Segment from clause_segments.segment_text.
+    state['window_start'] holds the document offset of the window's first
+    character while it is scanned.
+    accept drops matches that lie entirely in the context pages and matches
+    already recorded from the previous window, so a clause that starts on one
+    page and ends on the next is recorded exactly once.
+    finalize(clauses, state) returns the finished clause dict.
+    """
+
+    def __init__(self, new_clauses, scan_window, finalize, context_pages=1):
+        self.clauses = new_clauses()
+        self.state = {}
+        self._scan_window = scan_window
+        self._finalize = finalize
+        self._context = deque(maxlen=context_pages)
+        self._accepted = set()
+        self.pages_parsed = 0
+
+    def feed(self, page):
+        """Parse one page; returns the clause dict accumulated so far"""
+        context_text = "".join(text + "\n" for text in self._context)
+        boundary = len(context_text)
+        window_start = page.start - boundary
+        previous, current = self._accepted, set()
+
+        def accept(match):
+            key, start, end = _span(match)
+            if start < boundary:
+                if end <= boundary:
+                    return False
+                if (key, window_start + start) in previous:
+                    return False
+            current.add((key, window_start + start))
+            return True
+
+        self.state['window_start'] = window_start
+        self._scan_window(context_text + page.text, accept, self.clauses, self.state)
+        self._accepted = current
+        if self._context.maxlen:
+            self._context.append(page.text)
+        self.pages_parsed += 1
+        return self.clauses
+
+    def finish(self):
+        """Finalize and return the parsed clauses"""
+        return self._finalize(self.clauses, self.state)
+
+
+def parse_text(text_content, new_clauses, scan_window, finalize):
+    """Parse a whole document string in one window"""
+    clauses = new_clauses()
+    state = {'window_start': 0}
+    scan_window(text_content, accept_all, clauses, state)
+    return finalize(clauses, state)
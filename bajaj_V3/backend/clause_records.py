@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+🔖 CLAUSE RECORDS
+✅ Every parsed clause kept as a compact record: ID, section path, page, char span, kind, text, amount
+✅ Positions noted while the segmenter scans, records built once at ingest
+✅ Cached with the document as plain rows
+✅ Stable IDs, so query answers cite the clause they came from
+"""
+
+from bisect import bisect_right
+
+# Clause kinds and the prefix of their IDs
+KIND_PREFIXES = {'inclusion': 'INC', 'exclusion': 'EXC', 'waiting_period': 'WP'}
+
+# Joins the headings of a section path
+SECTION_SEPARATOR = ' > '
+
+# Headings are cut to this many characters in section paths
+MAX_HEADING_CHARS = 80
+
+# Section path given to clauses that come from benefit-schedule tables
+SCHEDULE_SECTION = 'Benefit schedule'
+
+
+class Clause:
+    """One parsed clause; start/end index the document's stored text"""
+
+    __slots__ = ('clause_id', 'kind', 'section', 'page_number', 'start', 'end', 'text', 'amount')
+
+    def __init__(self, clause_id, kind, section, page_number, start, end, text, amount=None):
+        self.clause_id = clause_id
+        self.kind = kind
+        self.section = section
+        self.page_number = page_number
+        self.start = start
+        self.end = end
+        self.text = text
+        self.amount = amount
+
+    def to_row(self):
+        return [getattr(self, field) for field in self.__slots__]
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def citation(self):
+        """Where the clause came from, for query responses"""
+        return {
+            'clause_id': self.clause_id,
+            'section': self.section,
+            'page': self.page_number,
+            'span': [self.start, self.end]
+        }
+
+    def __repr__(self):
+        return f"Clause({self.clause_id!r}, {self.text[:40]!r})"
+
+
+def _heading_level(label):
+    """Depth of a numbered heading ("3" -> 1, "3.1" -> 2); 0 for unnumbered headings"""
+    number = label.strip('().').strip()
+    if not number:
+        return 0
+    return number.count('.') + 1 if number[0].isdigit() else 2
+
+
+class ClauseRecorder:
+    """Notes where each clause was found while a document is scanned
+
+    The clause pipeline puts the document offset of the current window in
+    state['window_start']; scanners pass window-relative spans to note().
+    Headings passed to enter_heading() build the section path: an unnumbered
+    heading starts a new top-level section, a numbered one replaces the
+    headings at its depth and below. Spans are kept per (kind, key) and turned
+    into Clause records by build() once the parse is finished.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.sections = []
+        self.spans = {}
+
+    def enter_heading(self, segment):
+        level = _heading_level(segment.label)
+        title = " ".join(segment.text.split())[:MAX_HEADING_CHARS].rstrip()
+        if level == 0:
+            self.sections = [(0, title)]
+        else:
+            while self.sections and self.sections[-1][0] >= level:
+                self.sections.pop()
+            self.sections.append((level, title))
+
+    def section_path(self):
+        return SECTION_SEPARATOR.join(title for _, title in self.sections)
+
+    def note(self, kind, key, start, end, keep_first=False):
+        """Record the span of one clause; later notes for the same key replace earlier ones unless keep_first"""
+        if keep_first and (kind, key) in self.spans:
+            return
+        offset = self.state.get('window_start', 0)
+        self.spans[(kind, key)] = (self.section_path(), offset + start, offset + end)
+
+    def rename(self, kind, key, new_key):
+        """Carry a span over to the cleaned-up form of a clause"""
+        span = self.spans.get((kind, key))
+        if span and (kind, new_key) not in self.spans:
+            self.spans[(kind, new_key)] = span
+
+    def build(self, clauses, pages, schedule_rows=()):
+        """ClauseIndex for a finished clause dict
+
+        pages are the document's PageRecords, used to find the page of each
+        span. Inclusions and waiting periods that came from benefit-schedule
+        rows, not the text, get the span of the page holding their table.
+        """
+        starts = [page.start for page in pages]
+        by_number = {page.page_number: page for page in pages}
+        from_schedule = {row.benefit.lower(): row for row in schedule_rows}
+
+        def locate(kind, key):
+            span = self.spans.get((kind, key))
+            if span:
+                index = bisect_right(starts, span[1]) - 1
+                return span[0], (pages[index].page_number if index >= 0 else None), span[1], span[2]
+            row = from_schedule.get(key)
+            page = by_number.get(row.page_number) if row else None
+            if page:
+                return SCHEDULE_SECTION, page.page_number, page.start, page.end
+            return "", None, None, None
+
+        entries = []
+        for service, amount in clauses.get('inclusions', {}).items():
+            entries.append(('inclusion', service) + locate('inclusion', service) + (amount if amount > 1 else None,))
+        for exclusion in clauses.get('exclusions', []):
+            entries.append(('exclusion', exclusion) + locate('exclusion', exclusion) + (None,))
+        for service, period in clauses.get('waiting_periods', {}).items():
+            entries.append(('waiting_period', service) + locate('waiting_period', service) + (None,))
+        return ClauseIndex.numbered(entries)
+
+
+def recorder_for(state):
+    """The ClauseRecorder for a parse, created on first use"""
+    recorder = state.get('clause_recorder')
+    if recorder is None:
+        recorder = state['clause_recorder'] = ClauseRecorder(state)
+    return recorder
+
+
+class ClauseIndex:
+    """A document's Clause records, looked up by ID or by (kind, text)"""
+
+    def __init__(self, clauses=()):
+        self.clauses = list(clauses)
+        self.by_id = {clause.clause_id: clause for clause in self.clauses}
+        self._by_text = {}
+        for clause in self.clauses:
+            self._by_text.setdefault((clause.kind, clause.text), clause)
+
+    @classmethod
+    def numbered(cls, entries):
+        """Records from (kind, text, section, page_number, start, end, amount) entries
+
+        IDs are the kind prefix, the page number and the clause's position
+        among clauses of that kind on the page ("EXC-12.3"), so they stay the
+        same whenever the same document is parsed by the same parser version.
+        """
+        entries = sorted(entries, key=lambda entry: (entry[3] or 0, entry[4] if entry[4] is not None else -1,
+                                                     entry[0], entry[1]))
+        counters = {}
+        clauses = []
+        for kind, text, section, page_number, start, end, amount in entries:
+            counter_key = (kind, page_number)
+            counters[counter_key] = counters.get(counter_key, 0) + 1
+            clause_id = f"{KIND_PREFIXES[kind]}-{page_number or 0}.{counters[counter_key]}"
+            clauses.append(Clause(clause_id, kind, section, page_number, start, end, text, amount))
+        return cls(clauses)
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls(Clause(*row) for row in rows)
+
+    def to_rows(self):
+        return [clause.to_row() for clause in self.clauses]
+
+    def get(self, clause_id):
+        return self.by_id.get(clause_id)
+
+    def find(self, kind, text):
+        """The record for a clause as it appears in the clause dict, or None"""
+        return self._by_text.get((kind, text))
+
+    def cite(self, kind, text):
+        """Citation for a clause, or None when it has no record"""
+        clause = self.find(kind, text)
+        return clause.citation() if clause else None
+
+    def __len__(self):
+        return len(self.clauses)
+
+
+def document_clause_index(document):
+    """The ClauseIndex of a stored document, built from its cached rows on first use"""
+    index = document.get('clause_index')
+    if index is None:
+        index = document['clause_index'] = ClauseIndex.from_rows(document.get('clause_records', []))
+    return index
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+🧱 CLAUSE SEGMENTER
+✅ One pass over the text splits it into headings, numbered clauses, list items and paragraphs
+✅ Every segment carries its char offsets
+✅ Exclusions found by classifying segments, not by lazy DOTALL scans from each keyword
+✅ Parse time linear in document size
+"""
+
+import re
+from collections import namedtuple
+
+# One segment of document text. kind is 'heading', 'clause' (numbered or
+# lettered), 'item' (bulleted) or 'paragraph'; label is the number, letter or
+# bullet that opened it ("" for headings and paragraphs). text is
+# source[start:end], newlines included.
+Segment = namedtuple('Segment', ['kind', 'label', 'text', 'start', 'end'])
+
+# "1.", "2.1", "3.1.2", "a.", "(b)", "iv)" at the start of a line
+LINE_LABEL = re.compile(r'[ \t]*(\(?(?:\d{1,3}(?:\.\d{1,3}){0,3}|[a-zA-Z]|[ivxIVX]{2,5})[.)]|\d{1,3}(?:\.\d{1,3}){1,3})(?=\s)')
+
+# Bullet characters, including the private-use glyphs PDF symbol fonts extract to
+BULLET = re.compile(r'[ \t]*([•●▪■◦\-\*\uf076\uf0a7\uf0b7\uf0d8\uf0fc])(?=\s)')
+
+# Lines opening a section even when not in capitals
+HEADING_WORDS = re.compile(r'(?:section|part|chapter|schedule|annexure|appendix)\s+[\w\d]{1,4}\b', re.IGNORECASE)
+
+# A heading is one short line; capitals headings need this share of upper-case letters
+MAX_HEADING_CHARS = 120
+HEADING_UPPER_SHARE = 0.8
+
+# Punctuation that ends a paragraph when the next line starts with a capital
+SENTENCE_END = '.:;!?'
+
+# Phrases that introduce excluded items (the same phrases the old exclusion patterns keyed on)
+EXCLUSION_TRIGGER = re.compile(
+    r'\b(?:this policy does not cover|the following (?:are|is) (?:not )?(?:covered|excluded)|'
+    r'exclusions?|not covered|excluded|exceptions?)\b[:\-\s]*')
+EXCLUSION_HEADING = re.compile(r'\b(?:exclusions?|not covered|exceptions?)\b')
+
+# Separators between several excluded items inside one segment
+ITEM_SEPARATORS = re.compile(r'[;•\uf0a7\uf0b7]|\s\d{1,3}[.)]\s|\n[ \t]*[\-\*][ \t]')
+
+
+def _line_kind(line, stripped):
+    """(kind, label) for one non-empty line"""
+    match = LINE_LABEL.match(line)
+    if match:
+        rest = stripped[len(match.group(1)):].strip()
+        return ('heading' if _is_heading(rest) else 'clause'), match.group(1)
+    match = BULLET.match(line)
+    if match:
+        return 'item', match.group(1)
+    if _is_heading(stripped) or (HEADING_WORDS.match(stripped) and len(stripped) <= MAX_HEADING_CHARS
+                                 and stripped[-1] != '.' and ',' not in stripped):
+        return 'heading', ""
+    return 'paragraph', ""
+
+
+def _is_heading(stripped):
+    if not stripped or len(stripped) > MAX_HEADING_CHARS:
+        return False
+    upper = sum(map(str.isupper, stripped))
+    letters = upper + sum(map(str.islower, stripped))
+    return letters >= 4 and upper >= HEADING_UPPER_SHARE * letters
+
+
+def segment_text(text):
+    """Split text into Segments in one pass over its lines
+
+    A numbered or lettered line starts a clause, a bulleted line an item, and
+    a short capitals line (or one opening with "Section", "Part" ...) a
+    heading; an unnumbered heading line continues the heading above it. Other lines continue
+    the current segment, except that a blank line, or a capitalised line
+    after one ending a sentence, starts a new paragraph. Each line is looked
+    at once by anchored, bounded patterns, so time is linear in len(text).
+    """
+    segments = []
+    kind = label = None
+    seg_start = seg_end = 0
+    last_char = ''
+    pos = 0
+    length = len(text)
+    while pos <= length:
+        newline = text.find('\n', pos)
+        if newline == -1:
+            newline = length
+        line = text[pos:newline]
+        stripped = line.strip()
+        if not stripped:
+            if kind:
+                segments.append(Segment(kind, label, text[seg_start:seg_end], seg_start, seg_end))
+                kind = None
+        else:
+            line_kind, line_label = _line_kind(line, stripped)
+            label_only = kind in ('clause', 'item') and seg_end - seg_start == len(label)
+            continues = kind is not None and (
+                (line_kind == 'paragraph' and kind != 'heading'
+                 and (label_only or not (last_char in SENTENCE_END and stripped[0].isupper())))
+                or (line_kind == 'heading' and kind == 'heading' and not line_label))
+            if not continues:
+                if kind:
+                    segments.append(Segment(kind, label, text[seg_start:seg_end], seg_start, seg_end))
+                kind, label = line_kind, line_label
+                seg_start = pos + len(line) - len(line.lstrip())
+            seg_end = pos + len(line.rstrip())
+            last_char = stripped[-1]
+        pos = newline + 1
+    if kind:
+        segments.append(Segment(kind, label, text[seg_start:seg_end], seg_start, seg_end))
+    return segments
+
+
+def _body(segment):
+    """Lower-cased segment text without its clause number or bullet"""
+    return segment.text[len(segment.label):].lower()
+
+
+def classify_segment(segment, state, trigger_pattern=EXCLUSION_TRIGGER):
+    """Return the excluded text of a segment ("" when it excludes nothing)
+
+    state carries the exclusion context from segment to segment (and from
+    window to window). Under a heading naming exclusions, every following
+    segment is excluded text until the next heading. After a line such as
+    "The following are excluded:" the clauses and items that follow are
+    excluded text until the next plain paragraph. Elsewhere a segment
+    mentioning an exclusion phrase (trigger_pattern) contributes the text
+    after the phrase.
+    """
+    if segment.kind == 'heading':
+        state['exclusion_context'] = 'heading' if EXCLUSION_HEADING.search(segment.text.lower()) else None
+        return ""
+
+    body = _body(segment)
+    context = state.get('exclusion_context')
+    trigger = trigger_pattern.search(body)
+    if trigger and not body[trigger.end():].strip():
+        state['exclusion_context'] = context or 'list'
+        return ""
+    if context == 'heading' or (context == 'list' and segment.kind != 'paragraph'):
+        return body
+    if context == 'list':
+        state['exclusion_context'] = None
+    return body[trigger.end():] if trigger else ""
+
+
+def split_items(excluded_text):
+    """Individual excluded items from a segment's excluded text, whitespace collapsed"""
+    items = []
+    for piece in ITEM_SEPARATORS.split(excluded_text):
+        item = " ".join(piece.split()).rstrip('.,')
+        if item:
+            items.append(item)
+    return items
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the clause parsing tests
+
+Plain functions, imported by the test files so they also run as scripts.
+"""
+
+from clause_pipeline import StreamingClauseParser, parse_text
+from pdf_extraction import PageRecord
+
+
+def make_pages(texts, extractor='test'):
+    """PageRecords for page texts laid out as stored text, one newline after each page"""
+    pages, offset = [], 0
+    for number, text in enumerate(texts, 1):
+        pages.append(PageRecord(number, len(texts), text, offset, offset + len(text), extractor))
+        offset += len(text) + 1
+    return pages
+
+
+def exclusions_only():
+    return {'exclusions': []}
+
+
+def finalize(clauses, state):
+    return clauses
+
+
+def clause_parser(scan_window, new_clauses=exclusions_only):
+    """StreamingClauseParser over a test scan_window"""
+    return StreamingClauseParser(new_clauses, scan_window, finalize)
+
+
+def stream_pages(parser, texts):
+    """Feed each page text to parser and return its finished clauses"""
+    for page in make_pages(texts):
+        parser.feed(page)
+    return parser.finish()
+
+
+def parse_whole(text, scan_window, new_clauses=exclusions_only):
+    """Clauses of text parsed as a single window"""
+    return parse_text(text, new_clauses, scan_window, finalize)
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""
+📦 CONTENT-ADDRESSED DOCUMENT STORE
+✅ Uploads are hashed, size-checked and sniffed while they stream to disk
+✅ One stored copy and one parse per unique document
+✅ Every file_id is an alias for a stored document
+✅ Versioned sidecar parse cache survives restarts
+✅ Extracted text kept on disk and read through mmap
+✅ Parses from older parser versions re-run over their cached text, without re-extraction
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import shutil
+import threading
+import uuid
+from datetime import datetime
+
+# Read size used when streaming uploads and hashing files on disk
+CHUNK_SIZE = 64 * 1024
+
+# Largest accepted upload, per file
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_MB', 50)) * 1024 * 1024
+
+# Document types that are stored and parsed
+DOCUMENT_EXTENSIONS = ('.pdf', '.docx', '.txt', '.eml', '.mbox')
+
+# Leading bytes an upload must start with, by file extension
+UPLOAD_MAGIC = {'.pdf': b'%PDF', '.docx': b'PK\x03\x04', '.mbox': b'From '}
+
+# Bump when the layout of cache files changes (parser changes use parser_version)
+CACHE_FORMAT = 2
+CACHE_DIRNAME = '.cache'
+ALIAS_INDEX = 'aliases.json'
+
+# Cache files are "<content_hash>.<parser>.v<parser_version>.json", with the text in a matching .txt
+CACHE_FILENAME = re.compile(r'^([0-9a-f]{64})\.(.+)\.v(\d+)\.json$')
+
+# Characters between entries of the char -> byte offset index kept for each text file
+TEXT_INDEX_STRIDE = 4096
+
+
+def hash_file(file_path):
+    """Compute the SHA-256 content hash of a file on disk"""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def stored_filename(content_hash, filename):
+    """Name under which a document is kept in the upload folder"""
+    return f"{content_hash}_{filename}"
+
+
+class UploadRejected(ValueError):
+    """An upload refused while it was being received"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class UploadStream:
+    """Writable target for an incoming upload that checks it in the same pass
+
+    Bytes are hashed and written to a temporary file in upload_folder as they
+    arrive. Once the upload passes max_size or its first bytes do not match the
+    magic for its extension, the temporary file is deleted and the rest of the
+    body is only counted, so a bad upload costs no more disk or parse time.
+    commit() then raises UploadRejected. The object is also a readable file so
+    it can stand in for the werkzeug upload stream.
+    """
+
+    def __init__(self, upload_folder, filename, max_size=None):
+        self.upload_folder = upload_folder
+        self.filename = filename
+        self.max_size = MAX_UPLOAD_BYTES if max_size is None else max_size
+        self.magic = UPLOAD_MAGIC.get(os.path.splitext(filename or '')[1].lower())
+        self.size = 0
+        self.error = None
+        self._head = b''
+        self._hasher = hashlib.sha256()
+        self._tmp_path = os.path.join(upload_folder, f".{uuid.uuid4().hex}.part")
+        self._file = open(self._tmp_path, 'w+b')
+
+    def write(self, data):
+        self.size += len(data)
+        if self.error:
+            return len(data)
+        if self.size > self.max_size:
+            self._reject(f"File exceeds the {self.max_size // (1024 * 1024)} MB upload limit", 413)
+            return len(data)
+        if self.magic and len(self._head) < len(self.magic):
+            self._head += data[:len(self.magic) - len(self._head)]
+            if not self.magic.startswith(self._head):
+                self._reject(f"File content is not a valid {os.path.splitext(self.filename)[1].upper()[1:]} document")
+                return len(data)
+        self._hasher.update(data)
+        self._file.write(data)
+        return len(data)
+
+    def _reject(self, message, status_code=400):
+        print(f"🚫 Rejecting upload {self.filename}: {message}")
+        self.error = UploadRejected(message, status_code)
+        self.close()
+
+    def commit(self, store=None):
+        """Keep the upload in the content-addressed store; returns (content_hash, file_path, file_size)"""
+        if self.error is None and self.size == 0:
+            self._reject("File is empty")
+        elif self.error is None and self.magic and self._head != self.magic:
+            self._reject(f"File content is not a valid {os.path.splitext(self.filename)[1].upper()[1:]} document")
+        if self.error:
+            raise self.error
+
+        self._file.close()
+        content_hash = self._hasher.hexdigest()
+        if store is not None:
+            existing = store.stored_path(content_hash, self.size, self.upload_folder)
+        else:
+            existing = find_stored_file(self.upload_folder, content_hash)
+        if existing:
+            self.close()
+            print(f"♻️ Duplicate upload detected, reusing {os.path.basename(existing)}")
+            return content_hash, existing, self.size
+
+        file_path = os.path.join(self.upload_folder, stored_filename(content_hash, self.filename))
+        os.replace(self._tmp_path, file_path)
+        if store is not None:
+            store.index_file(content_hash, file_path)
+        return content_hash, file_path, self.size
+
+    def read(self, *args):
+        return b'' if self._file.closed else self._file.read(*args)
+
+    def readline(self, *args):
+        return b'' if self._file.closed else self._file.readline(*args)
+
+    def seek(self, *args):
+        return 0 if self._file.closed else self._file.seek(*args)
+
+    def tell(self):
+        return self.size if self._file.closed else self._file.tell()
+
+    def close(self):
+        """Close and delete the temporary file unless it was committed"""
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def save_stream(stream, upload_folder, filename, store=None, max_size=None):
+    """Stream an upload to disk while hashing it, keeping one copy per content hash
+
+    Returns (content_hash, file_path, file_size). When a file with the same
+    content is already stored, the new bytes are discarded and the existing
+    path is returned. Raises UploadRejected for empty, oversized or mis-typed
+    uploads. An UploadStream that already received the upload is committed
+    without copying it again.
+    """
+    if isinstance(stream, UploadStream):
+        return stream.commit(store)
+
+    upload = UploadStream(upload_folder, filename, max_size)
+    try:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            upload.write(chunk)
+            if upload.error:
+                break
+        return upload.commit(store)
+    finally:
+        upload.close()
+
+
+def file_id_for(filename):
+    """Stable (file_id, original_name) for a file found in the upload folder
+
+    Files saved as "<id>_<name>" keep their prefix as file_id; anything else gets
+    a deterministic id derived from its name so restarts do not renumber it.
+    """
+    if '_' in filename:
+        file_id, original_name = filename.split('_', 1)
+        return file_id, original_name
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, filename)), filename
+
+
+def find_stored_file(upload_folder, content_hash):
+    """Return the path of the stored copy of a content hash, if any"""
+    prefix = f"{content_hash}_"
+    for name in os.listdir(upload_folder):
+        if name.startswith(prefix):
+            return os.path.join(upload_folder, name)
+    return None
+
+
+class DocumentText:
+    """Extracted document text stored as UTF-8 on disk and sliced through mmap
+
+    Only a sparse char -> byte offset index (one entry per TEXT_INDEX_STRIDE
+    characters) stays in memory, so slices by character offset decode just the
+    bytes they cover. Without a file path the text is kept in memory.
+    """
+
+    def __init__(self, path=None, length=0, byte_index=None, text=None):
+        self.path = path
+        self.length = length
+        self.byte_index = byte_index or [0]
+        self._text = text
+        self._map = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def write(cls, path, text):
+        """Write text to path and return a DocumentText over it"""
+        byte_index = []
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        position = 0
+        with open(tmp_path, 'wb') as f:
+            for start in range(0, len(text), TEXT_INDEX_STRIDE):
+                byte_index.append(position)
+                chunk = text[start:start + TEXT_INDEX_STRIDE].encode('utf-8')
+                f.write(chunk)
+                position += len(chunk)
+        os.replace(tmp_path, path)
+        return cls(path, len(text), byte_index or [0])
+
+    @classmethod
+    def in_memory(cls, text):
+        return cls(length=len(text), text=text)
+
+    def _mapping(self):
+        if self._map is None:
+            with self._lock:
+                if self._map is None:
+                    with open(self.path, 'rb') as f:
+                        self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def slice(self, start, end=None):
+        """Return text[start:end] by character offset"""
+        end = self.length if end is None else min(end, self.length)
+        start = max(0, start)
+        if start >= end:
+            return ""
+        if self._text is not None:
+            return self._text[start:end]
+
+        mapping = self._mapping()
+        first = start // TEXT_INDEX_STRIDE
+        last = -(-end // TEXT_INDEX_STRIDE)
+        byte_start = self.byte_index[first]
+        byte_end = self.byte_index[last] if last < len(self.byte_index) else len(mapping)
+        chunk = mapping[byte_start:byte_end].decode('utf-8')
+        offset = first * TEXT_INDEX_STRIDE
+        return chunk[start - offset:end - offset]
+
+    def preview(self, length=500):
+        """First `length` characters, with "..." when the text is longer"""
+        return self.slice(0, length) + ("..." if self.length > length else "")
+
+    def context(self, start, end, margin=200):
+        """Text around [start, end) for showing where a clause came from"""
+        return self.slice(start - margin, end + margin)
+
+    def read(self):
+        """The whole text as a string"""
+        return self.slice(0)
+
+    def to_index(self):
+        return {'length': self.length, 'byte_index': self.byte_index}
+
+    def __len__(self):
+        return self.length
+
+
+class DocumentStore:
+    """Parsed documents keyed by content hash, backed by a sidecar cache on disk
+
+    Cache entries are keyed by content hash, parser name and parser version, so
+    two servers with different clause parsers can share one upload folder and a
+    parser change invalidates only its own entries. A document whose newest
+    cache entry is from an older parser version keeps its extracted text:
+    reparse_document re-runs only clause parsing over it (see reparse.py).
+    """
+
+    def __init__(self, upload_folder=None, parser_name='clauses', parser_version=1):
+        self.documents = {}
+        self.upload_folder = upload_folder
+        self.parser_name = parser_name
+        self.parser_version = parser_version
+        self.cache_dir = os.path.join(upload_folder, CACHE_DIRNAME) if upload_folder else None
+        self._lock = threading.Lock()
+        self._parse_locks = {}
+        # Where each content hash is stored on disk, and the hash of each indexed path,
+        # so an upload of bytes already in the folder reuses that file
+        self.stored_paths = {}
+        self._path_hashes = {}
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, content_hash):
+        """Return the parsed document for a content hash, or None"""
+        return self.documents.get(content_hash)
+
+    def index_file(self, content_hash, file_path):
+        """Record that file_path holds content_hash"""
+        with self._lock:
+            previous = self._path_hashes.get(file_path)
+            if previous and previous != content_hash and self.stored_paths.get(previous) == file_path:
+                del self.stored_paths[previous]
+            self._path_hashes[file_path] = content_hash
+            current = self.stored_paths.get(content_hash)
+            if current is None or not os.path.exists(current):
+                self.stored_paths[content_hash] = file_path
+
+    def stored_path(self, content_hash, file_size=None, upload_folder=None):
+        """Path of a stored file with this content hash, or None
+
+        The index filled by scan() and by earlier uploads and parses is checked
+        first, then "<content_hash>_" names. Failing both, files on disk of the
+        same size that were never indexed (such as copies saved under other
+        names before uploads were content-addressed) are hashed and indexed.
+        """
+        file_path = self.stored_paths.get(content_hash)
+        if file_path and os.path.exists(file_path):
+            return file_path
+        upload_folder = self.upload_folder or upload_folder
+        if not upload_folder:
+            return None
+
+        file_path = find_stored_file(upload_folder, content_hash)
+        if file_path is None and file_size is not None:
+            for filename in sorted(os.listdir(upload_folder)):
+                candidate = os.path.join(upload_folder, filename)
+                if (candidate in self._path_hashes or not filename.lower().endswith(DOCUMENT_EXTENSIONS)
+                        or os.path.getsize(candidate) != file_size):
+                    continue
+                candidate_hash = hash_file(candidate)
+                self.index_file(candidate_hash, candidate)
+                if candidate_hash == content_hash:
+                    file_path = candidate
+                    break
+        if file_path:
+            self.index_file(content_hash, file_path)
+        return file_path
+
+    def get_or_parse(self, content_hash, file_path, parse_document, reparse_document=None):
+        """Return (document, cache_hit), parsing the file only on first sight
+
+        parse_document(file_path) must return a dict of parsed fields. Its
+        'text_content' is moved to a text file under the cache folder and
+        replaced by 'text' (a DocumentText) and 'text_length', so only the parsed
+        structures stay resident. Concurrent uploads of the same content wait
+        for a single parse. When only an older parser version's cache entry
+        exists, reparse_document(cache_path) is called instead of
+        parse_document and returns the re-parsed fields.
+        """
+        document = self.documents.get(content_hash)
+        if document is not None:
+            return document, True
+
+        with self._lock:
+            parse_lock = self._parse_locks.setdefault(content_hash, threading.Lock())
+
+        with parse_lock:
+            document = self.documents.get(content_hash)
+            if document is not None:
+                return document, True
+
+            document = self._read_cache(content_hash)
+            cache_hit = document is not None
+            if not cache_hit and reparse_document:
+                document = self._reparse_older(content_hash, reparse_document)
+            if document is None:
+                document = parse_document(file_path)
+                text_content = document.pop('text_content', "")
+                if self.cache_dir:
+                    document['text'] = DocumentText.write(self._text_path(content_hash), text_content)
+                else:
+                    document['text'] = DocumentText.in_memory(text_content)
+                document['text_length'] = len(text_content)
+                del text_content
+                self._write_cache(content_hash, document)
+
+            document['content_hash'] = content_hash
+            document['file_path'] = file_path
+            self.documents[content_hash] = document
+        self.index_file(content_hash, file_path)
+
+        with self._lock:
+            self._parse_locks.pop(content_hash, None)
+
+        return document, cache_hit
+
+    def evict(self, content_hash):
+        """Drop a parsed document from memory (its cache files stay on disk)"""
+        return self.documents.pop(content_hash, None) is not None
+
+    def _cache_path(self, content_hash, parser_version=None):
+        version = self.parser_version if parser_version is None else parser_version
+        return os.path.join(self.cache_dir, f"{content_hash}.{self.parser_name}.v{version}.json")
+
+    def _text_path(self, content_hash, parser_version=None):
+        version = self.parser_version if parser_version is None else parser_version
+        return os.path.join(self.cache_dir, f"{content_hash}.{self.parser_name}.v{version}.txt")
+
+    def cached_versions(self):
+        """{content_hash: {parser_version: cache_path}} for this parser's cache files on disk"""
+        versions = {}
+        if not self.cache_dir:
+            return versions
+        for filename in os.listdir(self.cache_dir):
+            match = CACHE_FILENAME.match(filename)
+            if match and match.group(2) == self.parser_name:
+                versions.setdefault(match.group(1), {})[int(match.group(3))] = os.path.join(self.cache_dir, filename)
+        return versions
+
+    def reparseable_entry(self, content_hash, versions=None):
+        """Newest older-version cache path for content_hash that can be re-parsed from its text, or None"""
+        if versions is None:
+            versions = self.cached_versions().get(content_hash, {})
+        for version in sorted((v for v in versions if v < self.parser_version), reverse=True):
+            entry = read_cache_entry(versions[version])
+            if entry and 'layout' in entry['document'] and os.path.exists(cache_text_path(versions[version])):
+                return versions[version]
+        return None
+
+    def _reparse_older(self, content_hash, reparse_document):
+        """Document re-parsed from an older version's cache entry, or None to fall back to a full parse"""
+        older = self.reparseable_entry(content_hash)
+        if not older:
+            return None
+        try:
+            return self.store_reparse(content_hash, older, reparse_document(older))
+        except Exception as e:
+            print(f"⚠️ Re-parse from {os.path.basename(older)} failed, parsing from the file: {e}")
+            return None
+
+    def stale_report(self):
+        """Documents whose newest cached parse is from an older parser version
+
+        One dict per document: content hash, the version it was parsed with,
+        when, and whether its cache can be re-parsed from text (caches written
+        before page layouts were cached need a full re-extraction).
+        """
+        report = []
+        for content_hash, versions in sorted(self.cached_versions().items()):
+            if self.parser_version in versions:
+                continue
+            newest = max(versions)
+            if newest > self.parser_version:
+                continue
+            entry = read_cache_entry(versions[newest]) or {}
+            reparse_path = self.reparseable_entry(content_hash, versions)
+            report.append({
+                'content_hash': content_hash,
+                'parser_version': newest,
+                'current_version': self.parser_version,
+                'cached_at': entry.get('cached_at'),
+                'reparseable': reparse_path is not None,
+                'cache_path': reparse_path or versions[newest]
+            })
+        return report
+
+    def store_reparse(self, content_hash, cache_path, fields):
+        """Current-version document from an older cache entry and its re-parsed fields
+
+        The extracted text file is hard-linked (or copied) to the current
+        version's name and the new cache entry written; the document is
+        returned without being loaded into memory.
+        """
+        entry = read_cache_entry(cache_path)
+        document = entry['document']
+        document.update(fields)
+        text_index = document.pop('text_index')
+        text_path = self._text_path(content_hash)
+        if not os.path.exists(text_path):
+            tmp_path = f"{text_path}.{uuid.uuid4().hex}.tmp"
+            try:
+                os.link(cache_text_path(cache_path), tmp_path)
+            except OSError:
+                shutil.copyfile(cache_text_path(cache_path), tmp_path)
+            os.replace(tmp_path, text_path)
+        document['text'] = DocumentText(text_path, text_index['length'], text_index['byte_index'])
+        self._write_cache(content_hash, document)
+        return document
+
+    def _read_cache(self, content_hash):
+        """Load parsed fields from the sidecar cache, or None when absent or stale"""
+        if not self.cache_dir:
+            return None
+        cache_path = self._cache_path(content_hash)
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable parse cache {os.path.basename(cache_path)}: {e}")
+            return None
+        if (entry.get('cache_format') != CACHE_FORMAT
+                or entry.get('parser_version') != self.parser_version
+                or entry.get('content_hash') != content_hash):
+            return None
+        text_path = self._text_path(content_hash)
+        if not os.path.exists(text_path):
+            return None
+        document = entry['document']
+        text_index = document.pop('text_index')
+        document['text'] = DocumentText(text_path, text_index['length'], text_index['byte_index'])
+        return document
+
+    def _write_cache(self, content_hash, document):
+        """Atomically write parsed fields to the sidecar cache"""
+        if not self.cache_dir:
+            return
+        entry = {
+            'cache_format': CACHE_FORMAT,
+            'parser': self.parser_name,
+            'parser_version': self.parser_version,
+            'content_hash': content_hash,
+            'cached_at': datetime.now().isoformat(),
+            'document': {key: value for key, value in document.items() if key != 'text'}
+        }
+        entry['document']['text_index'] = document['text'].to_index()
+        write_json_atomic(self._cache_path(content_hash), entry)
+
+    def load_aliases(self):
+        """Return the persisted {file_id: alias} index"""
+        if not self.cache_dir:
+            return {}
+        index_path = os.path.join(self.cache_dir, ALIAS_INDEX)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def record_alias(self, file_id, filename, content_hash, file_path, file_size, upload_time):
+        """Persist a file_id so it resolves to the same document after a restart"""
+        if content_hash:
+            self.index_file(content_hash, file_path)
+        if not self.cache_dir:
+            return
+        with self._lock:
+            aliases = self.load_aliases()
+            aliases[file_id] = {
+                'filename': filename,
+                'content_hash': content_hash,
+                'file_path': file_path,
+                'file_size': file_size,
+                'upload_time': upload_time,
+                'mtime': os.path.getmtime(file_path)
+            }
+            write_json_atomic(os.path.join(self.cache_dir, ALIAS_INDEX), aliases)
+
+    def remove_aliases(self, file_ids):
+        """Forget persisted file_ids, e.g. after their file was deleted"""
+        if not self.cache_dir or not file_ids:
+            return
+        with self._lock:
+            aliases = self.load_aliases()
+            for file_id in file_ids:
+                aliases.pop(file_id, None)
+            write_json_atomic(os.path.join(self.cache_dir, ALIAS_INDEX), aliases)
+
+    def scan(self, hash_files=True):
+        """Yield (file_id, filename, content_hash, file_path, file_size, upload_time) for stored documents
+
+        Persisted aliases come first; one whose file was modified after it was
+        recorded is skipped, so the file is listed (and hashed) again. Every other
+        file on disk gets a stable file_id from its name and its modification time
+        as upload time, except files already listed through an alias.
+        Every hash seen is added to the stored_paths index.
+        With hash_files=False files outside the alias index are not read and are
+        yielded with content_hash None.
+        """
+        aliased = set()
+        for file_id, alias in self.load_aliases().items():
+            file_path = alias['file_path']
+            if not os.path.exists(file_path):
+                continue
+            if alias.get('mtime', os.path.getmtime(file_path)) != os.path.getmtime(file_path):
+                continue  # modified since its hash was recorded
+            # save_stream copies are named "<content_hash>_", other files by their own file_id
+            aliased.update({(file_id, file_path), (alias['content_hash'], file_path)})
+            self.index_file(alias['content_hash'], file_path)
+            yield (file_id, alias['filename'], alias['content_hash'], file_path,
+                   alias['file_size'], alias['upload_time'])
+
+        for filename in sorted(os.listdir(self.upload_folder)):
+            file_path = os.path.join(self.upload_folder, filename)
+            if not filename.lower().endswith(DOCUMENT_EXTENSIONS):
+                continue
+            file_id, original_name = file_id_for(filename)
+            if (file_id, file_path) in aliased:
+                continue
+            upload_time = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+            content_hash = hash_file(file_path) if hash_files else None
+            if content_hash:
+                self.index_file(content_hash, file_path)
+            yield (file_id, original_name, content_hash, file_path,
+                   os.path.getsize(file_path), upload_time)
+
+    def __len__(self):
+        return len(self.documents)
+
+
+def cache_text_path(cache_path):
+    """Text file stored alongside a cache entry"""
+    return cache_path[:-len('.json')] + '.txt'
+
+
+def read_cache_entry(cache_path):
+    """A cache entry as stored, or None when unreadable or in an older cache format"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry if entry.get('cache_format') == CACHE_FORMAT else None
+
+
+def write_json_atomic(path, data):
+    """Write JSON next to path and rename it into place"""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
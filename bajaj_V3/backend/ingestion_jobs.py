@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+⏳ BACKGROUND INGESTION JOBS
+✅ Uploads return immediately with a job ID
+✅ Bounded worker pool for extraction and parsing
+✅ Real stage and page progress for /progress
+"""
+
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Documents parsed concurrently
+INGESTION_WORKERS = int(os.environ.get('INGESTION_WORKERS', 2))
+
+# Jobs allowed to wait for a worker before uploads are turned away
+MAX_QUEUED_JOBS = int(os.environ.get('INGESTION_MAX_QUEUED', 32))
+
+# Finished jobs kept for /progress lookups
+MAX_FINISHED_JOBS = 1000
+
+# Ingestion stages in order; 'done' and 'failed' are terminal
+STAGES = ['queued', 'extracting', 'parsing', 'indexing', 'done', 'failed']
+
+# Share of the progress bar covered by page extraction and parsing
+EXTRACTION_SHARE = 90
+
+
+class IngestionJob:
+    """Progress of one document through extraction, parsing and indexing"""
+
+    def __init__(self, job_id, filename):
+        self.job_id = job_id
+        self.filename = filename
+        self.stage = 'queued'
+        self.pages_done = 0
+        self.page_count = 0
+        self.error = None
+        self.result = None
+        self.memory = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.stage in ('done', 'failed')
+
+    def set_stage(self, stage):
+        """Move the job to a new stage"""
+        if stage == 'extracting' and self.started_at is None:
+            self.started_at = time.time()
+        self.stage = stage
+
+    def page_done(self, page):
+        """Record that a page has been extracted and parsed"""
+        self.pages_done = page.page_number
+        self.page_count = page.page_count
+
+    def progress_percent(self):
+        if self.stage == 'done':
+            return 100
+        if self.stage in ('queued', 'failed') or not self.page_count:
+            return 0
+        if self.stage == 'extracting':
+            return round(EXTRACTION_SHARE * self.pages_done / self.page_count)
+        return EXTRACTION_SHARE + (5 if self.stage == 'parsing' else 8)
+
+    def to_dict(self):
+        """Progress payload for the /progress endpoint"""
+        end = self.finished_at or time.time()
+        status = {'done': 'completed', 'failed': 'error'}.get(self.stage, 'processing')
+        return {
+            'file_id': self.job_id,
+            'job_id': self.job_id,
+            'filename': self.filename,
+            'status': status,
+            'stage': self.stage,
+            'current_stage': self.stage,
+            'progress': self.progress_percent(),
+            'pages_done': self.pages_done,
+            'page_count': self.page_count,
+            'elapsed_time': f"{end - (self.started_at or self.created_at):.1f}s",
+            'queued_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'memory': self.memory.to_dict() if self.memory else None,
+            'error': self.error,
+            'processing_result': self.result
+        }
+
+
+class JobManager:
+    """Runs ingestion jobs on a bounded thread pool"""
+
+    def __init__(self, max_workers=INGESTION_WORKERS, max_queued=MAX_QUEUED_JOBS):
+        self.jobs = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ingest')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self._lock = threading.Lock()
+
+    def submit(self, job_id, filename, work):
+        """Queue work(job) for a document; returns None when the queue is full"""
+        if not self._slots.acquire(blocking=False):
+            print(f"⚠️ Ingestion queue full, rejecting {filename}")
+            return None
+
+        job = IngestionJob(job_id, filename)
+        with self._lock:
+            self.jobs[job_id] = job
+            self._prune()
+        self._executor.submit(self._run, job, work)
+        print(f"📥 Queued ingestion job {job_id} for {filename}")
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def pending(self):
+        """Number of jobs not yet done or failed"""
+        return sum(1 for job in list(self.jobs.values()) if not job.finished)
+
+    def _run(self, job, work):
+        try:
+            job.set_stage('extracting')
+            job.result = work(job)
+            job.set_stage('done')
+            print(f"✅ Ingestion job {job.job_id} done in {time.time() - job.started_at:.1f}s")
+        except Exception as e:
+            print(f"❌ Ingestion job {job.job_id} failed: {e}")
+            traceback.print_exc()
+            job.error = str(e)
+            job.set_stage('failed')
+        finally:
+            job.finished_at = time.time()
+            self._slots.release()
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond MAX_FINISHED_JOBS"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+🔎 KEYWORD SCANNER
+✅ Every keyword list a parser checks is matched in one pass over the text
+✅ Aho-Corasick automaton (pyahocorasick) when installed, one compiled regex otherwise
+✅ Overlapping keywords all found ("ct scan" and "scan"), with their positions
+✅ Built once at import, shared by every document
+"""
+
+import re
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+class KeywordScanner:
+    """Find the keywords of several named rules in one pass over lower-cased text
+
+    rules maps a rule name to its keywords. scan(text) returns
+    {keyword: [start, ...]} for every keyword present, positions ascending;
+    found(hits, rule) picks out the keywords of one rule. Keywords match as
+    plain substrings, as `keyword in text` does. With pyahocorasick the scan
+    runs an Aho-Corasick automaton. Without it, one alternation regex (longest
+    keyword first) is searched again from the character after each hit, so
+    overlapping hits are found, and the shorter keywords that are prefixes of
+    a hit are reported with it.
+    """
+
+    def __init__(self, rules, use_automaton=None):
+        self.rules = {name: tuple(dict.fromkeys(keyword.lower() for keyword in keywords))
+                      for name, keywords in rules.items()}
+        self.keywords = sorted({keyword for keywords in self.rules.values() for keyword in keywords},
+                               key=lambda keyword: (-len(keyword), keyword))
+        self.use_automaton = AHOCORASICK_AVAILABLE if use_automaton is None else use_automaton
+
+        if self.use_automaton:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        else:
+            self._pattern = re.compile('|'.join(map(re.escape, self.keywords)))
+            self._prefixes = {keyword: [other for other in self.keywords
+                                        if len(other) < len(keyword) and keyword.startswith(other)]
+                              for keyword in self.keywords}
+
+    def scan(self, text):
+        """{keyword: [start, ...]} for the keywords present in text"""
+        hits = {}
+        if not self.keywords:
+            return hits
+        if self.use_automaton:
+            for end, keyword in self._automaton.iter(text):
+                hits.setdefault(keyword, []).append(end - len(keyword) + 1)
+        else:
+            search = self._pattern.search
+            match = search(text)
+            while match:
+                keyword = match.group()
+                start = match.start()
+                hits.setdefault(keyword, []).append(start)
+                for prefix in self._prefixes[keyword]:
+                    hits.setdefault(prefix, []).append(start)
+                match = search(text, start + 1)
+        return hits
+
+    def found(self, hits, rule):
+        """Keywords of one rule present in a scan() result, in the rule's order"""
+        return [keyword for keyword in self.rules[rule] if keyword in hits]
@@ -12,11 +12,38 @@ import traceback
 import uuid
 import re
 import os
+import threading
 from datetime import datetime
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, Request, Response, request, jsonify, make_response, stream_with_context
 from flask_cors import CORS
 
+from document_store import DOCUMENT_EXTENSIONS, DocumentStore, UploadRejected, UploadStream, file_id_for, hash_file, save_stream
+from pdf_extraction import extraction_stats, iter_pages
+from document_formats import can_extract, iter_document_pages, split_mailbox, split_stored_mailboxes
+from memory_budget import MemoryTracker
+from boilerplate import BoilerplateStripper
+from schedule_tables import ScheduleTableReader
+from parse_sandbox import ParserSandbox, sandbox_workers
+from clause_pipeline import StreamingClauseParser, parse_text
+from clause_segments import classify_segment, segment_text, split_items
+from clause_records import document_clause_index, recorder_for
+from keyword_scanner import KeywordScanner
+from query_parser import QueryParser
+from query_cache import QueryCache
+from waiting_periods import WaitingPeriodTable, document_waiting_table, scan_waiting_periods
+from amounts import AMOUNT_GROUP, copay_percent, describe, normalize_clause_amounts, parse_amount
+from reparse import load_cached_parse, page_layout, reparse_stale
+from upload_watcher import UploadWatcher
+from bulk_ingest import BULK_UPLOAD_WORKERS, collect, directory_items, is_allowed, iter_bulk_results, ndjson_lines, resolve_import_directory
+
+class UploadRequest(Request):
+    """Request whose uploaded files are hashed, size-checked and sniffed as they are received"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadStream(UPLOAD_FOLDER, filename or 'upload')
+
 app = Flask(__name__)
+app.request_class = UploadRequest
 CORS(app)
 
 # Ensure uploads directory exists
@@ -59,6 +86,22 @@ except ImportError:
 # Document storage for dynamic processing
 uploaded_documents = {}
 
+# Bump whenever clause parsing changes so cached parses are recomputed
+PARSER_VERSION = 11
+
+# Parsed documents keyed by content hash; uploaded_documents entries are aliases
+document_store = DocumentStore(UPLOAD_FOLDER, parser_name='complete_intelligent', parser_version=PARSER_VERSION)
+
+# Extraction and clause parsing run in time- and memory-limited worker processes,
+# enough of them that bulk uploads are not held back (PARSE_WORKERS overrides)
+parser_sandbox = ParserSandbox(workers=sandbox_workers(BULK_UPLOAD_WORKERS))
+
+# Parse stored documents in a background thread after startup (otherwise only on first access)
+BACKGROUND_WARMUP = os.environ.get('DOCUMENT_WARMUP', '1') != '0'
+
+# Watch UPLOAD_FOLDER for PDFs added, changed or removed by other processes
+WATCH_UPLOADS = os.environ.get('WATCH_UPLOADS', '0') == '1'
+
 # 🧠 SEMANTIC MAPPINGS FOR MEDICAL PROCEDURES
 PROCEDURE_MAPPINGS = {
     'IVF': ['in vitro fertilization', 'fertility treatment', 'assisted reproduction', 'ivf', 'artificial insemination', 'fertility procedure'],
@@ -72,6 +115,10 @@ PROCEDURE_MAPPINGS = {
     'consultation': ['doctor visit', 'medical consultation', 'physician visit', 'specialist consultation']
 }
 
+# Query parser with the procedure synonyms compiled in, shared by every request
+QUERY_PARSER = QueryParser(PROCEDURE_MAPPINGS)
+QUERY_CACHE = QueryCache(QUERY_PARSER.parse)
+
 # 📊 POLICY TYPE CLASSIFICATIONS
 POLICY_CLASSIFICATIONS = {
     'Standard Policy': {
@@ -91,90 +138,99 @@ POLICY_CLASSIFICATIONS = {
     }
 }
 
+# Waiting periods of each policy type in months, used when a document states none
+POLICY_WAITING_TABLES = {policy_type: WaitingPeriodTable.from_periods(rules['waiting_periods'])
+                         for policy_type, rules in POLICY_CLASSIFICATIONS.items()}
+
+# Clause patterns, compiled once and applied to each segment of a window of pages
+# Phrases introducing excluded text; clause_segments classifies what follows them
+EXCLUSION_TRIGGER = re.compile(
+    r'\b(?:the following (?:are|is) (?:not )?(?:covered|excluded)|this policy does not cover|'
+    r'not payable|will not pay|does not include|exclusions?|not covered|excluded|exceptions?)\b[:\-\s]*')
+
+COVERAGE_PATTERNS = [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in [
+    r'([a-zA-Z][^:\n]{3,50})[:\-]\s*(?:covered|coverage|benefit|included)\s*(?:up\s*to)?\s*' + AMOUNT_GROUP,
+    r'([a-zA-Z][^:\n]{3,50})\s+(?:covered|included)\s*' + AMOUNT_GROUP,
+    AMOUNT_GROUP + r'\s+(?:for|towards)\s+([a-zA-Z][^\n]{3,50})',
+    r'([a-zA-Z][^:\-\n]{3,50})\s*[\-–]\s*' + AMOUNT_GROUP,
+    r'([a-zA-Z][^:\n]{3,50})[:\-]\s*(?:covered|yes|included|available|payable)'
+]]
+
+# Keywords behind policy typing; the streaming parser records which ones occur
+FERTILITY_KEYWORDS = ['fertility', 'ivf', 'in vitro', 'reproductive', 'infertility', 'conception']
+PREMIUM_KEYWORDS = ['premium', 'comprehensive', 'deluxe', 'platinum', 'enhanced']
+
+# Every keyword rule, matched in one pass over each window of text
+KEYWORD_SCANNER = KeywordScanner({'fertility': FERTILITY_KEYWORDS, 'premium': PREMIUM_KEYWORDS})
+
 class DocumentProcessor:
     """Complete Document Processing Module"""
     
     @staticmethod
     def extract_text_from_pdf(file_path):
         """Extract text from PDF using multiple methods for robustness"""
-        text_content = ""
-        
         if not PDF_PROCESSING:
             return "PDF processing not available. Install pdfplumber and PyPDF2."
         
-        # Method 1: Try pdfplumber (better for formatted text)
-        try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_content += page_text + "\n"
-            if text_content.strip():
-                print(f"✅ PDF extracted using pdfplumber ({len(text_content)} chars)")
-                return text_content
-        except Exception as e:
-            print(f"⚠️ pdfplumber failed: {e}")
-        
-        # Method 2: Fallback to PyPDF2
-        try:
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    text_content += page.extract_text() + "\n"
-            if text_content.strip():
-                print(f"✅ PDF extracted using PyPDF2 ({len(text_content)} chars)")
-                return text_content
-        except Exception as e:
-            print(f"❌ PyPDF2 failed: {e}")
+        # pdfplumber page by page (process pool for large files), PyPDF2 from the first failing page
+        text_content = "".join(page.text + "\n" for page in iter_pages(file_path))
+        if text_content.strip():
+            print(f"✅ PDF extracted ({len(text_content)} chars)")
+            return text_content
         
         return "Unable to extract text from PDF"
     
     @staticmethod
-    def extract_policy_clauses(text_content):
-        """Dynamically parse inclusion and exclusion clauses from document text"""
-        print("🔍 Parsing insurance clauses from document...")
-        
-        clauses = {
+    def new_clauses():
+        """Empty clause structure filled in by the parser"""
+        return {
             'inclusions': {},
             'exclusions': [],
             'waiting_periods': {},
+            'waiting_period_months': {},
             'coverage_amounts': {},
             'policy_info': {}
         }
+    
+    @staticmethod
+    def scan_clause_window(window_text, accept, clauses, state):
+        """Segment a window of text and classify the segments accept() lets through"""
+        for segment in segment_text(window_text):
+            if accept(segment):
+                DocumentProcessor.scan_segment(segment, clauses, state)
+        
+        # Policy type keywords seen anywhere in the document
+        keywords_found = state.setdefault('keywords_found', set())
+        keywords_found.update(KEYWORD_SCANNER.scan(window_text.lower()))
+        
+        # Co-payment share, first occurrence wins
+        if 'co_payment_percent' not in clauses['policy_info']:
+            copay = copay_percent(window_text)
+            if copay is not None:
+                clauses['policy_info']['co_payment_percent'] = copay
+    
+    @staticmethod
+    def scan_segment(segment, clauses, state):
+        """Record the exclusions, or else the coverage, stated in one segment"""
+        recorder = recorder_for(state)
+        if segment.kind == 'heading':
+            recorder.enter_heading(segment)
         
-        text_lower = text_content.lower()
-        lines = [line.strip() for line in text_content.split('\n') if line.strip()]
+        # Waiting periods, as required months per procedure category
+        scan_waiting_periods(segment, clauses, recorder)
         
         # Enhanced exclusion parsing
-        exclusion_patterns = [
-            r'(?:exclusions?|not covered|excluded|exceptions?)[:\-\s]*(.+?)(?:\n\n|\d+\.|\bsection\b|\bcoverage\b|$)',
-            r'(?:the following (?:are|is) (?:not )?(?:covered|excluded))[:\-\s]*(.+?)(?:\n\n|\d+\.|\bsection\b|$)',
-            r'(?:this policy does not cover)[:\-\s]*(.+?)(?:\n\n|\d+\.|\bsection\b|$)',
-            r'(?:not payable|will not pay|does not include)[:\-\s]*(.+?)(?:\n\n|\d+\.|\bsection\b|$)'
-        ]
-        
-        for pattern in exclusion_patterns:
-            matches = re.finditer(pattern, text_lower, re.IGNORECASE | re.DOTALL)
-            for match in matches:
-                exclusion_text = match.group(1).strip()
-                exclusion_items = re.split(r'[;\n•\-\*]|(?:\d+\.)', exclusion_text)
-                for item in exclusion_items:
-                    item = item.strip().rstrip('.,')
-                    if len(item) > 5 and len(item) < 200:
-                        clauses['exclusions'].append(item)
+        exclusion_text = classify_segment(segment, state, EXCLUSION_TRIGGER)
+        if exclusion_text:
+            for item in split_items(exclusion_text):
+                if len(item) > 5 and len(item) < 200:
+                    clauses['exclusions'].append(item)
+                    recorder.note('exclusion', item, segment.start, segment.end, keep_first=True)
+            return
         
         # Enhanced inclusion/coverage parsing with multiple patterns
-        coverage_patterns = [
-            r'([a-zA-Z][^:\n]{3,50})[:\-]\s*(?:covered|coverage|benefit|included)\s*(?:up\s*to)?\s*₹?\s*(\d+(?:,\d{3})*)',
-            r'([a-zA-Z][^:\n]{3,50})\s+(?:covered|included)\s*₹?\s*(\d+(?:,\d{3})*)',
-            r'₹?\s*(\d+(?:,\d{3})*)\s+(?:for|towards)\s+([a-zA-Z][^\n]{3,50})',
-            r'([a-zA-Z][^:\-\n]{3,50})\s*[\-–]\s*₹?\s*(\d+(?:,\d{3})*)',
-            r'([a-zA-Z][^:\n]{3,50})[:\-]\s*(?:covered|yes|included|available|payable)'
-        ]
-        
-        for i, pattern in enumerate(coverage_patterns):
-            matches = re.finditer(pattern, text_content, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
+        for i, pattern in enumerate(COVERAGE_PATTERNS):
+            for match in pattern.finditer(segment.text):
                 try:
                     if i < 4:  # First 4 patterns have amount
                         if i == 2:  # Pattern 3: amount comes first
@@ -184,30 +240,32 @@ class DocumentProcessor:
                             service = match.group(1).strip().lower()
                             amount_str = match.group(2) if len(match.groups()) > 1 else "0"
                         
-                        amount_str = re.sub(r'[,₹\s]', '', amount_str)
-                        amount = int(amount_str) if amount_str.isdigit() else 0
+                        amount = parse_amount(amount_str, bare=True)
                     else:  # Pattern 5: no amount, just coverage
                         service = match.group(1).strip().lower()
-                        amount = 1  # Indicates coverage without specific amount
+                        amount = None  # Coverage without a specific amount
                     
                     service = re.sub(r'^\W+|\W+$', '', service)
                     service = re.sub(r'\s+', ' ', service)
                     
                     if len(service) > 3 and service not in ['the', 'and', 'for', 'with']:
-                        clauses['inclusions'][service] = amount
-                        if amount > 1:
-                            clauses['coverage_amounts'][service] = f"₹{amount:,}"
-                        else:
-                            clauses['coverage_amounts'][service] = "Covered"
+                        clauses['inclusions'][service] = amount.value if amount and amount.value else 1
+                        recorder.note('inclusion', service, segment.start + match.start(), segment.start + match.end())
+                        clauses['coverage_amounts'][service] = describe(amount)
                         
                 except (ValueError, IndexError, AttributeError):
                     continue
+    
+    @staticmethod
+    def finalize_clauses(clauses, state):
+        """Classify the policy and clean up exclusions once every page has been scanned"""
+        keywords_found = state.get('keywords_found', set())
         
         # Policy type detection
         policy_type = "Standard Policy"  # Default
-        if any(term in text_lower for term in ['fertility', 'ivf', 'reproductive']):
+        if keywords_found & {'fertility', 'ivf', 'reproductive'}:
             policy_type = "Fertility Policy"
-        elif any(term in text_lower for term in ['premium', 'comprehensive', 'deluxe']):
+        elif keywords_found & {'premium', 'comprehensive', 'deluxe'}:
             policy_type = "Premium Policy"
         
         clauses['policy_info']['type'] = policy_type
@@ -215,12 +273,16 @@ class DocumentProcessor:
         
         # Clean up exclusions
         cleaned_exclusions = []
-        for exclusion in clauses['exclusions']:
-            exclusion = exclusion.strip().rstrip('.,;')
-            if len(exclusion) > 5 and exclusion not in cleaned_exclusions:
+        seen = set()
+        recorder = recorder_for(state)
+        for item in clauses['exclusions']:
+            exclusion = item.strip().rstrip('.,;')
+            if len(exclusion) > 5 and exclusion not in seen:
                 exclusion = re.sub(r'^(?:and|or|the|a|an)\s+', '', exclusion, flags=re.IGNORECASE)
-                if exclusion and exclusion not in cleaned_exclusions:
+                if exclusion and exclusion not in seen:
                     cleaned_exclusions.append(exclusion)
+                    seen.add(exclusion)
+                    recorder.rename('exclusion', item, exclusion)
         
         clauses['exclusions'] = cleaned_exclusions[:50]
         
@@ -230,112 +292,186 @@ class DocumentProcessor:
         return clauses
     
     @staticmethod
-    def identify_policy_type(text_content):
-        """Identify policy type from document content"""
-        text_lower = text_content.lower()
-        
+    def extract_policy_clauses(text_content):
+        """Dynamically parse inclusion and exclusion clauses from document text"""
+        print("🔍 Parsing insurance clauses from document...")
+        return normalize_clause_amounts(parse_text(text_content, DocumentProcessor.new_clauses,
+                                                   DocumentProcessor.scan_clause_window,
+                                                   DocumentProcessor.finalize_clauses))
+    
+    @staticmethod
+    def policy_type_from_keywords(keywords_found):
+        """Score policy types from the set of type keywords present in a document"""
         # Score each policy type based on keyword presence
         scores = {'Standard Policy': 0, 'Fertility Policy': 0, 'Premium Policy': 0}
         
         # Fertility policy indicators
-        fertility_keywords = ['fertility', 'ivf', 'in vitro', 'reproductive', 'infertility', 'conception']
-        scores['Fertility Policy'] += sum(1 for keyword in fertility_keywords if keyword in text_lower)
+        scores['Fertility Policy'] += sum(1 for keyword in FERTILITY_KEYWORDS if keyword in keywords_found)
         
         # Premium policy indicators
-        premium_keywords = ['premium', 'comprehensive', 'deluxe', 'platinum', 'enhanced']
-        scores['Premium Policy'] += sum(1 for keyword in premium_keywords if keyword in text_lower)
+        scores['Premium Policy'] += sum(1 for keyword in PREMIUM_KEYWORDS if keyword in keywords_found)
         
         # Standard policy (default with slight preference)
         scores['Standard Policy'] += 1
         
         return max(scores, key=scores.get)
+    
+    @staticmethod
+    def identify_policy_type(text_content):
+        """Identify policy type from document content"""
+        return DocumentProcessor.policy_type_from_keywords(set(KEYWORD_SCANNER.scan(text_content.lower())))
+    
+    @staticmethod
+    def parse_pages(page_bodies, schedules):
+        """Clause fields from (page, body) pairs, body being the page as the clause regexes see it"""
+        parser = StreamingClauseParser(DocumentProcessor.new_clauses,
+                                       DocumentProcessor.scan_clause_window, DocumentProcessor.finalize_clauses)
+        pages = []
+        for page, body in page_bodies:
+            parser.feed(body)
+            pages.append(page)
+        
+        clauses = normalize_clause_amounts(schedules.apply(parser.finish()))
+        clause_index = recorder_for(parser.state).build(clauses, pages, schedules.rows)
+        return pages, {
+            'clauses': clauses,
+            'clause_records': clause_index.to_rows(),
+            'policy_type': DocumentProcessor.policy_type_from_keywords(parser.state.get('keywords_found', set())),
+            'layout': page_layout(pages, schedules)
+        }
+    
+    @staticmethod
+    def process_document(file_path):
+        """Stream a document page by page into the clause parser and return the stored fields"""
+        print("🔍 Parsing insurance clauses page by page...")
+        memory = MemoryTracker()
+        boilerplate = BoilerplateStripper()
+        schedules = ScheduleTableReader(file_path)
+        
+        try:
+            page_bodies = ((page, schedules.body_page(page))
+                           for page in iter_document_pages(file_path, memory, boilerplate))
+            pages, fields = DocumentProcessor.parse_pages(page_bodies, schedules)
+        finally:
+            schedules.close()
+        
+        text_content = "".join(page.text + "\n" for page in pages) or "Unable to extract text from document"
+        memory.sample()
+        
+        return dict(fields, text_content=text_content,
+                    extraction=extraction_stats(pages, memory, boilerplate, schedules))
+    
+    @staticmethod
+    def reparse_cached_document(cache_path):
+        """Clause fields of a cached parse, re-parsed from its stored text without extracting the file again"""
+        page_bodies, schedules = load_cached_parse(cache_path)
+        return DocumentProcessor.parse_pages(page_bodies, schedules)[1]
+
+def register_document(file_id, filename, content_hash, file_path, file_size, upload_time=None):
+    """Alias file_id to the stored document for content_hash, parsing it on first sight"""
+    stored, cache_hit = document_store.get_or_parse(
+        content_hash, file_path, lambda path: parser_sandbox.run(DocumentProcessor.process_document, path, key=content_hash),
+        lambda cache_path: parser_sandbox.run(DocumentProcessor.reparse_cached_document, cache_path, key=content_hash))
+    
+    uploaded_documents[file_id] = {
+        'filename': filename,
+        'file_path': stored['file_path'],
+        'content_hash': content_hash,
+        'text': stored['text'],
+        'text_length': stored['text_length'],
+        'clauses': stored['clauses'],
+        'clause_index': document_clause_index(stored),
+        'waiting_table': document_waiting_table(stored, document_clause_index(stored)),
+        'upload_time': upload_time or datetime.now().isoformat(),
+        'file_size': file_size,
+        'policy_type': stored['policy_type'],
+        'extraction': stored['extraction'],
+        'warm': True
+    }
+    
+    return uploaded_documents[file_id], cache_hit
+
+def register_mailbox(file_path):
+    """Register each message of a saved mbox as its own document; returns one summary per message"""
+    messages = []
+    for filename, content_hash, message_path, message_size in split_mailbox(file_path, UPLOAD_FOLDER, document_store):
+        # Stored as "<content_hash>_<name>", so scan() gives a message this file_id after a restart
+        doc_data, cache_hit = register_document(content_hash, filename, content_hash, message_path, message_size)
+        messages.append({'file_id': content_hash, 'filename': filename, 'policy_type': doc_data['policy_type'],
+                         'cached': cache_hit})
+    print(f"📬 Registered {len(messages)} messages of {os.path.basename(file_path)}")
+    return messages
+
+def register_stub(file_id, filename, content_hash, file_path, file_size, upload_time):
+    """Register a stored document without parsing it; warm_document() fills it in"""
+    uploaded_documents[file_id] = {
+        'filename': filename,
+        'file_path': file_path,
+        'content_hash': content_hash,
+        'upload_time': upload_time,
+        'file_size': file_size,
+        'warm': False
+    }
+
+def warm_document(file_id):
+    """Return the parsed entry for file_id, parsing a cold stub on first access"""
+    doc_data = uploaded_documents[file_id]
+    if doc_data['warm']:
+        return doc_data
+    
+    content_hash = doc_data['content_hash']
+    if content_hash is None:
+        # Stubs from the lazy scan are hashed here; the alias indexes the hash and
+        # keeps the next startup from reading the file again
+        content_hash = hash_file(doc_data['file_path'])
+        document_store.record_alias(file_id, doc_data['filename'], content_hash, doc_data['file_path'],
+                                    doc_data['file_size'], doc_data['upload_time'])
+    doc_data, cache_hit = register_document(file_id, doc_data['filename'], content_hash,
+                                            doc_data['file_path'], doc_data['file_size'], doc_data['upload_time'])
+    print(f"🔥 Warmed: {doc_data['filename']}{' [cached]' if cache_hit else ''}")
+    return doc_data
+
+def warm_up_documents():
+    """Parse every cold stub, oldest registration first"""
+    started = datetime.now()
+    # Parses cached by an older parser version are first brought up to date from their stored text
+    reparse_stale(document_store, DocumentProcessor.reparse_cached_document, parser_sandbox)
+    for file_id in [fid for fid, doc in list(uploaded_documents.items()) if not doc['warm']]:
+        try:
+            warm_document(file_id)
+        except Exception as e:
+            print(f"❌ Error warming {uploaded_documents[file_id]['filename']}: {e}")
+    print(f"🔥 Warm-up finished: {len(document_store)} unique documents in {(datetime.now() - started).total_seconds():.1f}s")
+
+# Set once stubs are registered; the warm-up itself starts after import (see start_warm_up)
+warm_up_pending = False
+_warm_up_lock = threading.Lock()
+
+def start_warm_up():
+    """Start the background warm-up once, after this module has finished importing
+
+    The warm-up forks sandbox workers, and a child forked from a thread while
+    the module is still importing deadlocks on the import lock. It starts from
+    __main__, or on the first request when a WSGI server imports the module.
+    """
+    global warm_up_pending
+    with _warm_up_lock:
+        if not warm_up_pending:
+            return
+        warm_up_pending = False
+    threading.Thread(target=warm_up_documents, name='document-warmup', daemon=True).start()
 
 class QueryProcessor:
     """Advanced Natural Language Query Processing Engine"""
     
     @staticmethod
     def extract_user_info(query):
-        """Extract structured information from natural language query"""
-        query_lower = query.lower()
-        extracted = {}
-        
+        """Extract structured information from natural language query
+
+        Parsed once per canonical query form; repeats are served read-only from QUERY_CACHE.
+        """
         print(f"🔍 Extracting user information from: '{query}'")
-        
-        # Age extraction with multiple patterns
-        age_patterns = [
-            r'(\d+)\s*(?:year|yr)s?\s*old',
-            r'(\d+)(?:y|Y|F|M)\b',
-            r'age\s*[:\-]?\s*(\d+)',
-            r'\b(\d+)\s*(?:year|yr)s?(?:\s+old)?'
-        ]
-        
-        for pattern in age_patterns:
-            match = re.search(pattern, query)
-            if match:
-                age = int(match.group(1))
-                if 0 < age < 120:  # Reasonable age range
-                    extracted['age'] = age
-                    break
-        
-        # Gender extraction
-        gender_patterns = [
-            r'\b(?:\d+)?([mf])\b',  # "25F", "45M", "F", "M"
-            r'\b(male|female|man|woman)\b',
-            r'\b(pregnant)\b'  # Implies female
-        ]
-        
-        for pattern in gender_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                gender_text = match.group(1).lower()
-                if gender_text in ['f', 'female', 'woman', 'pregnant']:
-                    extracted['gender'] = 'female'
-                elif gender_text in ['m', 'male', 'man']:
-                    extracted['gender'] = 'male'
-                break
-        
-        # Procedure extraction using semantic mapping
-        best_procedure = None
-        best_score = 0
-        
-        for category, synonyms in PROCEDURE_MAPPINGS.items():
-            for synonym in synonyms:
-                if synonym.lower() in query_lower:
-                    score = len(synonym) * 2  # Longer matches get higher scores
-                    if score > best_score:
-                        best_score = score
-                        best_procedure = category
-        
-        if best_procedure:
-            extracted['procedure'] = best_procedure
-            extracted['procedure_confidence'] = min(95, best_score)
-        else:
-            # Fallback: extract any medical-sounding terms
-            medical_terms = re.findall(r'\b(?:treatment|surgery|procedure|therapy|care|consultation|test|scan|operation|visit)\b', query_lower)
-            if medical_terms:
-                extracted['procedure'] = f"medical {medical_terms[0]}"
-                extracted['procedure_confidence'] = 60
-        
-        # Policy duration extraction
-        duration_patterns = [
-            r'(?:policy|coverage).*?(\d+)\s*(?:year|yr|month)s?',
-            r'active.*?(?:since|for).*?(\d+)\s*(?:year|yr|month)s?',
-            r'(\d+)\s*(?:year|yr|month)s?.*?(?:policy|coverage)'
-        ]
-        
-        for pattern in duration_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                duration = int(match.group(1))
-                unit = 'years' if 'year' in match.group(0) or 'yr' in match.group(0) else 'months'
-                extracted['policy_duration'] = f"{duration} {unit}"
-                break
-        
-        # Medical history indicators
-        history_keywords = ['history', 'previous', 'past', 'chronic', 'existing']
-        if any(keyword in query_lower for keyword in history_keywords):
-            extracted['has_medical_history'] = True
-        
+        extracted = QUERY_CACHE(query)
         print(f"📊 Extracted info: {extracted}")
         return extracted
 
@@ -426,7 +562,7 @@ class DecisionEngine:
     """Intelligent Decision Engine with Confusion Matrix Classification"""
     
     @staticmethod
-    def make_decision(matches, extracted_info, document_clauses):
+    def make_decision(matches, extracted_info, document_clauses, waiting_table=None):
         """Make intelligent coverage decision with confusion matrix classification"""
         
         # Determine actual coverage (ground truth)
@@ -451,9 +587,11 @@ class DecisionEngine:
             'actual_coverage': actual_coverage,
             'system_reasoning': system_decision['reasoning'],
             'best_match_clause': system_decision.get('best_clause'),
+            'best_match_clause_id': system_decision.get('best_clause_id'),
             'similarity_score': system_decision.get('similarity_score', 0),
             'policy_type': policy_type,
-            'waiting_period_check': DecisionEngine._check_waiting_period(user_procedure, extracted_info, policy_type)
+            'waiting_period_check': DecisionEngine._check_waiting_period(user_procedure, extracted_info, policy_type,
+                                                                         waiting_table)
         }
         
         return response
@@ -498,15 +636,18 @@ class DecisionEngine:
             }
         
         best_match = matches[0]
+        citation = best_match.get('citation')
+        cited = f" [{citation['clause_id']}, page {citation['page']}]" if citation else ""
         
         if best_match['type'] == 'exclusion':
             return {
                 'decision': 'REJECTED',
                 'amount': 0,
                 'confidence': best_match['confidence'],
-                'justification': f"Procedure excluded under policy clause: '{best_match['clause']}'",
+                'justification': f"Procedure excluded under policy clause: '{best_match['clause']}'{cited}",
                 'reasoning': 'explicit_exclusion',
                 'best_clause': best_match['clause'],
+                'best_clause_id': citation['clause_id'] if citation else None,
                 'similarity_score': best_match['confidence']
             }
         
@@ -516,9 +657,10 @@ class DecisionEngine:
                 'decision': 'APPROVED',
                 'amount': amount if amount > 1 else 0,
                 'confidence': best_match['confidence'],
-                'justification': f"Procedure covered under policy clause: '{best_match['clause']}'" + (f" with coverage amount ₹{amount:,}" if amount > 1 else ""),
+                'justification': f"Procedure covered under policy clause: '{best_match['clause']}'{cited}" + (f" with coverage amount ₹{amount:,}" if amount > 1 else ""),
                 'reasoning': 'explicit_inclusion',
                 'best_clause': best_match['clause'],
+                'best_clause_id': citation['clause_id'] if citation else None,
                 'similarity_score': best_match['confidence']
             }
         
@@ -550,82 +692,111 @@ class DecisionEngine:
             return 'UNKNOWN'
     
     @staticmethod
-    def _check_waiting_period(procedure, extracted_info, policy_type):
-        """Check if waiting period requirements are met"""
-        policy_rules = POLICY_CLASSIFICATIONS.get(policy_type, {})
-        waiting_periods = policy_rules.get('waiting_periods', {})
-        
-        policy_duration = extracted_info.get('policy_duration', '')
-        
-        # Extract duration in months
-        duration_months = 0
-        if 'month' in policy_duration:
-            duration_months = int(re.search(r'(\d+)', policy_duration).group(1))
-        elif 'year' in policy_duration:
-            years = int(re.search(r'(\d+)', policy_duration).group(1))
-            duration_months = years * 12
-        
-        # Check waiting period for procedure type
-        procedure_type = procedure.lower()
-        for wait_type, wait_period in waiting_periods.items():
-            if wait_type.lower() in procedure_type:
-                required_months = int(re.search(r'(\d+)', wait_period).group(1))
-                if 'year' in wait_period:
-                    required_months *= 12
-                
-                return {
-                    'required_waiting_period': wait_period,
-                    'policy_duration_months': duration_months,
-                    'waiting_period_met': duration_months >= required_months,
-                    'waiting_period_applicable': True
-                }
-        
-        return {'waiting_period_applicable': False}
+    def _check_waiting_period(procedure, extracted_info, policy_type, waiting_table=None):
+        """Check if waiting period requirements are met
+        
+        The document's own waiting-period table is consulted first, then the
+        policy type's defaults; both hold required months, parsed at ingest.
+        """
+        waiting = waiting_table.lookup(procedure) if waiting_table else None
+        if waiting is None:
+            default_table = POLICY_WAITING_TABLES.get(policy_type)
+            waiting = default_table.lookup(procedure) if default_table else None
+        if waiting is None:
+            return {'waiting_period_applicable': False}
+        
+        duration_months = extracted_info.get('policy_duration_months', 0)
+        return {
+            'required_waiting_period': waiting.period,
+            'required_waiting_months': waiting.months,
+            'policy_duration_months': duration_months,
+            'waiting_period_met': duration_months >= waiting.months,
+            'waiting_period_applicable': True,
+            'clause_id': waiting.clause_id,
+            'citation': waiting.citation
+        }
 
 def load_existing_documents():
-    """Load existing documents from uploads folder on server startup"""
+    """Register documents in the uploads folder as stubs for the background warm-up"""
+    global warm_up_pending
     print("🔄 Loading existing documents from uploads folder...")
     
     if not os.path.exists(UPLOAD_FOLDER):
         print("📂 No uploads folder found")
         return
     
-    files = os.listdir(UPLOAD_FOLDER)
-    pdf_files = [f for f in files if f.endswith('.pdf')]
+    if not PDF_PROCESSING:
+        print("⚠️ PDF processing disabled, skipping stored PDFs")
     
-    print(f"📄 Found {len(pdf_files)} PDF files in uploads folder")
+    # Mailboxes become one stored .eml per message before the folder is listed
+    split_stored_mailboxes(UPLOAD_FOLDER, document_store)
     
-    for filename in pdf_files[:5]:  # Load first 5 to avoid startup delays
-        try:
-            file_id = str(uuid.uuid4())
-            file_path = os.path.join(UPLOAD_FOLDER, filename)
-            file_size = os.path.getsize(file_path)
-            
-            if PDF_PROCESSING:
-                text_content = DocumentProcessor.extract_text_from_pdf(file_path)
-                clauses = DocumentProcessor.extract_policy_clauses(text_content)
-                
-                uploaded_documents[file_id] = {
-                    'filename': filename,
-                    'file_path': file_path,
-                    'text_content': text_content,
-                    'clauses': clauses,
-                    'upload_time': datetime.now().isoformat(),
-                    'file_size': file_size
-                }
-                
-                print(f"✅ Loaded: {filename} ({file_size} bytes)")
-            else:
-                print(f"⚠️ PDF processing disabled, skipping: {filename}")
-                
-        except Exception as e:
-            print(f"❌ Error loading {filename}: {e}")
+    # Only the directory and alias index are read here so the server can bind
+    # immediately; documents are parsed on first access or by the warm-up thread
+    for file_id, filename, content_hash, file_path, file_size, upload_time in document_store.scan(hash_files=False):
+        if not can_extract(filename):
+            continue
+        register_stub(file_id, filename, content_hash, file_path, file_size, upload_time)
+    
+    print(f"📋 Total documents registered: {len(uploaded_documents)} (parsed on demand)")
+    
+    warm_up_pending = BACKGROUND_WARMUP and bool(uploaded_documents)
+
+def release_document(content_hash):
+    """Evict a parsed document from the store once no file_id refers to it"""
+    if content_hash and not any(doc['content_hash'] == content_hash for doc in list(uploaded_documents.values())):
+        document_store.evict(content_hash)
+
+def ingest_watched_file(file_path, content_hash):
+    """Register a document dropped into the uploads folder, or re-parse one whose content changed"""
+    filename = os.path.basename(file_path)
+    if filename.startswith(f"{content_hash}_"):
+        return  # saved by /upload and registered under its upload file_id
+    if filename.lower().endswith('.mbox'):
+        register_mailbox(file_path)
+        return
     
-    print(f"📋 Total documents loaded: {len(uploaded_documents)}")
+    file_id, original_name = file_id_for(filename)
+    previous = uploaded_documents.get(file_id)
+    upload_time = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+    doc_data, cache_hit = register_document(file_id, original_name, content_hash, file_path,
+                                            os.path.getsize(file_path), upload_time)
+    print(f"✅ Ingested from uploads folder: {original_name}{' [cached]' if cache_hit else ''}")
+    if previous and previous['content_hash'] != content_hash:
+        release_document(previous['content_hash'])
+
+def evict_watched_file(file_path):
+    """Drop every file_id that pointed at a file removed from the uploads folder"""
+    dropped_id, _ = file_id_for(os.path.basename(file_path))
+    removed = {file_id: doc for file_id, doc in list(uploaded_documents.items())
+               if doc['file_path'] == file_path or file_id == dropped_id}
+    for file_id in removed:
+        uploaded_documents.pop(file_id, None)
+    document_store.remove_aliases(list(removed))
+    for doc in removed.values():
+        release_document(doc['content_hash'])
+    if removed:
+        print(f"🗑️ Evicted {len(removed)} document(s) for {os.path.basename(file_path)}")
 
-# Load existing documents on startup
+def start_upload_watcher():
+    """Ingest or evict documents as other processes change the uploads folder"""
+    watcher = UploadWatcher(UPLOAD_FOLDER, ingest_watched_file, evict_watched_file)
+    watcher.seed({doc['file_path']: doc['content_hash'] for doc in list(uploaded_documents.values())
+                  if doc['content_hash']})
+    watcher.start()
+    return watcher
+
+# Register existing documents on startup
 load_existing_documents()
 
+# Pick up documents added to or removed from the uploads folder while running
+upload_watcher = start_upload_watcher() if WATCH_UPLOADS and PDF_PROCESSING else None
+
+@app.before_request
+def warm_up_on_first_request():
+    if warm_up_pending:
+        start_warm_up()
+
 @app.route('/upload', methods=['POST', 'OPTIONS'])
 def upload_file():
     """Handle file upload with comprehensive processing"""
@@ -648,55 +819,58 @@ def upload_file():
             return jsonify({'error': 'No file selected', 'status': 'failed'}), 400
         
         # Validate file type
-        allowed_extensions = {'.pdf', '.docx', '.txt'}
         file_ext = os.path.splitext(file.filename)[1].lower()
         
-        if file_ext not in allowed_extensions:
-            return jsonify({'error': f'File type {file_ext} not supported. Allowed: {", ".join(allowed_extensions)}', 'status': 'failed'}), 400
+        if file_ext not in DOCUMENT_EXTENSIONS:
+            return jsonify({'error': f'File type {file_ext} not supported. Allowed: {", ".join(DOCUMENT_EXTENSIONS)}', 'status': 'failed'}), 400
         
-        # Generate unique file ID and save file
+        # Generate unique file ID and keep the file, already hashed and checked while
+        # the request was received, in the content-addressed store
         file_id = str(uuid.uuid4())
-        file_path = os.path.join(UPLOAD_FOLDER, f"{file_id}_{file.filename}")
-        
-        file.save(file_path)
-        file_size = os.path.getsize(file_path)
+        try:
+            content_hash, file_path, file_size = save_stream(file.stream, UPLOAD_FOLDER, file.filename, document_store)
+        except UploadRejected as e:
+            return jsonify({'error': str(e), 'status': 'failed'}), e.status_code
         
         print(f"✅ File saved: {file_path} ({file_size} bytes)")
         
-        # Process document content
+        # Process document content; a mailbox becomes one document per message
         processing_result = None
-        if file_ext == '.pdf' and PDF_PROCESSING:
+        if file_ext == '.mbox':
             try:
-                print("🔍 Processing PDF content...")
-                text_content = DocumentProcessor.extract_text_from_pdf(file_path)
-                clauses = DocumentProcessor.extract_policy_clauses(text_content)
-                policy_type = DocumentProcessor.identify_policy_type(text_content)
-                
-                # Store the processed document
-                uploaded_documents[file_id] = {
-                    'filename': file.filename,
-                    'file_path': file_path,
-                    'text_content': text_content,
-                    'clauses': clauses,
-                    'upload_time': datetime.now().isoformat(),
-                    'file_size': file_size,
-                    'policy_type': policy_type
-                }
+                messages = register_mailbox(file_path)
+                processing_result = {'messages': len(messages), 'documents': messages}
+            except Exception as e:
+                print(f"⚠️ Mailbox processing failed: {e}")
+                processing_result = {'error': f'Mailbox processing failed: {str(e)}'}
+        elif can_extract(file.filename):
+            try:
+                print(f"🔍 Processing {file_ext[1:].upper()} content...")
+                doc_data, cache_hit = register_document(file_id, file.filename, content_hash, file_path, file_size)
+                document_store.record_alias(file_id, file.filename, content_hash, file_path, file_size, doc_data['upload_time'])
+                clauses = doc_data['clauses']
                 
                 processing_result = {
                     'inclusions_found': len(clauses['inclusions']),
                     'exclusions_found': len(clauses['exclusions']),
                     'policy_name': clauses['policy_info'].get('name', 'Unknown Policy'),
-                    'policy_type': policy_type,
+                    'policy_type': doc_data['policy_type'],
                     'waiting_periods': len(clauses['waiting_periods']),
-                    'text_length': len(text_content)
+                    'schedule_rows': len(clauses.get('benefit_schedule', [])),
+                    'clauses_indexed': len(doc_data['clause_index']),
+                    'text_length': doc_data['text_length'],
+                    'extractors': doc_data['extraction']['extractors'],
+                    'boilerplate_stripped': (doc_data['extraction'].get('boilerplate') or {}).get('stripped_ratio'),
+                    'memory': doc_data['extraction'].get('memory'),
+                    'content_hash': content_hash,
+                    'cached': cache_hit
                 }
                 
                 print(f"✅ Document processed: {processing_result}")
                 
             except Exception as e:
-                print(f"⚠️ PDF processing failed: {e}")
-                processing_result = {'error': f'PDF processing failed: {str(e)}'}
+                print(f"⚠️ Document processing failed: {e}")
+                processing_result = {'error': f'Document processing failed: {str(e)}'}
         
         response_data = {
             'file_id': file_id,
@@ -726,6 +900,84 @@ def upload_file():
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response
 
+def ingest_bulk_file(filename, source):
+    """Parse one file of a bulk upload; returns its per-file result
+    
+    source is the (content_hash, file_path, file_size) of an uploaded file
+    already saved to the store, the UploadRejected raised while receiving it,
+    or the path of a file to import.
+    """
+    if isinstance(source, UploadRejected):
+        raise source
+    file_id = str(uuid.uuid4())
+    if isinstance(source, str):
+        with open(source, 'rb') as stream:
+            source = save_stream(stream, UPLOAD_FOLDER, filename, document_store)
+    content_hash, file_path, file_size = source
+    if file_path.lower().endswith('.mbox'):
+        messages = register_mailbox(file_path)
+        return {'size': file_size, 'messages': len(messages), 'documents': messages}
+    doc_data, cache_hit = register_document(file_id, filename, content_hash, file_path, file_size)
+    document_store.record_alias(file_id, filename, content_hash, file_path, file_size, doc_data['upload_time'])
+    
+    return {
+        'file_id': file_id,
+        'size': file_size,
+        'inclusions_found': len(doc_data['clauses']['inclusions']),
+        'exclusions_found': len(doc_data['clauses']['exclusions']),
+        'policy_type': doc_data['policy_type'],
+        'memory': doc_data['extraction'].get('memory'),
+        'content_hash': content_hash,
+        'cached': cache_hit
+    }
+
+@app.route('/upload/bulk', methods=['POST', 'OPTIONS'])
+def bulk_upload():
+    """Ingest many documents in one request, streaming per-file results as NDJSON"""
+    if request.method == 'OPTIONS':
+        response = make_response()
+        response.headers.add("Access-Control-Allow-Origin", "*")
+        response.headers.add("Access-Control-Allow-Headers", "*")
+        response.headers.add("Access-Control-Allow-Methods", "*")
+        return response
+    
+    if not PDF_PROCESSING:
+        return jsonify({'error': 'PDF processing not available', 'status': 'failed'}), 500
+    
+    # Files from a multipart request ("files" or repeated "file" fields) are saved
+    # to the store while the request is read; parsing is fanned out below
+    items = []
+    for file in request.files.getlist('files') + request.files.getlist('file'):
+        if file.filename:
+            try:
+                saved = save_stream(file.stream, UPLOAD_FOLDER, file.filename, document_store) if is_allowed(file.filename) else None
+            except UploadRejected as e:
+                saved = e
+            items.append((file.filename, saved))
+    
+    # ...and/or every file in a directory on the server
+    data = request.get_json(silent=True) or {}
+    directory = request.form.get('directory') or data.get('directory')
+    if directory:
+        directory_path, error = resolve_import_directory(directory)
+        if error:
+            return jsonify({'error': error, 'status': 'failed'}), 400
+        recursive = str(request.form.get('recursive') or data.get('recursive', '')).lower() in ('1', 'true', 'yes')
+        items += directory_items(directory_path, recursive)
+    
+    if not items:
+        return jsonify({'error': 'No files or directory provided', 'status': 'failed'}), 400
+    
+    print(f"📤 Bulk upload request received: {len(items)} files")
+    results = iter_bulk_results(items, ingest_bulk_file)
+    
+    if request.args.get('stream', 'true').lower() == 'false':
+        response = make_response(jsonify(collect(results)))
+    else:
+        response = Response(stream_with_context(ndjson_lines(results)), mimetype='application/x-ndjson')
+    response.headers.add("Access-Control-Allow-Origin", "*")
+    return response
+
 @app.route('/query', methods=['POST', 'OPTIONS'])
 def process_query():
     """Process insurance query with complete intelligent analysis"""
@@ -755,6 +1007,7 @@ def process_query():
         
         # Get document clauses
         document_clauses = None
+        clause_index = None
         document_info = {}
         
         # Use uploaded document
@@ -764,8 +1017,9 @@ def process_query():
                 print(f"🔄 Using most recent upload: {file_id}")
             
             if file_id in uploaded_documents:
-                doc_data = uploaded_documents[file_id]
+                doc_data = warm_document(file_id)
                 document_clauses = doc_data['clauses']
+                clause_index = doc_data['clause_index']
                 document_info = {
                     'source': 'uploaded_document',
                     'filename': doc_data['filename'],
@@ -792,12 +1046,16 @@ def process_query():
         user_procedure = extracted_info.get('procedure', query)
         matches = FuzzyMatcher.find_best_match(user_procedure, document_clauses, threshold=60)
         
+        # Cite the clause record behind each match
+        for match in matches:
+            match['citation'] = clause_index.cite(match['type'], match['clause'])
+        
         print(f"🔍 Fuzzy matches found: {len(matches)}")
         if matches:
             print(f"   Best match: {matches[0]['clause']} ({matches[0]['confidence']}% confidence)")
         
         # Intelligent decision making
-        decision_result = DecisionEngine.make_decision(matches, extracted_info, document_clauses)
+        decision_result = DecisionEngine.make_decision(matches, extracted_info, document_clauses, doc_data['waiting_table'])
         print(f"📊 Decision result: {decision_result}")
         
         # Build comprehensive response per specifications
@@ -824,8 +1082,11 @@ def process_query():
             },
             'matching_details': {
                 'best_match_clause': decision_result.get('best_match_clause'),
+                'best_match_clause_id': decision_result.get('best_match_clause_id'),
+                'best_match_citation': matches[0]['citation'] if matches else None,
                 'similarity_score': decision_result.get('similarity_score', 0),
-                'alternative_matches': [{'clause': m['clause'], 'confidence': m['confidence']} for m in matches[1:3]]
+                'alternative_matches': [{'clause': m['clause'], 'confidence': m['confidence'],
+                                         'clause_id': (m['citation'] or {}).get('clause_id')} for m in matches[1:3]]
             },
             'system_capabilities': {
                 'dynamic_pdf_processing': PDF_PROCESSING,
@@ -866,26 +1127,82 @@ def process_query():
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response
 
+@app.route('/clauses/<file_id>/<clause_id>', methods=['GET'])
+def get_clause(file_id, clause_id):
+    """Return a parsed clause cited by /query, with the document text around it"""
+    if file_id not in uploaded_documents:
+        return jsonify({'error': f'Document {file_id} not found'}), 404
+    
+    doc_data = warm_document(file_id)
+    clause = doc_data['clause_index'].get(clause_id)
+    if clause is None:
+        return jsonify({'error': f'Clause {clause_id} not found in {doc_data["filename"]}'}), 404
+    
+    response_data = clause.to_dict()
+    response_data['context'] = doc_data['text'].context(clause.start, clause.end) if clause.start is not None else None
+    response = make_response(jsonify(response_data))
+    response.headers.add("Access-Control-Allow-Origin", "*")
+    return response
+
+@app.route('/parser/stale', methods=['GET'])
+def stale_parses():
+    """Report documents whose cached parse was made by an older parser version"""
+    filenames = {}
+    for doc_data in list(uploaded_documents.values()):
+        filenames.setdefault(doc_data.get('content_hash'), []).append(doc_data['filename'])
+    
+    stale = document_store.stale_report()
+    response = make_response(jsonify({
+        'parser_version': PARSER_VERSION,
+        'stale_documents': len(stale),
+        'reparseable': sum(item['reparseable'] for item in stale),
+        'documents': [dict({key: value for key, value in item.items() if key != 'cache_path'},
+                           filenames=filenames.get(item['content_hash'], []))
+                      for item in stale]
+    }))
+    response.headers.add("Access-Control-Allow-Origin", "*")
+    return response
+
+@app.route('/parser/reparse', methods=['POST'])
+def reparse_documents():
+    """Re-run clause parsing over the cached text of every stale document, in parallel
+
+    Documents quarantined after a hung or crashed parse may be tried again.
+    """
+    released = parser_sandbox.release_quarantine()
+    report = reparse_stale(document_store, DocumentProcessor.reparse_cached_document, parser_sandbox)
+    report['released_quarantine'] = released
+    response = make_response(jsonify(report))
+    response.headers.add("Access-Control-Allow-Origin", "*")
+    return response
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Comprehensive health check endpoint"""
     document_list = []
     
-    for file_id, doc_data in uploaded_documents.items():
+    warm_count = 0
+    
+    for file_id, doc_data in list(uploaded_documents.items()):
+        warm = doc_data['warm']
+        warm_count += warm
         document_list.append({
             'file_id': file_id,
             'filename': doc_data['filename'],
             'policy_type': doc_data.get('policy_type', 'Unknown'),
-            'inclusions': len(doc_data['clauses']['inclusions']),
-            'exclusions': len(doc_data['clauses']['exclusions']),
+            'inclusions': len(doc_data['clauses']['inclusions']) if warm else None,
+            'exclusions': len(doc_data['clauses']['exclusions']) if warm else None,
             'upload_time': doc_data['upload_time'],
-            'size': f"{round(doc_data['file_size']/1024)} KB"
+            'size': f"{round(doc_data['file_size']/1024)} KB",
+            'warm': warm
         })
     
     return jsonify({
         'status': 'healthy',
         'server_mode': 'INTELLIGENT_PROCESSING',
-        'uploaded_documents': len(uploaded_documents),
+        'uploaded_documents': len(document_list),
+        'documents_warm': warm_count,
+        'documents_cold': len(document_list) - warm_count,
         'documents': document_list,
         'system_capabilities': {
             'gemini_ai': GEMINI_AVAILABLE,
@@ -898,6 +1215,8 @@ def health_check():
         },
         'policy_types_supported': list(POLICY_CLASSIFICATIONS.keys()),
         'procedure_mappings': list(PROCEDURE_MAPPINGS.keys()),
+        'parser_sandbox': parser_sandbox.stats(),
+        'query_cache': QUERY_CACHE.stats(),
         'timestamp': datetime.now().isoformat(),
         'message': f"🎯 Intelligent Insurance Query Engine Ready - {len(uploaded_documents)} document(s) loaded"
     })
@@ -942,6 +1261,7 @@ if __name__ == '__main__':
     try:
         import os
         port = int(os.environ.get("PORT", 5000))
+        start_warm_up()
         app.run(debug=False, host='0.0.0.0', port=port, use_reloader=False)
     except KeyboardInterrupt:
         print("\n👋 Server stopped by user")
@@ -14,10 +14,36 @@ import uuid
 import re
 import os
 from datetime import datetime
-from flask import Flask, request, jsonify, make_response
+from flask import Flask, Request, Response, request, jsonify, make_response, stream_with_context
 from flask_cors import CORS
 
+from document_store import DOCUMENT_EXTENSIONS, DocumentStore, UploadRejected, UploadStream, file_id_for, save_stream
+from ingestion_jobs import INGESTION_WORKERS, JobManager
+from pdf_extraction import extraction_stats, iter_pages
+from document_formats import can_extract, iter_document_pages, split_mailbox, split_stored_mailboxes
+from memory_budget import MemoryTracker
+from boilerplate import BoilerplateStripper
+from schedule_tables import ScheduleTableReader
+from parse_sandbox import ParserSandbox, sandbox_workers
+from clause_pipeline import StreamingClauseParser, parse_text
+from clause_segments import classify_segment, segment_text, split_items
+from clause_records import document_clause_index, recorder_for
+from keyword_scanner import KeywordScanner
+from waiting_periods import document_waiting_table, scan_waiting_periods
+from query_cache import QueryCache
+from amounts import AMOUNT_GROUP, copay_percent, describe, normalize_clause_amounts, parse_amount
+from reparse import load_cached_parse, page_layout, reparse_stale
+from upload_watcher import UploadWatcher
+from bulk_ingest import BULK_UPLOAD_WORKERS, collect, directory_items, is_allowed, iter_bulk_results, ndjson_lines, resolve_import_directory
+
+class UploadRequest(Request):
+    """Request whose uploaded files are hashed, size-checked and sniffed as they are received"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadStream(UPLOAD_FOLDER, filename or 'upload')
+
 app = Flask(__name__)
+app.request_class = UploadRequest
 CORS(app)
 
 # Ensure uploads directory exists
@@ -60,39 +86,21 @@ except ImportError:
 # Document storage for dynamic processing
 uploaded_documents = {}
 
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF using multiple methods for robustness"""
-    text_content = ""
-    
-    if not PDF_PROCESSING:
-        return "PDF processing not available. Install pdfplumber and PyPDF2."
-    
-    # Method 1: Try pdfplumber (better for formatted text)
-    try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_content += page_text + "\n"
-        if text_content.strip():
-            print(f"✅ PDF extracted using pdfplumber ({len(text_content)} chars)")
-            return text_content
-    except Exception as e:
-        print(f"⚠️ pdfplumber failed: {e}")
-    
-    # Method 2: Fallback to PyPDF2
-    try:
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                text_content += page.extract_text() + "\n"
-        if text_content.strip():
-            print(f"✅ PDF extracted using PyPDF2 ({len(text_content)} chars)")
-            return text_content
-    except Exception as e:
-        print(f"❌ PyPDF2 failed: {e}")
-    
-    return "Unable to extract text from PDF"
+# Bump whenever clause parsing changes so cached parses are recomputed
+PARSER_VERSION = 11
+
+# Parsed documents keyed by content hash; uploaded_documents entries are aliases
+document_store = DocumentStore(UPLOAD_FOLDER, parser_name='intelligent_fuzzy', parser_version=PARSER_VERSION)
+
+# Extraction and clause parsing run in time- and memory-limited worker processes,
+# enough of them that ingestion jobs and bulk uploads are not held back (PARSE_WORKERS overrides)
+parser_sandbox = ParserSandbox(workers=sandbox_workers(INGESTION_WORKERS, BULK_UPLOAD_WORKERS))
+
+# Background extraction and parsing for uploads; job IDs are the upload file_ids
+ingestion_jobs = JobManager()
+
+# Watch UPLOAD_FOLDER for PDFs added, changed or removed by other processes
+WATCH_UPLOADS = os.environ.get('WATCH_UPLOADS', '0') == '1'
 
 def load_existing_documents():
     """Load existing documents from uploads folder on server startup"""
@@ -102,135 +110,141 @@ def load_existing_documents():
         print("📂 No uploads folder found")
         return
     
-    files = os.listdir(UPLOAD_FOLDER)
-    pdf_files = [f for f in files if f.endswith('.pdf')]
+    if not PDF_PROCESSING:
+        print("⚠️ PDF processing disabled, skipping stored PDFs")
+    
+    # Parses cached by an older parser version are first brought up to date from
+    # their stored text; one at a time, since this runs while the module imports
+    reparse_stale(document_store, reparse_cached_document, parser_sandbox, workers=1)
     
-    print(f"📄 Found {len(pdf_files)} PDF files in uploads folder")
+    # Mailboxes become one stored .eml per message before the folder is listed
+    split_stored_mailboxes(UPLOAD_FOLDER, document_store)
     
-    for filename in pdf_files:
+    # Parsed clauses come from the sidecar cache when available, so every stored
+    # document is loaded and keeps the same file_id across restarts
+    for file_id, filename, content_hash, file_path, file_size, upload_time in document_store.scan():
+        if not can_extract(filename):
+            continue
         try:
-            # Extract file_id from filename (format: file_id_originalname.pdf)
-            if '_' in filename:
-                file_id = filename.split('_')[0]
-                original_name = '_'.join(filename.split('_')[1:])
-            else:
-                # For files without file_id prefix
-                file_id = str(uuid.uuid4())
-                original_name = filename
-            
-            file_path = os.path.join(UPLOAD_FOLDER, filename)
-            file_size = os.path.getsize(file_path)
-            
-            # Process the PDF
-            if PDF_PROCESSING:
-                text_content = extract_text_from_pdf(file_path)
-                clauses = parse_insurance_clauses(text_content)
-                
-                uploaded_documents[file_id] = {
-                    'filename': original_name,
-                    'file_path': file_path,
-                    'text_content': text_content,
-                    'clauses': clauses,
-                    'upload_time': datetime.now().isoformat(),
-                    'file_size': file_size
-                }
-                
-                print(f"✅ Loaded: {original_name} ({file_size} bytes)")
-            else:
-                print(f"⚠️ PDF processing disabled, skipping: {filename}")
-                
+            _, cache_hit = register_document(file_id, filename, content_hash, file_path, file_size, upload_time)
+            print(f"✅ Loaded: {filename} ({file_size} bytes){' [cached]' if cache_hit else ''}")
         except Exception as e:
             print(f"❌ Error loading {filename}: {e}")
     
-    print(f"📋 Total documents loaded: {len(uploaded_documents)}")
-
-# Load existing documents on startup
-load_existing_documents()
+    print(f"📋 Total documents loaded: {len(uploaded_documents)} ({len(document_store)} unique)")
 
 def extract_text_from_pdf(file_path):
     """Extract text from PDF using multiple methods for robustness"""
-    text_content = ""
-    
     if not PDF_PROCESSING:
         return "PDF processing not available. Install pdfplumber and PyPDF2."
     
-    # Method 1: Try pdfplumber (better for formatted text)
-    try:
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_content += page_text + "\n"
-        if text_content.strip():
-            print(f"✅ PDF extracted using pdfplumber ({len(text_content)} chars)")
-            return text_content
-    except Exception as e:
-        print(f"⚠️ pdfplumber failed: {e}")
-    
-    # Method 2: Fallback to PyPDF2
-    try:
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                text_content += page.extract_text() + "\n"
-        if text_content.strip():
-            print(f"✅ PDF extracted using PyPDF2 ({len(text_content)} chars)")
-            return text_content
-    except Exception as e:
-        print(f"❌ PyPDF2 failed: {e}")
+    # pdfplumber page by page (process pool for large files), PyPDF2 from the first failing page
+    text_content = "".join(page.text + "\n" for page in iter_pages(file_path))
+    if text_content.strip():
+        print(f"✅ PDF extracted ({len(text_content)} chars)")
+        return text_content
     
     return "Unable to extract text from PDF"
 
-def parse_insurance_clauses(text_content):
-    """Dynamically parse inclusion and exclusion clauses from document text"""
-    print("🔍 Parsing insurance clauses from document...")
-    
-    clauses = {
+# Clause patterns, compiled once and applied to each segment of a window of pages
+# Phrases introducing excluded text; clause_segments classifies what follows them
+EXCLUSION_TRIGGER = re.compile(
+    r'\b(?:the following (?:are|is) (?:not )?(?:covered|excluded)|this policy does not cover|'
+    r'exclusions?|not covered|excluded|exceptions?)\b[:\-\s]*')
+
+COVERAGE_PATTERNS = [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in [
+    # Pattern 1: "Service: covered up to ₹amount"
+    r'([a-zA-Z][^:\n]{3,40})[:\-]\s*(?:covered|coverage|benefit)\s*(?:up\s*to)?\s*' + AMOUNT_GROUP,
+    # Pattern 2: "Service covered ₹amount"
+    r'([a-zA-Z][^:\n]{3,40})\s+covered\s*' + AMOUNT_GROUP,
+    # Pattern 3: "₹amount for service"
+    AMOUNT_GROUP + r'\s+(?:for|towards)\s+([a-zA-Z][^\n]{3,40})',
+    # Pattern 4: "Service - ₹amount"
+    r'([a-zA-Z][^:\-\n]{3,40})\s*[\-–]\s*' + AMOUNT_GROUP,
+    # Pattern 5: Just "Service: Covered" (no amount)
+    r'([a-zA-Z][^:\n]{3,40})[:\-]\s*(?:covered|yes|included|available)',
+]]
+
+# Additional common medical terms to look for
+MEDICAL_TERMS = [
+    'surgery', 'treatment', 'care', 'therapy', 'procedure', 'medical', 'health',
+    'hospital', 'doctor', 'consultation', 'diagnosis', 'emergency', 'ambulance',
+    'pharmacy', 'medicine', 'lab', 'test', 'scan', 'xray', 'mri', 'ct scan'
+]
+# Text after a medical term that shows it is covered
+MEDICAL_TERM_CONTEXT = re.compile(r'[^.]{0,300}(?:covered|benefit|₹\d)')
+
+# Every keyword rule, matched in one pass over each window of text
+KEYWORD_SCANNER = KeywordScanner({'medical_terms': MEDICAL_TERMS})
+
+# Waiting months assumed for these procedure categories when a document states none
+DEFAULT_WAITING_MONTHS = {'fertility': 24, 'maternity': 24}
+
+POLICY_NAME_PATTERN = re.compile(r'(?:policy\s+name|title)[:\-\s]*(.+?)(?:\n|$)', re.IGNORECASE)
+
+def new_clauses():
+    """Empty clause structure filled in by the parser"""
+    return {
         'inclusions': {},
         'exclusions': [],
         'waiting_periods': {},
+        'waiting_period_months': {},
         'coverage_amounts': {},
         'policy_info': {}
     }
+
+def scan_clause_window(window_text, accept, clauses, state):
+    """Segment a window of text and classify the segments accept() lets through"""
+    for segment in segment_text(window_text):
+        if accept(segment):
+            scan_segment(segment, clauses, state)
     
-    text_lower = text_content.lower()
-    lines = [line.strip() for line in text_content.split('\n') if line.strip()]
+    # Look for coverage of medical terms in general text
+    text_lower = window_text.lower()
+    keyword_hits = KEYWORD_SCANNER.scan(text_lower)
+    for term in KEYWORD_SCANNER.found(keyword_hits, 'medical_terms'):
+        if term in clauses['inclusions']:
+            continue
+        # Check if this term appears in a coverage context
+        for start in keyword_hits[term]:
+            context = MEDICAL_TERM_CONTEXT.match(text_lower, start + len(term))
+            if context:
+                clauses['inclusions'][term] = 1  # Indicates coverage
+                clauses['coverage_amounts'][term] = "Covered"
+                recorder_for(state).note('inclusion', term, start, context.end())
+                break
+    
+    # Extract policy metadata (first occurrence wins)
+    if 'name' not in clauses['policy_info']:
+        policy_name_match = POLICY_NAME_PATTERN.search(window_text)
+        if policy_name_match:
+            clauses['policy_info']['name'] = policy_name_match.group(1).strip()
+    if 'co_payment_percent' not in clauses['policy_info']:
+        copay = copay_percent(window_text)
+        if copay is not None:
+            clauses['policy_info']['co_payment_percent'] = copay
+
+def scan_segment(segment, clauses, state):
+    """Record the waiting periods, and the exclusions or else the coverage, stated in one segment"""
+    recorder = recorder_for(state)
+    if segment.kind == 'heading':
+        recorder.enter_heading(segment)
     
-    # Parse exclusions (most critical for decision making)
-    exclusion_patterns = [
-        r'(?:exclusions?|not covered|excluded|exceptions?)[:\-\s]*(.+?)(?:\n\n|\d+\.|\bsection\b|\bcoverage\b|$)',
-        r'(?:the following (?:are|is) (?:not )?(?:covered|excluded))[:\-\s]*(.+?)(?:\n\n|\d+\.|\bsection\b|$)',
-        r'(?:this policy does not cover)[:\-\s]*(.+?)(?:\n\n|\d+\.|\bsection\b|$)'
-    ]
+    # Parse waiting periods into required months per procedure category
+    scan_waiting_periods(segment, clauses, recorder)
     
-    for pattern in exclusion_patterns:
-        matches = re.finditer(pattern, text_lower, re.IGNORECASE | re.DOTALL)
-        for match in matches:
-            exclusion_text = match.group(1).strip()
-            # Split by common delimiters and clean
-            exclusion_items = re.split(r'[;\n•\-\*]|(?:\d+\.)', exclusion_text)
-            for item in exclusion_items:
-                item = item.strip().rstrip('.,')
-                if len(item) > 3 and len(item) < 200:  # Filter reasonable exclusions
-                    clauses['exclusions'].append(item)
+    # Parse exclusions (most critical for decision making)
+    exclusion_text = classify_segment(segment, state, EXCLUSION_TRIGGER)
+    if exclusion_text:
+        for item in split_items(exclusion_text):
+            if len(item) > 3 and len(item) < 200:  # Filter reasonable exclusions
+                clauses['exclusions'].append(item)
+                recorder.note('exclusion', item, segment.start, segment.end, keep_first=True)
+        return
     
     # Parse inclusions/coverage with enhanced patterns
-    coverage_patterns = [
-        # Pattern 1: "Service: covered up to ₹amount"
-        r'([a-zA-Z][^:\n]{3,40})[:\-]\s*(?:covered|coverage|benefit)\s*(?:up\s*to)?\s*₹?\s*(\d+(?:,\d{3})*)',
-        # Pattern 2: "Service covered ₹amount"
-        r'([a-zA-Z][^:\n]{3,40})\s+covered\s*₹?\s*(\d+(?:,\d{3})*)',
-        # Pattern 3: "₹amount for service"
-        r'₹?\s*(\d+(?:,\d{3})*)\s+(?:for|towards)\s+([a-zA-Z][^\n]{3,40})',
-        # Pattern 4: "Service - ₹amount"
-        r'([a-zA-Z][^:\-\n]{3,40})\s*[\-–]\s*₹?\s*(\d+(?:,\d{3})*)',
-        # Pattern 5: Just "Service: Covered" (no amount)
-        r'([a-zA-Z][^:\n]{3,40})[:\-]\s*(?:covered|yes|included|available)',
-    ]
-    
-    for i, pattern in enumerate(coverage_patterns):
-        matches = re.finditer(pattern, text_content, re.IGNORECASE | re.MULTILINE)
-        for match in matches:
+    for i, pattern in enumerate(COVERAGE_PATTERNS):
+        for match in pattern.finditer(segment.text):
             try:
                 if i < 4:  # First 4 patterns have amount
                     if i == 2:  # Pattern 3: amount comes first
@@ -240,77 +254,214 @@ def parse_insurance_clauses(text_content):
                         service = match.group(1).strip().lower()
                         amount_str = match.group(2) if len(match.groups()) > 1 else "0"
                     
-                    # Clean and convert amount
-                    amount_str = re.sub(r'[,₹\s]', '', amount_str)
-                    amount = int(amount_str) if amount_str.isdigit() else 0
+                    # Normalize the amount (₹/Rs/INR, lakh/crore, per-day limits)
+                    amount = parse_amount(amount_str, bare=True)
                 else:  # Pattern 5: no amount, just coverage
                     service = match.group(1).strip().lower()
-                    amount = 1  # Indicates coverage without specific amount
+                    amount = None  # Coverage without a specific amount
                 
                 # Clean service name
                 service = re.sub(r'^\W+|\W+$', '', service)  # Remove leading/trailing non-word chars
                 service = re.sub(r'\s+', ' ', service)  # Normalize whitespace
                 
                 if len(service) > 3 and service not in ['the', 'and', 'for', 'with']:
-                    clauses['inclusions'][service] = amount
-                    if amount > 1:
-                        clauses['coverage_amounts'][service] = f"₹{amount:,}"
-                    else:
-                        clauses['coverage_amounts'][service] = "Covered"
+                    clauses['inclusions'][service] = amount.value if amount and amount.value else 1
+                    recorder.note('inclusion', service, segment.start + match.start(), segment.start + match.end())
+                    clauses['coverage_amounts'][service] = describe(amount)
                     
             except (ValueError, IndexError, AttributeError) as e:
                 continue  # Skip malformed matches
-    
-    # Additional common medical terms to look for
-    medical_terms = [
-        'surgery', 'treatment', 'care', 'therapy', 'procedure', 'medical', 'health',
-        'hospital', 'doctor', 'consultation', 'diagnosis', 'emergency', 'ambulance',
-        'pharmacy', 'medicine', 'lab', 'test', 'scan', 'xray', 'mri', 'ct scan'
-    ]
-    
-    # Look for coverage of medical terms in general text
-    for term in medical_terms:
-        if term in text_lower and term not in clauses['inclusions']:
-            # Check if this term appears in a coverage context
-            coverage_context = re.search(f'{term}[^.]*(?:covered|benefit|₹\d)', text_lower)
-            if coverage_context:
-                clauses['inclusions'][term] = 1  # Indicates coverage
-                clauses['coverage_amounts'][term] = "Covered"
-    
-    # Parse waiting periods
-    waiting_patterns = [
-        r'(?:waiting period|waiting time)[:\-\s]*(\d+)\s*(days?|months?|years?)',
-        r'(\w+(?:\s+\w+)*)[:\-\s]*(\d+)\s*(days?|months?|years?)\s*waiting'
-    ]
-    
-    for pattern in waiting_patterns:
-        matches = re.finditer(pattern, text_lower, re.IGNORECASE)
-        for match in matches:
-            if len(match.groups()) >= 3:
-                period = f"{match.group(2)} {match.group(3)}"
-                service = match.group(1).strip() if len(match.groups()) > 3 else "general"
-                clauses['waiting_periods'][service] = period
-    
+
+def finalize_clauses(clauses, state):
+    """Clean up exclusions once every page has been scanned"""
     # Clean up exclusions (remove duplicates and very short items)
     cleaned_exclusions = []
-    for exclusion in clauses['exclusions']:
-        exclusion = exclusion.strip().rstrip('.,;')
-        if len(exclusion) > 5 and exclusion not in cleaned_exclusions:
+    seen = set()
+    recorder = recorder_for(state)
+    for item in clauses['exclusions']:
+        exclusion = item.strip().rstrip('.,;')
+        if len(exclusion) > 5 and exclusion not in seen:
             # Additional cleaning
             exclusion = re.sub(r'^(?:and|or|the|a|an)\s+', '', exclusion, flags=re.IGNORECASE)
-            if exclusion and exclusion not in cleaned_exclusions:
+            if exclusion and exclusion not in seen:
                 cleaned_exclusions.append(exclusion)
+                seen.add(exclusion)
+                recorder.rename('exclusion', item, exclusion)
     
     clauses['exclusions'] = cleaned_exclusions[:50]  # Limit to reasonable number
     
-    # Extract policy metadata
-    policy_name_match = re.search(r'(?:policy\s+name|title)[:\-\s]*(.+?)(?:\n|$)', text_content, re.IGNORECASE)
-    if policy_name_match:
-        clauses['policy_info']['name'] = policy_name_match.group(1).strip()
-    
     print(f"📋 Parsed {len(clauses['inclusions'])} inclusions, {len(clauses['exclusions'])} exclusions")
     return clauses
 
+def parse_insurance_clauses(text_content):
+    """Dynamically parse inclusion and exclusion clauses from document text"""
+    print("🔍 Parsing insurance clauses from document...")
+    return normalize_clause_amounts(parse_text(text_content, new_clauses, scan_clause_window, finalize_clauses))
+
+def parse_pages(page_bodies, schedules, job=None):
+    """Clause fields from (page, body) pairs, body being the page as the clause regexes see it"""
+    parser = StreamingClauseParser(new_clauses, scan_clause_window, finalize_clauses)
+    pages = []
+    for page, body in page_bodies:
+        parser.feed(body)
+        pages.append(page)
+        if job:
+            job.page_done(page)
+    
+    if job:
+        job.set_stage('parsing')
+    clauses = normalize_clause_amounts(schedules.apply(parser.finish()))
+    if job:
+        job.set_stage('indexing')
+    clause_index = recorder_for(parser.state).build(clauses, pages, schedules.rows)
+    return pages, {
+        'clauses': clauses,
+        'clause_records': clause_index.to_rows(),
+        'layout': page_layout(pages, schedules)
+    }
+
+def process_document(file_path, job=None):
+    """Stream a document page by page into the clause parser and return the stored fields
+    
+    When an ingestion job is given, its stage, page counts and memory use are
+    updated as pages are extracted and parsed.
+    """
+    print("🔍 Parsing insurance clauses page by page...")
+    memory = MemoryTracker()
+    boilerplate = BoilerplateStripper()
+    schedules = ScheduleTableReader(file_path)
+    if job:
+        job.memory = memory
+    
+    try:
+        page_bodies = ((page, schedules.body_page(page)) for page in iter_document_pages(file_path, memory, boilerplate))
+        pages, fields = parse_pages(page_bodies, schedules, job)
+    finally:
+        schedules.close()
+    
+    text_content = "".join(page.text + "\n" for page in pages) or "Unable to extract text from document"
+    memory.sample()
+    
+    return dict(fields, text_content=text_content,
+                extraction=extraction_stats(pages, memory, boilerplate, schedules))
+
+def reparse_cached_document(cache_path):
+    """Clause fields of a cached parse, re-parsed from its stored text without extracting the file again"""
+    page_bodies, schedules = load_cached_parse(cache_path)
+    return parse_pages(page_bodies, schedules)[1]
+
+def register_document(file_id, filename, content_hash, file_path, file_size, upload_time=None, job=None):
+    """Alias file_id to the stored document for content_hash, parsing it on first sight"""
+    stored, cache_hit = document_store.get_or_parse(
+        content_hash, file_path, lambda path: parser_sandbox.run(process_document, path, job, key=content_hash),
+        lambda cache_path: parser_sandbox.run(reparse_cached_document, cache_path, key=content_hash))
+    
+    uploaded_documents[file_id] = {
+        'filename': filename,
+        'file_path': stored['file_path'],
+        'content_hash': content_hash,
+        'text': stored['text'],
+        'text_length': stored['text_length'],
+        'clauses': stored['clauses'],
+        'clause_index': document_clause_index(stored),
+        'waiting_table': document_waiting_table(stored, document_clause_index(stored)),
+        'extraction': stored['extraction'],
+        'upload_time': upload_time or datetime.now().isoformat(),
+        'file_size': file_size
+    }
+    
+    return uploaded_documents[file_id], cache_hit
+
+def register_mailbox(file_path):
+    """Register each message of a saved mbox as its own document; returns one summary per message"""
+    messages = []
+    for filename, content_hash, message_path, message_size in split_mailbox(file_path, UPLOAD_FOLDER, document_store):
+        # Stored as "<content_hash>_<name>", so scan() gives a message this file_id after a restart
+        doc_data, cache_hit = register_document(content_hash, filename, content_hash, message_path, message_size)
+        messages.append({'file_id': content_hash, 'filename': filename,
+                         'exclusions_found': len(doc_data['clauses']['exclusions']), 'cached': cache_hit})
+    print(f"📬 Registered {len(messages)} messages of {os.path.basename(file_path)}")
+    return messages
+
+def ingest_upload(file_id, filename, content_hash, file_path, file_size, job=None):
+    """Parse and register an uploaded document; returns the upload's processing_result
+
+    A mailbox becomes one document per message.
+    """
+    if file_path.lower().endswith('.mbox'):
+        messages = register_mailbox(file_path)
+        return {'messages': len(messages), 'documents': messages}
+    doc_data, cache_hit = register_document(file_id, filename, content_hash, file_path, file_size, job=job)
+    document_store.record_alias(file_id, filename, content_hash, file_path, file_size, doc_data['upload_time'])
+    clauses = doc_data['clauses']
+    
+    processing_result = {
+        'inclusions_found': len(clauses['inclusions']),
+        'exclusions_found': len(clauses['exclusions']),
+        'policy_name': clauses['policy_info'].get('name', 'Unknown Policy'),
+        'waiting_periods': len(clauses['waiting_periods']),
+        'schedule_rows': len(clauses.get('benefit_schedule', [])),
+        'clauses_indexed': len(doc_data['clause_index']),
+        'extractors': doc_data['extraction']['extractors'],
+        'boilerplate_stripped': (doc_data['extraction'].get('boilerplate') or {}).get('stripped_ratio'),
+        'memory': doc_data['extraction'].get('memory'),
+        'content_hash': content_hash,
+        'cached': cache_hit
+    }
+    
+    print(f"✅ Document processed: {processing_result}")
+    return processing_result
+
+def release_document(content_hash):
+    """Evict a parsed document from the store once no file_id refers to it"""
+    if content_hash and not any(doc['content_hash'] == content_hash for doc in list(uploaded_documents.values())):
+        document_store.evict(content_hash)
+
+def ingest_watched_file(file_path, content_hash):
+    """Register a document dropped into the uploads folder, or re-parse one whose content changed"""
+    filename = os.path.basename(file_path)
+    if filename.startswith(f"{content_hash}_"):
+        return  # saved by /upload and registered under its upload file_id
+    if filename.lower().endswith('.mbox'):
+        register_mailbox(file_path)
+        return
+    
+    file_id, original_name = file_id_for(filename)
+    previous = uploaded_documents.get(file_id)
+    upload_time = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+    doc_data, cache_hit = register_document(file_id, original_name, content_hash, file_path,
+                                            os.path.getsize(file_path), upload_time)
+    print(f"✅ Ingested from uploads folder: {original_name}{' [cached]' if cache_hit else ''}")
+    if previous and previous['content_hash'] != content_hash:
+        release_document(previous['content_hash'])
+
+def evict_watched_file(file_path):
+    """Drop every file_id that pointed at a file removed from the uploads folder"""
+    dropped_id, _ = file_id_for(os.path.basename(file_path))
+    removed = {file_id: doc for file_id, doc in list(uploaded_documents.items())
+               if doc['file_path'] == file_path or file_id == dropped_id}
+    for file_id in removed:
+        uploaded_documents.pop(file_id, None)
+    document_store.remove_aliases(list(removed))
+    for doc in removed.values():
+        release_document(doc['content_hash'])
+    if removed:
+        print(f"🗑️ Evicted {len(removed)} document(s) for {os.path.basename(file_path)}")
+
+def start_upload_watcher():
+    """Ingest or evict documents as other processes change the uploads folder"""
+    watcher = UploadWatcher(UPLOAD_FOLDER, ingest_watched_file, evict_watched_file)
+    watcher.seed({doc['file_path']: doc['content_hash'] for doc in list(uploaded_documents.values())
+                  if doc['content_hash']})
+    watcher.start()
+    return watcher
+
+# Load existing documents on startup
+load_existing_documents()
+
+# Pick up documents added to or removed from the uploads folder while running
+upload_watcher = start_upload_watcher() if WATCH_UPLOADS and PDF_PROCESSING else None
+
 def advanced_fuzzy_match(query_text, target_list, threshold=85):
     """Advanced fuzzy matching with multiple algorithms and flexible thresholds"""
     if not FUZZY_AVAILABLE or not target_list:
@@ -404,7 +555,7 @@ PROCEDURE_SYNONYMS = {
 # Mock document functions REMOVED - System now analyzes ONLY uploaded documents
 # This ensures all decisions are based on real policy documents provided by users
 
-def extract_entities_advanced(query):
+def parse_query_entities(query):
     """Advanced entity extraction with enhanced pattern recognition"""
     query_lower = query.lower()
     entities = {}
@@ -511,6 +662,7 @@ def extract_entities_advanced(query):
         match = re.search(pattern, query_lower)
         if match:
             entities['policy_duration'] = int(match.group(1))
+            entities['policy_duration_months'] = entities['policy_duration'] * 12
             print(f"📅 Policy duration: {entities['policy_duration']} years")
             break
     
@@ -537,7 +689,25 @@ def extract_entities_advanced(query):
     
     return entities
 
-def analyze_coverage_with_confusion_matrix(document_clauses, entities, query, actual_outcome=None):
+# Entities of recent queries, keyed by canonical query form
+ENTITY_CACHE = QueryCache(parse_query_entities)
+
+def extract_entities_advanced(query):
+    """Query entities, parsed once per canonical query form and shared read-only"""
+    return ENTITY_CACHE(query)
+
+def cite_clause(result, clause_index, kind, text):
+    """Attach the parsed clause record behind a decision, citing its section, page and ID"""
+    citation = clause_index.cite(kind, text) if clause_index else None
+    if citation:
+        result['clause_id'] = citation['clause_id']
+        result['citation'] = citation
+        if citation['section']:
+            result['clause_reference'] = f"{citation['section']} ({citation['clause_id']}, page {citation['page']})"
+    return result
+
+def analyze_coverage_with_confusion_matrix(document_clauses, entities, query, actual_outcome=None, clause_index=None,
+                                           waiting_table=None):
     """
     Analyze coverage with proper confusion matrix support
     
@@ -574,6 +744,7 @@ def analyze_coverage_with_confusion_matrix(document_clauses, entities, query, ac
             'clause_reference': f"Exclusions section",
             'fuzzy_matched_terms': [top_exclusion[0]]
         }
+        cite_clause(exclusion_result, clause_index, 'exclusion', top_exclusion[0])
     
     # Step 2: Check inclusions/coverage
     inclusions = document_clauses.get('inclusions', {})
@@ -591,6 +762,7 @@ def analyze_coverage_with_confusion_matrix(document_clauses, entities, query, ac
             'coverage_match': procedure_type,
             'clause_reference': f"Coverage section - {procedure_type}"
         }
+        cite_clause(inclusion_result, clause_index, 'inclusion', procedure_type)
     else:
         # Fuzzy match against inclusion keys
         inclusion_keys = list(inclusions.keys()) + list(coverage_amounts.keys())
@@ -598,7 +770,7 @@ def analyze_coverage_with_confusion_matrix(document_clauses, entities, query, ac
         
         if inclusion_matches:
             top_inclusion = inclusion_matches[0]
-            amount = inclusions.get(top_inclusion[0], 0) or extract_amount_from_text(coverage_amounts.get(top_inclusion[0], "0"))
+            amount = inclusions.get(top_inclusion[0], 0)
             
             inclusion_result = {
                 'decision': 'APPROVED',
@@ -610,6 +782,7 @@ def analyze_coverage_with_confusion_matrix(document_clauses, entities, query, ac
                 'clause_reference': f"Coverage section - {top_inclusion[0]}",
                 'fuzzy_matched_terms': [top_inclusion[0]]
             }
+            cite_clause(inclusion_result, clause_index, 'inclusion', top_inclusion[0])
     
     # Step 3: Decision logic with confusion matrix awareness
     final_result = None
@@ -633,39 +806,30 @@ def analyze_coverage_with_confusion_matrix(document_clauses, entities, query, ac
         final_result = exclusion_result
     
     elif inclusion_result:
-        # Check waiting period compliance for better decision accuracy
-        waiting_periods = document_clauses.get('waiting_periods', {})
-        policy_duration = entities.get('policy_duration', 0)
-        
-        # Enhanced inclusion logic with waiting period checking
-        procedure_type = entities.get('procedure_type', '').lower()
+        # Waiting period for the procedure category: required months come from the
+        # table built at ingest, so the check is an integer comparison
+        waiting = waiting_table.lookup(procedure_type) if waiting_table else None
+        required_months = waiting.months if waiting else DEFAULT_WAITING_MONTHS.get(procedure_type.lower(), 0)
+        policy_months = entities.get('policy_duration_months', 0)
         
-        # Check if waiting period applies
-        waiting_period_violation = False
-        required_years = 0
-        
-        if 'fertility' in procedure_type or 'ivf' in procedure_type:
-            required_years = int(waiting_periods.get('fertility_treatments', '2 years').split()[0])
-        elif 'maternity' in procedure_type:
-            required_years = int(waiting_periods.get('maternity', '2 years').split()[0])
-        
-        if required_years > 0 and policy_duration > 0 and policy_duration < required_years:
-            waiting_period_violation = True
+        if required_months > 0 and 0 < policy_months < required_months:
             final_result = {
                 'decision': 'REJECTED',
-                'reason': f"Waiting period not met. Required: {required_years} years, Policy held: {policy_duration} years",
+                'reason': f"Waiting period not met. Required: {required_months} months, Policy held: {policy_months} months",
                 'amount': 0,
                 'confidence': 90,
-                'clause_reference': f"Waiting period requirement - {required_years} years",
+                'clause_reference': f"Waiting period requirement - {required_months} months",
                 'waiting_period_issue': True,
-                'required_waiting_years': required_years,
-                'current_policy_years': policy_duration
+                'required_waiting_months': required_months,
+                'current_policy_months': policy_months
             }
+            if waiting:
+                cite_clause(final_result, clause_index, 'waiting_period', waiting.category)
         else:
             # Approve with potential waiting period note
             final_result = inclusion_result
-            if required_years > 0 and policy_duration >= required_years:
-                final_result['waiting_period_met'] = f"✅ Waiting period satisfied ({policy_duration} years ≥ {required_years} years required)"
+            if required_months > 0 and policy_months >= required_months:
+                final_result['waiting_period_met'] = f"✅ Waiting period satisfied ({policy_months} months ≥ {required_months} months required)"
     
     else:
         # No specific match found - enhanced fallback logic with better matching
@@ -703,6 +867,7 @@ def analyze_coverage_with_confusion_matrix(document_clauses, entities, query, ac
                 'procedure_matched': procedure or query,
                 'match_confidence': best_match[1]
             }
+            cite_clause(final_result, clause_index, 'inclusion', best_match[0])
         elif any(term in query_lower for term in ['surgery', 'treatment', 'care', 'procedure', 'medical']):
             # Check for general medical coverage as last resort
             inclusions = document_clauses.get('inclusions', {})
@@ -726,6 +891,7 @@ def analyze_coverage_with_confusion_matrix(document_clauses, entities, query, ac
                     'fallback_coverage': True,
                     'general_medical_coverage': True
                 }
+                cite_clause(final_result, clause_index, 'inclusion', general_key)
             else:
                 final_result = {
                     'decision': 'REJECTED',
@@ -763,21 +929,6 @@ def analyze_coverage_with_confusion_matrix(document_clauses, entities, query, ac
     print(f"✅ FINAL DECISION: {final_result['decision']} (Confidence: {final_result['confidence']}%)")
     return final_result
 
-def extract_amount_from_text(amount_str):
-    """Extract numeric amount from text string"""
-    if not amount_str:
-        return 0
-    
-    # Remove currency symbols and commas
-    clean_str = re.sub(r'[₹,rs\.]', '', str(amount_str), flags=re.IGNORECASE)
-    
-    # Extract number
-    match = re.search(r'(\d+(?:,\d{3})*)', clean_str)
-    if match:
-        return int(match.group(1).replace(',', ''))
-    
-    return 0
-
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint with detailed system status"""
@@ -806,6 +957,8 @@ def health_check():
             'dynamic_processing': True,
             'mock_data': False  # Mock data disabled
         },
+        'parser_sandbox': parser_sandbox.stats(),
+        'query_cache': ENTITY_CACHE.stats(),
         'timestamp': datetime.now().isoformat(),
         'message': f"{'Ready to process queries with {uploaded_count} document(s)' if uploaded_count > 0 else '⚠️ Please upload PDF policy documents to begin analysis'}"
     })
@@ -874,61 +1027,57 @@ def upload_file():
             return response
         
         # Validate file type
-        if not file.filename.lower().endswith('.pdf'):
+        if not file.filename.lower().endswith(DOCUMENT_EXTENSIONS):
             print(f"❌ Invalid file type: {file.filename}")
             response_data = {
-                'error': 'Only PDF files are allowed',
+                'error': f'Only {", ".join(DOCUMENT_EXTENSIONS)} files are allowed',
                 'status': 'failed'
             }
             response = make_response(jsonify(response_data), 400)
             response.headers.add("Access-Control-Allow-Origin", "*")
             return response
         
-        # Generate unique file ID and save file
+        # Generate unique file ID and keep the file, already hashed and checked while
+        # the request was received, in the content-addressed store
         file_id = str(uuid.uuid4())
-        file_path = os.path.join(UPLOAD_FOLDER, f"{file_id}_{file.filename}")
-        
-        # Save the file
-        file.save(file_path)
-        file_size = os.path.getsize(file_path)
+        try:
+            content_hash, file_path, file_size = save_stream(file.stream, UPLOAD_FOLDER, file.filename, document_store)
+        except UploadRejected as e:
+            response = make_response(jsonify({'error': str(e), 'status': 'failed'}), e.status_code)
+            response.headers.add("Access-Control-Allow-Origin", "*")
+            return response
         
         print(f"✅ File saved: {file_path} ({file_size} bytes)")
         
-        # Process PDF and extract clauses
+        # Content seen before is registered in-request; anything else is parsed
+        # by a background ingestion job that /progress/<file_id> reports on
         processing_result = None
-        if PDF_PROCESSING:
+        job = None
+        if can_extract(file.filename) and document_store.get(content_hash):
             try:
-                print("🔍 Processing PDF content...")
-                text_content = extract_text_from_pdf(file_path)
-                clauses = parse_insurance_clauses(text_content)
-                
-                # Store the processed document
-                uploaded_documents[file_id] = {
-                    'filename': file.filename,
-                    'file_path': file_path,
-                    'text_content': text_content,
-                    'clauses': clauses,
-                    'upload_time': datetime.now().isoformat(),
-                    'file_size': file_size
-                }
-                
-                processing_result = {
-                    'inclusions_found': len(clauses['inclusions']),
-                    'exclusions_found': len(clauses['exclusions']),
-                    'policy_name': clauses['policy_info'].get('name', 'Unknown Policy'),
-                    'waiting_periods': len(clauses['waiting_periods'])
-                }
-                
-                print(f"✅ Document processed: {processing_result}")
-                
+                processing_result = ingest_upload(file_id, file.filename, content_hash, file_path, file_size)
             except Exception as e:
-                print(f"⚠️ PDF processing failed: {e}")
-                processing_result = {'error': f'PDF processing failed: {str(e)}'}
+                print(f"⚠️ Document processing failed: {e}")
+                processing_result = {'error': f'Document processing failed: {str(e)}'}
+        elif can_extract(file.filename):
+            filename = file.filename
+            job = ingestion_jobs.submit(
+                file_id, filename,
+                lambda job: ingest_upload(file_id, filename, content_hash, file_path, file_size, job))
+            if job is None:
+                response_data = {
+                    'error': 'Too many documents are being processed, please retry shortly',
+                    'status': 'failed'
+                }
+                response = make_response(jsonify(response_data), 503)
+                response.headers.add("Access-Control-Allow-Origin", "*")
+                return response
         
         response_data = {
             'file_id': file_id,
-            'status': 'uploaded',
-            'message': f'File "{file.filename}" uploaded and processed successfully',
+            'job_id': file_id if job else None,
+            'status': 'processing' if job else 'uploaded',
+            'message': f'File "{file.filename}" uploaded, processing in background' if job else f'File "{file.filename}" uploaded and processed successfully',
             'filename': file.filename,
             'size': file_size,
             'pdf_processing': PDF_PROCESSING,
@@ -936,7 +1085,7 @@ def upload_file():
             'processing_result': processing_result
         }
         
-        response = make_response(jsonify(response_data))
+        response = make_response(jsonify(response_data), 202 if job else 200)
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response
         
@@ -951,16 +1100,90 @@ def upload_file():
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response
 
+def ingest_bulk_file(filename, source):
+    """Parse one file of a bulk upload; returns its per-file result
+    
+    source is the (content_hash, file_path, file_size) of an uploaded file
+    already saved to the store, the UploadRejected raised while receiving it,
+    or the path of a file to import.
+    """
+    if isinstance(source, UploadRejected):
+        raise source
+    file_id = str(uuid.uuid4())
+    if isinstance(source, str):
+        with open(source, 'rb') as stream:
+            source = save_stream(stream, UPLOAD_FOLDER, filename, document_store)
+    content_hash, file_path, file_size = source
+    return dict(ingest_upload(file_id, filename, content_hash, file_path, file_size), file_id=file_id, size=file_size)
+
+@app.route('/upload/bulk', methods=['POST', 'OPTIONS'])
+def bulk_upload():
+    """Ingest many documents in one request, streaming per-file results as NDJSON"""
+    if request.method == 'OPTIONS':
+        response = make_response()
+        response.headers.add("Access-Control-Allow-Origin", "*")
+        response.headers.add("Access-Control-Allow-Headers", "*")
+        response.headers.add("Access-Control-Allow-Methods", "*")
+        return response
+    
+    if not PDF_PROCESSING:
+        return jsonify({'error': 'PDF processing not available', 'status': 'failed'}), 500
+    
+    # Files from a multipart request ("files" or repeated "file" fields) are saved
+    # to the store while the request is read; parsing is fanned out below
+    items = []
+    for file in request.files.getlist('files') + request.files.getlist('file'):
+        if file.filename:
+            try:
+                saved = save_stream(file.stream, UPLOAD_FOLDER, file.filename, document_store) if is_allowed(file.filename) else None
+            except UploadRejected as e:
+                saved = e
+            items.append((file.filename, saved))
+    
+    # ...and/or every file in a directory on the server
+    data = request.get_json(silent=True) or {}
+    directory = request.form.get('directory') or data.get('directory')
+    if directory:
+        directory_path, error = resolve_import_directory(directory)
+        if error:
+            return jsonify({'error': error, 'status': 'failed'}), 400
+        recursive = str(request.form.get('recursive') or data.get('recursive', '')).lower() in ('1', 'true', 'yes')
+        items += directory_items(directory_path, recursive)
+    
+    if not items:
+        return jsonify({'error': 'No files or directory provided', 'status': 'failed'}), 400
+    
+    print(f"📤 Bulk upload request received: {len(items)} files")
+    results = iter_bulk_results(items, ingest_bulk_file)
+    
+    if request.args.get('stream', 'true').lower() == 'false':
+        response = make_response(jsonify(collect(results)))
+    else:
+        response = Response(stream_with_context(ndjson_lines(results)), mimetype='application/x-ndjson')
+    response.headers.add("Access-Control-Allow-Origin", "*")
+    return response
+
 @app.route('/progress/<file_id>', methods=['GET'])
 def get_progress(file_id):
-    """Get upload progress"""
-    response_data = {
-        'progress': 100,
-        'status': 'completed',
-        'file_id': file_id,
-        'intelligent_analysis': FUZZY_AVAILABLE
-    }
+    """Get ingestion progress for an upload"""
+    job = ingestion_jobs.get(file_id)
+    if job:
+        response_data = job.to_dict()
+    elif file_id in uploaded_documents:
+        response_data = {
+            'progress': 100,
+            'status': 'completed',
+            'stage': 'done',
+            'current_stage': 'done',
+            'file_id': file_id
+        }
+    else:
+        response_data = {'error': 'Unknown file_id', 'status': 'error', 'file_id': file_id}
+        response = make_response(jsonify(response_data), 404)
+        response.headers.add("Access-Control-Allow-Origin", "*")
+        return response
     
+    response_data['intelligent_analysis'] = FUZZY_AVAILABLE
     response = make_response(jsonify(response_data))
     response.headers.add("Access-Control-Allow-Origin", "*")
     return response
@@ -990,13 +1213,19 @@ def process_query():
         
         if not query:
             return jsonify({'error': 'No query provided'}), 400
-        
+
+        # A document still being ingested cannot be queried yet
+        job = ingestion_jobs.get(file_id)
+        if job and not job.finished:
+            return jsonify({'error': 'Document is still being processed', **job.to_dict()}), 409
+
         # Enhanced entity extraction
         entities = extract_entities_advanced(query)
         print(f"🔍 Advanced extraction: {entities}")
         
         # Get document clauses - PRIORITIZE UPLOADED DOCUMENTS
         document_clauses = None
+        clause_index = None
         document_info = {}
         
         # STEP 1: Check for uploaded documents FIRST
@@ -1012,6 +1241,7 @@ def process_query():
                 # Use uploaded document
                 doc_data = uploaded_documents[file_id]
                 document_clauses = doc_data['clauses']
+                clause_index = doc_data['clause_index']
                 document_info = {
                     'source': 'uploaded_document',
                     'filename': doc_data['filename'],
@@ -1044,7 +1274,8 @@ def process_query():
         print(f"📝 Raw query: '{query}'\n")
         
         # Advanced coverage analysis with confusion matrix support
-        analysis = analyze_coverage_with_confusion_matrix(document_clauses, entities, query, actual_outcome)
+        analysis = analyze_coverage_with_confusion_matrix(document_clauses, entities, query, actual_outcome, clause_index,
+                                                          doc_data['waiting_table'])
         print(f"📊 Analysis result: {analysis}")
         
         # Build comprehensive response
@@ -1055,6 +1286,8 @@ def process_query():
             'justification': {
                 'reasoning': analysis['reason'],
                 'clause_reference': analysis.get('clause_reference', 'N/A'),
+                'clause_id': analysis.get('clause_id'),
+                'citation': analysis.get('citation'),
                 'document_based': True,
                 'advanced_fuzzy_matching': FUZZY_AVAILABLE,
                 'conflict_note': analysis.get('conflict_note')
@@ -1119,18 +1352,69 @@ def debug_document(file_id):
     debug_info = {
         'filename': doc_data['filename'],
         'file_size': doc_data['file_size'],
-        'text_length': len(doc_data['text_content']),
-        'text_preview': doc_data['text_content'][:500] + "..." if len(doc_data['text_content']) > 500 else doc_data['text_content'],
+        'text_length': doc_data['text_length'],
+        'text_preview': doc_data['text'].preview(500),
         'parsed_clauses': doc_data['clauses'],
+        'clause_records': [clause.to_dict() for clause in doc_data['clause_index'].clauses],
         'inclusions_count': len(doc_data['clauses']['inclusions']),
         'exclusions_count': len(doc_data['clauses']['exclusions']),
-        'waiting_periods_count': len(doc_data['clauses']['waiting_periods'])
+        'waiting_periods_count': len(doc_data['clauses']['waiting_periods']),
+        'extraction': doc_data['extraction']
     }
     
     response = make_response(jsonify(debug_info))
     response.headers.add("Access-Control-Allow-Origin", "*")
     return response
 
+@app.route('/clauses/<file_id>/<clause_id>', methods=['GET'])
+def get_clause(file_id, clause_id):
+    """Return a parsed clause cited by /query, with the document text around it"""
+    if file_id not in uploaded_documents:
+        return jsonify({'error': f'Document {file_id} not found'}), 404
+    
+    doc_data = uploaded_documents[file_id]
+    clause = doc_data['clause_index'].get(clause_id)
+    if clause is None:
+        return jsonify({'error': f'Clause {clause_id} not found in {doc_data["filename"]}'}), 404
+    
+    response_data = clause.to_dict()
+    response_data['context'] = doc_data['text'].context(clause.start, clause.end) if clause.start is not None else None
+    response = make_response(jsonify(response_data))
+    response.headers.add("Access-Control-Allow-Origin", "*")
+    return response
+
+@app.route('/parser/stale', methods=['GET'])
+def stale_parses():
+    """Report documents whose cached parse was made by an older parser version"""
+    filenames = {}
+    for doc_data in list(uploaded_documents.values()):
+        filenames.setdefault(doc_data.get('content_hash'), []).append(doc_data['filename'])
+    
+    stale = document_store.stale_report()
+    response = make_response(jsonify({
+        'parser_version': PARSER_VERSION,
+        'stale_documents': len(stale),
+        'reparseable': sum(item['reparseable'] for item in stale),
+        'documents': [dict({key: value for key, value in item.items() if key != 'cache_path'},
+                           filenames=filenames.get(item['content_hash'], []))
+                      for item in stale]
+    }))
+    response.headers.add("Access-Control-Allow-Origin", "*")
+    return response
+
+@app.route('/parser/reparse', methods=['POST'])
+def reparse_documents():
+    """Re-run clause parsing over the cached text of every stale document, in parallel
+
+    Documents quarantined after a hung or crashed parse may be tried again.
+    """
+    released = parser_sandbox.release_quarantine()
+    report = reparse_stale(document_store, reparse_cached_document, parser_sandbox)
+    report['released_quarantine'] = released
+    response = make_response(jsonify(report))
+    response.headers.add("Access-Control-Allow-Origin", "*")
+    return response
+
 @app.route('/documents', methods=['GET'])
 def list_documents():
     """List all uploaded and processed documents"""
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+🧮 EXTRACTION MEMORY BUDGET
+✅ Resident memory sampled while a document is ingested
+✅ Caches dropped, then the job stopped, when RSS growth passes the budget
+✅ Peak memory reported with the ingestion result
+"""
+
+import gc
+import os
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# RSS growth allowed while ingesting one document, in MB (0 disables the check)
+RSS_BUDGET_MB = int(os.environ.get('INGESTION_RSS_BUDGET_MB', 1024))
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """A document needed more memory than its ingestion budget allows"""
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB
+
+    Read through psutil when installed, else /proc; without either (macOS or
+    Windows without psutil) it is 0 and the budget is never enforced.
+    """
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return 0.0
+
+
+class MemoryTracker:
+    """RSS of this process while one document is ingested, against a growth budget
+
+    Growth is measured from the RSS when the tracker is created. Jobs that run
+    as threads of one process share its RSS, so memory taken by a concurrent
+    job counts against each of them. Extraction worker processes keep their
+    own tracker and report their peak growth through record_worker().
+    """
+
+    def __init__(self, budget_mb=None, low_memory=False):
+        self.budget_mb = RSS_BUDGET_MB if budget_mb is None else budget_mb
+        self.low_memory = low_memory
+        self.baseline_mb = current_rss_mb()
+        self.peak_mb = self.baseline_mb
+        self.worker_peak_growth_mb = 0.0
+        self.releases = 0
+
+    @property
+    def peak_growth_mb(self):
+        return max(self.peak_mb - self.baseline_mb, self.worker_peak_growth_mb)
+
+    def sample(self):
+        """Read the current RSS and update the peak; returns the RSS in MB"""
+        rss = current_rss_mb()
+        self.peak_mb = max(self.peak_mb, rss)
+        return rss
+
+    def over_budget(self):
+        return bool(self.budget_mb) and self.sample() - self.baseline_mb > self.budget_mb
+
+    def needs_release(self, pages_since_release, release_every):
+        """Whether the extractor should drop its document caches before the next page
+
+        Always true once over budget, switching to low-memory mode; in
+        low-memory mode also true every release_every pages.
+        """
+        if not pages_since_release:
+            return False
+        if self.over_budget():
+            if not self.low_memory:
+                print(f"⚠️ Extraction passed its {self.budget_mb} MB memory budget, switching to low-memory mode")
+                self.low_memory = True
+            return True
+        return self.low_memory and pages_since_release >= release_every
+
+    def released(self):
+        """Call after caches were dropped; raises MemoryBudgetExceeded if RSS is still over budget"""
+        gc.collect()
+        self.releases += 1
+        if self.over_budget():
+            raise MemoryBudgetExceeded(
+                f"Document needs more than the {self.budget_mb} MB ingestion memory budget "
+                f"({self.peak_mb - self.baseline_mb:.0f} MB used)")
+
+    def record_worker(self, growth_mb):
+        """Fold in the peak growth reported by an extraction worker process"""
+        self.worker_peak_growth_mb = max(self.worker_peak_growth_mb, growth_mb)
+
+    def to_dict(self):
+        """Memory summary for the ingestion result"""
+        return {
+            'peak_rss_mb': round(self.peak_mb, 1),
+            'peak_growth_mb': round(self.peak_growth_mb, 1),
+            'budget_mb': self.budget_mb,
+            'low_memory': self.low_memory,
+            'cache_releases': self.releases
+        }
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+🛡️ SANDBOXED DOCUMENT PARSING
+✅ Extraction and clause parsing run in worker subprocesses, not in server threads
+✅ Per-job wall-clock limit: a hung parse is killed and its content quarantined for a while
+✅ Per-worker address-space limit, so one document cannot exhaust the server
+✅ Workers recycled after a fixed number of documents, and after any failure
+✅ Page progress relayed back to the ingestion job
+"""
+
+import atexit
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Workers are forked so they share the server's loaded modules and parser functions
+SANDBOX_AVAILABLE = 'fork' in multiprocessing.get_all_start_methods()
+
+# Set PARSE_SANDBOX=0 to parse in the calling thread (debugging, or platforms without fork)
+SANDBOX_ENABLED = os.environ.get('PARSE_SANDBOX', '1') != '0'
+
+# Documents parsed at once; further parses wait for a free worker. Unset (0), the
+# servers size the pool to the bulk upload and ingestion job threads feeding it
+PARSE_WORKERS = int(os.environ.get('PARSE_WORKERS', 0))
+
+# Wall-clock seconds one document may take to extract and parse
+PARSE_TIMEOUT_SECONDS = float(os.environ.get('PARSE_TIMEOUT_SECONDS', 300))
+
+# Address space a worker may add while parsing, in MB (0 disables the limit)
+PARSE_MEMORY_LIMIT_MB = int(os.environ.get('PARSE_MEMORY_LIMIT_MB', 2048))
+
+# Seconds a document that hung or crashed its worker is refused before it may be tried again
+PARSE_QUARANTINE_SECONDS = float(os.environ.get('PARSE_QUARANTINE_SECONDS', 3600))
+
+# Documents a worker parses before it is replaced by a fresh process
+PARSE_WORKER_MAX_JOBS = int(os.environ.get('PARSE_WORKER_MAX_JOBS', 25))
+
+# Workers run at lower CPU priority than the request threads that answer queries
+PARSE_WORKER_NICENESS = 5
+
+
+def sandbox_workers(*feeder_workers):
+    """PARSE_WORKERS if set, else one worker per thread of the largest pool that submits parses (at least 2)"""
+    return PARSE_WORKERS or max((2,) + feeder_workers)
+
+
+class ParseFailed(RuntimeError):
+    """A document could not be parsed in its sandbox"""
+
+
+class ParseTimeout(ParseFailed):
+    """A document took longer than the parse time limit"""
+
+
+class _MemorySnapshot:
+    """Last memory summary relayed by a worker, in place of its MemoryTracker"""
+
+    def __init__(self, summary):
+        self.summary = summary
+
+    def to_dict(self):
+        return self.summary
+
+
+class _ProgressRelay:
+    """Stands in for an IngestionJob inside a worker, sending its updates to the server"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.memory = None
+
+    def set_stage(self, stage):
+        self._conn.send(('stage', stage))
+
+    def page_done(self, page):
+        self._conn.send(('page', page._replace(text=""), self.memory.to_dict() if self.memory else None))
+
+
+def _limit_memory(limit_mb):
+    """Cap this process's address space at its current size plus limit_mb"""
+    if not (limit_mb and RESOURCE_AVAILABLE):
+        return
+    try:
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        current = 0
+    limit = current + limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _worker_main(conn, server_conn, memory_limit_mb):
+    """Worker loop: parse each (target, file_path, relay_progress) task until told to stop"""
+    server_conn.close()
+    os.setpgid(0, 0)  # own process group, so a kill also reaches the extraction pool it starts
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        os.nice(PARSE_WORKER_NICENESS)
+    except OSError:
+        pass
+    _limit_memory(memory_limit_mb)
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+        target, file_path, relay_progress = task
+        try:
+            if relay_progress:
+                result = target(file_path, _ProgressRelay(conn))
+            else:
+                result = target(file_path)
+            conn.send(('result', result))
+        except BaseException as e:
+            try:
+                conn.send(('error', f"{type(e).__name__}: {e}"))
+            except Exception:
+                pass
+            if isinstance(e, MemoryError):
+                break  # the heap may be fragmented or half-built; let the server start a fresh worker
+    conn.close()
+
+
+class _Worker:
+    """One forked parser process and the server end of its pipe"""
+
+    def __init__(self, memory_limit_mb):
+        context = multiprocessing.get_context('fork')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, self.conn, memory_limit_mb),
+                                       name='parse-worker')
+        self.process.start()
+        child_conn.close()
+        self.jobs_done = 0
+
+    def run(self, target, file_path, job, timeout):
+        """Send one document to the worker and wait for its result, relaying progress to job"""
+        self.conn.send((target, file_path, job is not None))
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and (remaining <= 0 or not self.conn.poll(remaining)):
+                raise ParseTimeout(f"Parsing took longer than {timeout:.0f}s and was stopped")
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                self.process.join(1)
+                raise ParseFailed(f"Parser worker exited unexpectedly (exit code {self.process.exitcode})")
+
+            kind = message[0]
+            if kind == 'result':
+                self.jobs_done += 1
+                return message[1]
+            if kind == 'error':
+                raise ParseFailed(message[1])
+            if job is None:
+                continue
+            if kind == 'stage':
+                job.set_stage(message[1])
+            elif kind == 'page':
+                job.page_done(message[1])
+                if message[2]:
+                    job.memory = _MemorySnapshot(message[2])
+
+    def stop(self):
+        """Ask an idle worker to exit"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self):
+        """Kill the worker and any extraction processes it started"""
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (OSError, ProcessLookupError):
+            self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+
+
+class ParserSandbox:
+    """Run document parsers in a small pool of forked, time- and memory-limited workers
+
+    run(target, file_path, job, key) calls target(file_path) in a worker (or
+    target(file_path, job) with a stand-in job whose stage, page and memory
+    updates are relayed to the real one) and returns its result. At most
+    `workers` parses run at once, across every caller; the rest wait. A parse
+    that passes the time limit or kills its worker raises ParseTimeout or
+    ParseFailed; its key (the document's content hash, or else file_path) is
+    then quarantined for quarantine_seconds so later requests fail at once
+    instead of hanging again, and release_quarantine() lifts it early.
+    Exceptions raised by the parser come back as ParseFailed. A worker is
+    replaced after max_jobs documents or any failure.
+    Without fork support, or with PARSE_SANDBOX=0, targets run in the calling
+    thread with no limits.
+    """
+
+    def __init__(self, workers=None, timeout=None, memory_limit_mb=None, max_jobs=None, enabled=None,
+                 quarantine_seconds=None):
+        self.workers = sandbox_workers() if workers is None else workers
+        self.timeout = PARSE_TIMEOUT_SECONDS if timeout is None else timeout
+        self.memory_limit_mb = PARSE_MEMORY_LIMIT_MB if memory_limit_mb is None else memory_limit_mb
+        self.max_jobs = PARSE_WORKER_MAX_JOBS if max_jobs is None else max_jobs
+        self.enabled = SANDBOX_AVAILABLE and (SANDBOX_ENABLED if enabled is None else enabled)
+        self.quarantine_seconds = PARSE_QUARANTINE_SECONDS if quarantine_seconds is None else quarantine_seconds
+        # key -> (error message, monotonic time the quarantine ends)
+        self.quarantined = {}
+        self.counts = {'jobs': 0, 'failed': 0, 'timed_out': 0, 'workers_started': 0, 'workers_recycled': 0}
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(max(1, self.workers))
+        self._lock = threading.Lock()
+        self._busy = set()
+        atexit.register(self.shutdown)
+
+    def _checkout(self):
+        with self._lock:
+            worker = self._idle.pop() if self._idle else None
+        if worker is None or not worker.process.is_alive():
+            worker = _Worker(self.memory_limit_mb)
+            self.counts['workers_started'] += 1
+        with self._lock:
+            self._busy.add(worker)
+        return worker
+
+    def _checkin(self, worker, healthy):
+        with self._lock:
+            self._busy.discard(worker)
+            if healthy and worker.jobs_done < self.max_jobs:
+                self._idle.append(worker)
+                return
+        if healthy:
+            worker.stop()
+            self.counts['workers_recycled'] += 1
+        else:
+            worker.kill()
+
+    def run(self, target, file_path, job=None, key=None):
+        """Parse file_path with target in a worker; see the class docstring"""
+        if not self.enabled:
+            return target(file_path, job) if job is not None else target(file_path)
+        key = key or file_path
+        quarantine = self.quarantined.get(key)
+        if quarantine:
+            if time.monotonic() < quarantine[1]:
+                raise ParseFailed(quarantine[0])
+            self.quarantined.pop(key, None)
+
+        with self._slots:
+            self.counts['jobs'] += 1
+            worker = self._checkout()
+            healthy = False
+            try:
+                result = worker.run(target, file_path, job, self.timeout)
+                healthy = True
+                return result
+            except ParseFailed as e:
+                self.counts['failed'] += 1
+                if isinstance(e, ParseTimeout):
+                    self.counts['timed_out'] += 1
+                if isinstance(e, ParseTimeout) or not worker.process.is_alive():
+                    self.quarantined[key] = (str(e), time.monotonic() + self.quarantine_seconds)
+                    print(f"🛑 {os.path.basename(file_path)}: {e}")
+                raise
+            finally:
+                self._checkin(worker, healthy)
+
+    def release_quarantine(self):
+        """Let every quarantined document be parsed again; returns how many were released"""
+        released = len(self.quarantined)
+        self.quarantined.clear()
+        return released
+
+    def shutdown(self):
+        """Stop idle workers and kill busy ones"""
+        with self._lock:
+            idle, busy = self._idle, list(self._busy)
+            self._idle, self._busy = [], set()
+        for worker in idle:
+            worker.stop()
+        for worker in busy:
+            worker.kill()
+
+    def stats(self):
+        """Worker and failure counts for the health endpoint"""
+        return dict(self.counts, enabled=self.enabled, busy=len(self._busy), idle=len(self._idle),
+                    timeout_seconds=self.timeout, memory_limit_mb=self.memory_limit_mb,
+                    quarantined=sum(until > time.monotonic() for _, until in list(self.quarantined.values())))
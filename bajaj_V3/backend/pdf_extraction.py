@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+📄 PDF EXTRACTION ENGINE
+✅ Per-page extractor choice: fast PyPDF2 first, pdfplumber for weak or table pages
+✅ Large documents split across a process pool
+✅ Pages streamed in document order with char offsets
+✅ Per-page PyPDF2 fallback when pdfplumber fails
+✅ Page caches released as pages are emitted; low-memory mode for very large files
+"""
+
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from memory_budget import MemoryBudgetExceeded, MemoryTracker
+
+try:
+    import pdfplumber
+    import PyPDF2
+    PDF_LIBRARIES_AVAILABLE = True
+except ImportError:
+    PDF_LIBRARIES_AVAILABLE = False
+
+# Worker processes used for parallel extraction (1 disables the pool)
+EXTRACTION_WORKERS = int(os.environ.get('PDF_EXTRACTION_WORKERS', os.cpu_count() or 1))
+
+# Documents with fewer pages than this are extracted in-process
+MIN_PARALLEL_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 16))
+
+# Pages per worker task; small tasks keep pages flowing to the parser in order
+PARALLEL_CHUNK_PAGES = 8
+
+# 'adaptive' picks an extractor per page; 'pdfplumber' runs pdfplumber on every page
+EXTRACTION_STRATEGY = os.environ.get('PDF_EXTRACTION_STRATEGY', 'adaptive')
+
+# PyPDF2 text scoring below this (0-1) is re-extracted with pdfplumber
+MIN_TEXT_SCORE = float(os.environ.get('PDF_MIN_TEXT_SCORE', 0.6))
+
+# Non-space characters per 1000 square points expected on a text page (A4 is ~500)
+MIN_CHAR_DENSITY = 0.1
+
+# Thin filled rectangles or stroked segments that mark a page as holding a table
+TABLE_RULE_THRESHOLD = 16
+
+# Documents with at least this many pages start in low-memory mode (0: only once over
+# the memory budget, since releasing each page's layout already keeps RSS flat)
+LOW_MEMORY_MIN_PAGES = int(os.environ.get('PDF_LOW_MEMORY_MIN_PAGES', 0))
+
+# In low-memory mode the PDF is reopened after this many pages, dropping its object caches
+LOW_MEMORY_REOPEN_PAGES = 32
+
+# One extracted page. start/end are offsets into the document text built by
+# joining page texts with "\n" (empty pages are skipped). score is the PyPDF2
+# text quality and reason why pdfplumber was used ('table', 'low_score',
+# 'error'), both None when the page was not scored.
+PageRecord = namedtuple('PageRecord', ['page_number', 'page_count', 'text', 'start', 'end', 'extractor',
+                                       'score', 'reason'], defaults=(None, None))
+
+# "x y w h re" followed by a fill or stroke operator
+RECT_OPERATOR = re.compile(rb'(-?[\d.]+)\s+(-?[\d.]+)\s+(-?[\d.]+)\s+(-?[\d.]+)\s+re\s+(?:f\*?|S|B\*?)\s')
+LINE_OPERATOR = re.compile(rb'\sl\s')
+SPACE_RUNS = re.compile(r'[ \t]+')
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers):
+    """Shared process pool, created on first parallel extraction"""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=workers)
+            _executor_workers = workers
+        return _executor
+
+
+def _reset_executor():
+    """Drop a broken pool so the next extraction starts a fresh one"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
+
+
+def _forget_executor():
+    """In a forked child the inherited pool belongs to the parent; start from scratch"""
+    global _executor, _executor_workers, _executor_lock
+    _executor, _executor_workers, _executor_lock = None, 0, threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_executor)
+
+
+def _extract_page_range(file_path, start, end, strategy, low_memory=False, budget_mb=None):
+    """Extract pages [start, end) in a worker process; returns (pages, peak RSS growth in MB)"""
+    memory = MemoryTracker(budget_mb, low_memory)
+    if strategy == 'adaptive':
+        pages = [page[2:] for page in _iter_adaptive(file_path, start, end, memory)]
+    else:
+        pages = [(text, 'pdfplumber', None, None) for _, _, text in _plumber_pages(file_path, start, end, memory)]
+    return pages, memory.peak_growth_mb
+
+
+def score_text(text, page_area=None):
+    """Score extracted page text from 0 (unusable) to 1 (clean)
+
+    Combines character density on the page, the share of replacement,
+    private-use and control characters, and line/word structure (pages that
+    come out one character per line or with spaces missing score low).
+    """
+    nonspace = sum(1 for c in text if not c.isspace())
+    if not nonspace:
+        return 0.0
+
+    garbage = text.count('(cid:') * 5 + sum(
+        1 for c in text
+        if c == '\ufffd' or (unicodedata.category(c) in ('Co', 'Cc', 'Cn') and c not in '\n\t\r'))
+    garbage_score = max(0.0, 1 - 10 * garbage / nonspace)
+
+    density_score = 1.0
+    if page_area:
+        density_score = min(1.0, nonspace / (page_area / 1000) / MIN_CHAR_DENSITY)
+
+    lines = [line for line in text.splitlines() if line.strip()]
+    short_lines = sum(1 for line in lines if len(line.strip()) <= 2)
+    words = text.split()
+    run_together = sum(1 for word in words if len(word) > 30)
+    structure_score = (1 - short_lines / len(lines)) * (1 - run_together / len(words))
+
+    return round(density_score * garbage_score * structure_score, 3)
+
+
+def _count_table_rules(page):
+    """Count thin filled/stroked rectangles and line segments in a PyPDF2 page's content stream"""
+    contents = page.get_contents()
+    if contents is None:
+        return 0
+    data = contents.get_data()
+    rules = len(LINE_OPERATOR.findall(data))
+    for match in RECT_OPERATOR.finditer(data):
+        width, height = abs(float(match.group(3))), abs(float(match.group(4)))
+        if min(width, height) < 2 and max(width, height) > 20:
+            rules += 1
+    return rules
+
+
+def _normalize_pypdf2_text(text):
+    """Collapse the space runs and blank lines PyPDF2 leaves between text runs"""
+    lines = (SPACE_RUNS.sub(' ', line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _plumber_pages(file_path, start=0, end=None, memory=None):
+    """Yield (index, page_count, text) with pdfplumber, freeing each page's layout once read
+
+    In low-memory mode the PDF is also reopened every LOW_MEMORY_REOPEN_PAGES
+    pages, and whenever memory is over budget.
+    """
+    memory = memory or MemoryTracker()
+    pdf = pdfplumber.open(file_path)
+    try:
+        page_count = len(pdf.pages)
+        end = page_count if end is None else end
+        opened_at = start
+        for index in range(start, end):
+            if memory.needs_release(index - opened_at, LOW_MEMORY_REOPEN_PAGES):
+                pdf.close()
+                pdf = pdfplumber.open(file_path)
+                opened_at = index
+                memory.released()
+            page = pdf.pages[index]
+            text = page.extract_text() or ""
+            page.close()
+            yield index, page_count, text
+    finally:
+        pdf.close()
+
+
+def _iter_adaptive(file_path, start=0, end=None, memory=None):
+    """Yield pages from PyPDF2, re-extracting weak or table pages with pdfplumber
+
+    Yields (index, page_count, text, extractor, score, reason). pdfplumber is
+    only opened once the first page needs it. In low-memory mode (or when over
+    the memory budget) both readers are dropped every LOW_MEMORY_REOPEN_PAGES
+    pages so their object caches do not grow with the document.
+    """
+    memory = memory or MemoryTracker()
+    file = plumber = None
+    try:
+        try:
+            file = open(file_path, 'rb')
+            reader = PyPDF2.PdfReader(file)
+            page_count = len(reader.pages)
+        except Exception as e:
+            print(f"⚠️ PyPDF2 failed to open document: {e}")
+            yield from _iter_pdfplumber(file_path, start, end, memory)
+            return
+
+        end = page_count if end is None else end
+        opened_at = start
+        for index in range(start, end):
+            if memory.needs_release(index - opened_at, LOW_MEMORY_REOPEN_PAGES):
+                if plumber is not None:
+                    plumber.close()
+                    plumber = None
+                reader = PyPDF2.PdfReader(file)
+                opened_at = index
+                memory.released()
+
+            page = reader.pages[index]
+            try:
+                text = _normalize_pypdf2_text(page.extract_text() or "")
+                score = score_text(text, float(page.mediabox.width) * float(page.mediabox.height))
+                if _count_table_rules(page) >= TABLE_RULE_THRESHOLD:
+                    reason = 'table'
+                elif score < MIN_TEXT_SCORE:
+                    reason = 'low_score'
+                else:
+                    reason = None
+            except Exception as e:
+                print(f"⚠️ PyPDF2 failed at page {index + 1}: {e}")
+                text, score, reason = "", 0.0, 'error'
+
+            if reason:
+                try:
+                    if plumber is None:
+                        plumber = pdfplumber.open(file_path)
+                    plumber_page = plumber.pages[index]
+                    plumber_text = plumber_page.extract_text() or ""
+                    plumber_page.close()
+                    if plumber_text.strip() or not text:
+                        yield index, page_count, plumber_text, 'pdfplumber', score, reason
+                        continue
+                except Exception as e:
+                    print(f"⚠️ pdfplumber failed at page {index + 1}: {e}")
+            yield index, page_count, text, 'PyPDF2', score, reason
+    finally:
+        if plumber is not None:
+            plumber.close()
+        if file is not None:
+            file.close()
+
+
+def page_ranges(page_count, parts):
+    """Split [0, page_count) into at most `parts` contiguous ranges"""
+    parts = max(1, min(parts, page_count))
+    size, extra = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _iter_pypdf2(file_path, start=0, end=None):
+    """Yield (index, page_count, text, extractor, score, reason) with PyPDF2 for pages [start, end)"""
+    try:
+        with open(file_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            page_count = len(reader.pages)
+            for index in range(start, page_count if end is None else end):
+                yield index, page_count, reader.pages[index].extract_text() or "", 'PyPDF2', None, None
+    except Exception as e:
+        print(f"❌ PyPDF2 failed: {e}")
+
+
+def _iter_pdfplumber(file_path, start=0, end=None, memory=None):
+    """Yield pages [start, end) with pdfplumber, switching to PyPDF2 at the first failing page"""
+    index = start
+    try:
+        for index, page_count, text in _plumber_pages(file_path, start, end, memory):
+            yield index, page_count, text, 'pdfplumber', None, None
+        return
+    except MemoryBudgetExceeded:
+        raise
+    except Exception as e:
+        print(f"⚠️ pdfplumber failed at page {index + 1}: {e}")
+    yield from _iter_pypdf2(file_path, index, end)
+
+
+def _iter_parallel(file_path, page_count, workers, strategy, memory):
+    """Yield pages extracted by the process pool, in page order
+
+    Ranges are submitted lazily so at most 2 * workers ranges are in flight,
+    which bounds the number of extracted-but-unconsumed pages. Each worker
+    enforces the memory budget on its own RSS.
+    """
+    ranges = page_ranges(page_count, max(workers, -(-page_count // PARALLEL_CHUNK_PAGES)))
+    print(f"⚡ Extracting {page_count} pages across {workers} worker processes ({len(ranges)} tasks)")
+
+    executor = _get_executor(workers)
+    pending = deque()
+    next_range = 0
+    start = 0
+    try:
+        while pending or next_range < len(ranges):
+            while next_range < len(ranges) and len(pending) < workers * 2:
+                range_start, range_end = ranges[next_range]
+                pending.append((range_start, executor.submit(_extract_page_range, file_path, range_start, range_end,
+                                                             strategy, memory.low_memory, memory.budget_mb)))
+                next_range += 1
+            start, future = pending.popleft()
+            pages, growth_mb = future.result()
+            memory.record_worker(growth_mb)
+            for offset, page in enumerate(pages):
+                yield (start + offset, page_count) + tuple(page)
+        return
+    except MemoryBudgetExceeded:
+        raise
+    except BrokenProcessPool as e:
+        print(f"⚠️ Extraction pool failed ({e}), extracting in-process")
+        _reset_executor()
+        fallback = _iter_in_process(file_path, strategy, start, memory)
+    except Exception as e:
+        print(f"⚠️ pdfplumber failed at page {start + 1}: {e}")
+        fallback = _iter_pypdf2(file_path, start)
+    finally:
+        for _, future in pending:
+            future.cancel()
+    yield from fallback
+
+
+def _iter_in_process(file_path, strategy, start=0, memory=None):
+    """Yield pages from `start` without the process pool"""
+    if strategy == 'adaptive':
+        return _iter_adaptive(file_path, start, memory=memory)
+    return _iter_pdfplumber(file_path, start, memory=memory)
+
+
+def _iter_page_texts(file_path, workers, min_parallel_pages, strategy, memory=None):
+    """Yield (index, page_count, text, extractor, score, reason) for every page, in order"""
+    memory = memory or MemoryTracker()
+    try:
+        with pdfplumber.open(file_path) as pdf:
+            page_count = len(pdf.pages)
+    except Exception as e:
+        print(f"⚠️ pdfplumber failed: {e}")
+        yield from _iter_pypdf2(file_path)
+        return
+
+    if LOW_MEMORY_MIN_PAGES and page_count >= LOW_MEMORY_MIN_PAGES and not memory.low_memory:
+        print(f"🧮 {page_count} pages, extracting in low-memory mode")
+        memory.low_memory = True
+
+    if workers <= 1 or page_count < min_parallel_pages:
+        yield from _iter_in_process(file_path, strategy, memory=memory)
+    else:
+        yield from _iter_parallel(file_path, page_count, workers, strategy, memory)
+
+
+def iter_pages(file_path, workers=None, min_parallel_pages=None, strategy=None, memory=None):
+    """Stream the non-empty pages of a PDF as PageRecords, in page order
+
+    Each page is yielded as soon as it is extracted, so callers can parse a
+    window of pages instead of holding the whole document. Large documents are
+    extracted by the process pool (see EXTRACTION_WORKERS and MIN_PARALLEL_PAGES).
+    The adaptive strategy reads each page with PyPDF2 and uses pdfplumber only
+    for table pages and pages whose text scores below MIN_TEXT_SCORE. With the
+    pdfplumber strategy, a document where pdfplumber finds no text at all is
+    re-read with PyPDF2.
+
+    memory is the MemoryTracker of the ingestion, sampled after every page;
+    documents of LOW_MEMORY_MIN_PAGES pages or more, or passing the memory
+    budget, switch it to low-memory mode. MemoryBudgetExceeded is raised when extraction stays over budget
+    after dropping its caches.
+    """
+    workers = EXTRACTION_WORKERS if workers is None else workers
+    min_parallel_pages = MIN_PARALLEL_PAGES if min_parallel_pages is None else min_parallel_pages
+    strategy = EXTRACTION_STRATEGY if strategy is None else strategy
+    memory = memory or MemoryTracker()
+
+    offset = 0
+    extractors = set()
+    for index, page_count, text, extractor, score, reason in _iter_page_texts(
+            file_path, workers, min_parallel_pages, strategy, memory):
+        memory.sample()
+        extractors.add(extractor)
+        if text:
+            yield PageRecord(index + 1, page_count, text, offset, offset + len(text), extractor, score, reason)
+            offset += len(text) + 1
+
+    if offset == 0 and extractors == {'pdfplumber'} and strategy != 'adaptive':
+        print("⚠️ pdfplumber found no text, retrying with PyPDF2")
+        for index, page_count, text, extractor, _, _ in _iter_pypdf2(file_path):
+            if text:
+                yield PageRecord(index + 1, page_count, text, offset, offset + len(text), extractor)
+                offset += len(text) + 1
+
+
+def extract_page_texts(file_path, workers=None, min_parallel_pages=None, strategy=None):
+    """Extract every page's text (empty pages included), in page order"""
+    workers = EXTRACTION_WORKERS if workers is None else workers
+    min_parallel_pages = MIN_PARALLEL_PAGES if min_parallel_pages is None else min_parallel_pages
+    strategy = EXTRACTION_STRATEGY if strategy is None else strategy
+    return [page[2] for page in _iter_page_texts(file_path, workers, min_parallel_pages, strategy)]
+
+
+def extraction_stats(pages, memory=None, boilerplate=None, schedules=None):
+    """Summarize which extractor produced each page for document metadata
+
+    Memory use, header/footer stripping and schedule-table detection are
+    included when their MemoryTracker, BoilerplateStripper and
+    ScheduleTableReader are given.
+    """
+    pages = list(pages)
+    scores = [page.score for page in pages if page.score is not None]
+    return {
+        'pages': len(pages),
+        'extractors': dict(Counter(page.extractor for page in pages)),
+        'pdfplumber_reasons': dict(Counter(page.reason for page in pages if page.extractor == 'pdfplumber' and page.reason)),
+        'mean_score': round(sum(scores) / len(scores), 3) if scores else None,
+        'per_page': [
+            {'page': page.page_number, 'extractor': page.extractor, 'score': page.score, 'reason': page.reason}
+            for page in pages
+        ],
+        'memory': memory.to_dict() if memory else None,
+        'boilerplate': boilerplate.stats() if boilerplate else None,
+        'schedule_tables': schedules.stats() if schedules else None
+    }
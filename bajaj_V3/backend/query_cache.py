@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+🗃️ QUERY PARSE CACHE
+✅ Bounded LRU cache in front of query parsing, keyed by the query's canonical form
+✅ "46M knee surgery, Pune; 3-month policy" and "46m Knee Surgery Pune 3 month policy" share one entry
+✅ Hit / miss counters for the health endpoint
+✅ Cached results are read-only, so threads share them safely
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+# Parsed queries kept per cache (0 disables caching)
+QUERY_CACHE_SIZE = int(os.environ.get('QUERY_CACHE_SIZE', 1024))
+
+# Punctuation dropped from the canonical form; separators inside numbers
+# ("5,00,000", "2.5") and currency / percent signs carry meaning and stay
+PUNCTUATION = re.compile(r'(?<!\d)[.,]|[.,](?!\d)|[^\w\s.,₹$%]')
+
+
+def canonical_query(query):
+    """Case-folded query with punctuation dropped and whitespace collapsed"""
+    return " ".join(PUNCTUATION.sub(" ", query.casefold()).split())
+
+
+class ParsedQuery(dict):
+    """Read-only dict of parsed query fields
+
+    Serializes and reads like a dict; copy() gives a plain dict to modify.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("parsed queries are shared between requests and cannot be modified")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def copy(self):
+        return dict(self)
+
+
+class QueryCache:
+    """LRU cache of parse(query) results, keyed by canonical_query(query)
+
+    parse sees the query as it was asked; the canonical form is only the
+    key, so a variant that hits gets the result of the one parsed first.
+    Parses run outside the lock; two threads missing on one key both parse,
+    and the first result stored is kept.
+    """
+
+    def __init__(self, parse, maxsize=QUERY_CACHE_SIZE):
+        self.parse = parse
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, query):
+        key = canonical_query(query)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = ParsedQuery(self.parse(query))
+        if self.maxsize > 0:
+            with self._lock:
+                result = self._entries.setdefault(key, result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Size and hit / miss counts for the health endpoint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'size': len(self._entries), 'maxsize': self.maxsize, 'hits': self.hits,
+                    'misses': self.misses, 'hit_rate': round(self.hits / lookups, 3) if lookups else None}
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+🧭 QUERY PARSER
+✅ Age, gender, policy duration and medical-history cues read in one pass of one compiled regex
+✅ Procedure synonyms matched in one pass by a keyword automaton built at import
+✅ Case-insensitive throughout: "46M", "46m" and "46 Years Old" parse alike
+✅ Microseconds per query; see benchmark_query_parsing.py
+"""
+
+import re
+
+from keyword_scanner import KeywordScanner
+
+# Generic procedure words, used when no procedure synonym matches
+MEDICAL_WORDS = ['treatment', 'surgery', 'procedure', 'therapy', 'care', 'consultation',
+                 'test', 'scan', 'operation', 'visit']
+HISTORY_KEYWORDS = ['history', 'previous', 'past', 'chronic', 'existing']
+
+# Every cue the parser reads, found left to right in one finditer over the
+# lower-cased query; the text between cues is skipped by the regex engine
+QUERY_CUES = re.compile(r"""
+    (?=[\dacfmopstvw])(?<![a-z])(?:                                        # skip to a possible cue
+        (?P<number>\d+)(?:
+            \s*-?\s*(?P<unit>year|yr|month|mo)s?\b(?:\s*-?\s*(?P<old>old)\b)?   # "46 years old", "3-month"
+            | (?P<suffix>[ymf])\b                                           # "25y", "46M"
+        )?
+        | \b(?:
+            (?P<age>age)\s*[:\-]?\s*(?P<age_number>\d+)                     # "age: 46"
+            | (?P<gender>male|female|man|woman|pregnant|m|f)\b
+            | (?P<policy>policy|coverage)
+            | (?P<active>active)\b
+            | (?P<since>since|for)\b
+            | (?P<medical>""" + '|'.join(MEDICAL_WORDS) + r""")\b
+        )
+    )
+""", re.VERBOSE)
+
+YEAR_UNITS = {'year', 'yr'}
+GENDERS = {'m': 'male', 'male': 'male', 'man': 'male',
+           'f': 'female', 'female': 'female', 'woman': 'female', 'pregnant': 'female'}
+# Which gender cue wins when a query has several: a lone or suffixed M/F first, then words
+GENDER_RANK = {'m': 0, 'f': 0, 'male': 1, 'female': 1, 'man': 1, 'woman': 1, 'pregnant': 2}
+
+MAX_AGE = 120
+# "a 62 yr old" names a person even right after "policy"
+ARTICLE_BEFORE = re.compile(r'(?<![a-z])an?\s+$')
+
+
+class QueryParser:
+    """Structured fields of a natural-language claim query
+
+    procedure_mappings maps a procedure category to its synonyms; the longest
+    synonym present decides the category, the mapping's order breaking ties.
+    parse(query) returns the fields QueryProcessor.extract_user_info reports:
+    age, gender, procedure, procedure_confidence, policy_duration,
+    policy_duration_months and has_medical_history, each only when found.
+    """
+
+    def __init__(self, procedure_mappings):
+        self.scanner = KeywordScanner(dict(procedure_mappings, _history=HISTORY_KEYWORDS))
+        # Rank of each synonym: longest first, then the mapping's order; the best one present wins
+        self.ranks = {}
+        for position, (category, synonyms) in enumerate(procedure_mappings.items()):
+            for synonym in synonyms:
+                rank = ((-len(synonym) * 2, position), len(synonym) * 2, category)
+                self.ranks[synonym.lower()] = min(rank, self.ranks.get(synonym.lower(), rank))
+
+    def parse(self, query):
+        text = query.lower()
+        extracted = {}
+        ages = [None, None, None, None]
+        gender = medical = policy_at = last_policy_at = active_at = since_at = None
+        periods = []
+
+        for match in QUERY_CUES.finditer(text):
+            number, group = match.group('number'), match.lastgroup
+            if number:
+                count = int(number)
+                unit, suffix = match.group('unit'), match.group('suffix')
+                if unit:
+                    # "46 years old" is kept as a period: after "policy" it is the policy's age
+                    old = unit in YEAR_UNITS and match.group('old') is not None
+                    person = old and ARTICLE_BEFORE.search(text, max(0, match.start() - 4), match.start())
+                    periods.append((match.start(), count, 'years' if unit in YEAR_UNITS else 'months',
+                                    'person' if person else 'old' if old else None))
+                elif suffix:
+                    if ages[1] is None and 0 < count < MAX_AGE:
+                        ages[1] = count
+                    if suffix in GENDERS and (gender is None or GENDER_RANK[gender] > 0):
+                        gender = suffix
+            elif group == 'age_number':
+                if ages[2] is None and 0 < int(match.group('age_number')) < MAX_AGE:
+                    ages[2] = int(match.group('age_number'))
+            elif group == 'gender':
+                if gender is None or GENDER_RANK[match.group(group)] < GENDER_RANK[gender]:
+                    gender = match.group(group)
+            elif group == 'policy':
+                if policy_at is None:
+                    policy_at = match.start()
+                last_policy_at = match.start()
+            elif group == 'active':
+                if active_at is None:
+                    active_at = match.start()
+            elif group == 'since':
+                if active_at is not None and since_at is None:
+                    since_at = match.start()
+            elif group == 'medical' and medical is None:
+                medical = match.group(group)
+
+        duration = _policy_duration(periods, policy_at, last_policy_at, since_at)
+        # "46 years old", then "46 years", is an age unless it is the policy's duration
+        for start, count, unit, kind in periods:
+            if unit == 'years' and 0 < count < MAX_AGE and (duration is None or start != duration[0]):
+                slot = 3 if kind is None else 0
+                if ages[slot] is None:
+                    ages[slot] = count
+        age = next((age for age in ages if age is not None), None)
+        if age is not None:
+            extracted['age'] = age
+        if gender:
+            extracted['gender'] = GENDERS[gender]
+
+        hits = self.scanner.scan(text)
+        ranked = [self.ranks[keyword] for keyword in hits if keyword in self.ranks]
+        if ranked:
+            _, score, category = min(ranked)
+            extracted['procedure'] = category
+            extracted['procedure_confidence'] = min(95, score)
+        elif medical:
+            extracted['procedure'] = f"medical {medical}"
+            extracted['procedure_confidence'] = 60
+
+        if duration:
+            _, count, unit, _ = duration
+            extracted['policy_duration'] = f"{count} {unit}"
+            extracted['policy_duration_months'] = count * 12 if unit == 'years' else count
+
+        if self.scanner.found(hits, '_history'):
+            extracted['has_medical_history'] = True
+        return extracted
+
+
+def _policy_duration(periods, policy_at, last_policy_at, since_at):
+    """(position, count, 'years' | 'months', kind) of the policy's age, or None
+
+    Picks the period the legacy patterns did: the first one after
+    "policy"/"coverage" ("my policy is 2 years old" included), then the
+    first after "active ... since/for", then the first stated before a
+    "policy"/"coverage". Only "a 62 yr old" is never a duration, and
+    "46 years old" is not one before "policy".
+    """
+    for after in (policy_at, since_at):
+        if after is not None:
+            for period in periods:
+                if period[0] > after and period[3] != 'person':
+                    return period
+    for period in periods:
+        if last_policy_at is not None and period[0] < last_policy_at and period[3] is None:
+            return period
+    return None
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+🔁 RE-PARSING FROM CACHED TEXT
+✅ Every cached parse carries the parser version that produced it
+✅ Page layout and blanked schedule-table lines cached with the parse, so a re-parse sees the same pages
+✅ Stale documents re-run through clause parsing only, over the extracted text already on disk
+✅ Re-parses fanned out across the parse sandbox workers in parallel
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from document_store import cache_text_path, read_cache_entry
+from pdf_extraction import PageRecord
+from schedule_tables import ScheduleTableReader
+
+
+def page_layout(pages, schedules):
+    """What clause parsing needs besides the text: page spans and the schedule-table lines blanked out"""
+    return {
+        'pages': [[page.page_number, page.page_count, page.start, page.end, page.extractor, page.score, page.reason]
+                  for page in pages],
+        'blanked': schedules.blanked
+    }
+
+
+def cached_page_bodies(text, layout):
+    """(page, body) pairs rebuilt from a document's stored text and cached layout
+
+    body is the page with its schedule-table lines blanked, as the clause
+    parser saw it when the document was first extracted.
+    """
+    blanked = sorted(layout.get('blanked', []))
+    position = 0
+    pairs = []
+    for page_number, page_count, start, end, extractor, score, reason in layout['pages']:
+        page = PageRecord(page_number, page_count, text[start:end], start, end, extractor, score, reason)
+        pieces, cursor = [], start
+        while position < len(blanked) and blanked[position][0] < end:
+            blank_start, blank_end = blanked[position]
+            pieces += [text[cursor:blank_start], " " * (blank_end - blank_start)]
+            cursor = blank_end
+            position += 1
+        body = page._replace(text="".join(pieces) + text[cursor:end]) if pieces else page
+        pairs.append((page, body))
+    return pairs
+
+
+def load_cached_parse(cache_path):
+    """(page bodies, schedule reader) of a cached parse, read back for clause parsing"""
+    document = read_cache_entry(cache_path)['document']
+    with open(cache_text_path(cache_path), 'r', encoding='utf-8') as f:
+        text = f.read()
+    return cached_page_bodies(text, document['layout']), ScheduleTableReader.from_clauses(document['clauses'])
+
+
+def reparse_stale(store, reparse_document, sandbox, workers=None):
+    """Re-parse every stale, re-parseable document in the store from its cached text
+
+    reparse_document(cache_path) returns the re-parsed fields; it runs in the
+    parse sandbox, several documents at once. With workers=1 documents go one
+    at a time from the calling thread, as they must while the server module is
+    still importing: a worker forked from another thread would wait forever on
+    that import to unpickle reparse_document. Returns a report of what was
+    re-parsed, what failed, and what needs a full re-extraction instead.
+    """
+    started = datetime.now()
+    stale = store.stale_report()
+
+    def reparse_one(item):
+        result = {key: item[key] for key in ('content_hash', 'parser_version', 'cached_at')}
+        if not item['reparseable']:
+            return dict(result, status='needs_extraction')
+        try:
+            store.store_reparse(item['content_hash'], item['cache_path'], sandbox.run(reparse_document, item['cache_path'], key=item['content_hash']))
+            return dict(result, status='reparsed')
+        except Exception as e:
+            return dict(result, status='failed', error=str(e))
+
+    workers = max(1, workers or sandbox.workers)
+    if workers == 1:
+        results = [reparse_one(item) for item in stale]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='reparse') as executor:
+            results = list(executor.map(reparse_one, stale))
+
+    counts = {status: sum(result['status'] == status for result in results)
+              for status in ('reparsed', 'failed', 'needs_extraction')}
+    seconds = (datetime.now() - started).total_seconds()
+    if results:
+        print(f"🔁 Re-parsed {counts['reparsed']}/{len(results)} stale documents "
+              f"to parser v{store.parser_version} in {seconds:.1f}s")
+    return dict(counts, parser_version=store.parser_version, stale=len(results),
+                seconds=round(seconds, 3), documents=results)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+📊 BENEFIT SCHEDULE TABLES
+✅ pdfplumber table detection run only on pages that look like a benefit schedule
+✅ Rows stored as (benefit, limit, sub-limit, waiting period), one limit per plan column
+✅ Schedule rows feed the clause store directly
+✅ Table lines blanked out of the text the clause regexes scan
+"""
+
+import re
+from collections import namedtuple
+
+from amounts import parse_amount as normalize_amount
+from boilerplate import line_key
+
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    PDFPLUMBER_AVAILABLE = False
+
+# A page is checked for schedule tables when a line looks like a schedule header:
+# a benefit column followed by plan, limit or waiting-period columns
+SCHEDULE_HEADER = re.compile(
+    r'^\s*(?:benefits?|covers?|coverage|particulars|description)\b.{0,200}?'
+    r'\b(?:plans?|limits?|sub[\s-]?limits?|sum insured|amount|waiting)\b',
+    re.IGNORECASE | re.MULTILINE)
+
+# Header cells naming each column role, checked in this order (other non-empty cells are plans)
+BENEFIT_COLUMN = re.compile(r'^(?:benefits?|covers?|coverage|particulars|description|section)\b', re.IGNORECASE)
+COLUMN_ROLES = [
+    ('sub_limit', re.compile(r'\bsub[\s-]?limits?\b', re.IGNORECASE)),
+    ('waiting_period', re.compile(r'\bwaiting\b', re.IGNORECASE)),
+    ('limit', re.compile(r'\b(?:limits?|sum insured|amount|maximum|plans?|benefits?|options?)\b', re.IGNORECASE)),
+]
+
+# Cell values meaning the benefit is not offered under that plan
+NOT_COVERED = re.compile(r'^(?:na|n/a|nil|no|not (?:covered|applicable|available)|excluded|-+)$', re.IGNORECASE)
+
+PERIOD = re.compile(r'(\d+)\s*(days?|months?|years?)', re.IGNORECASE)
+NOTE = re.compile(r'\s*\bnote\s*:.*$', re.IGNORECASE)
+
+# One benefit-schedule row. limit is the first plan's limit that is offered;
+# plan_limits holds every plan column's value when the plans differ.
+ScheduleRow = namedtuple('ScheduleRow', ['benefit', 'limit', 'sub_limit', 'waiting_period', 'page_number',
+                                         'plan_limits'], defaults=((),))
+
+
+def is_schedule_candidate(page):
+    """Whether a PageRecord is worth running table detection on
+
+    Adaptive extraction flags ruled pages with reason 'table'; pages that were
+    not scored (pdfplumber strategy) are checked on their text alone. Either
+    way the page must carry a schedule-style header line.
+    """
+    if page.extractor not in ('PyPDF2', 'pdfplumber'):
+        return False
+    if page.reason != 'table' and page.score is not None:
+        return False
+    return bool(SCHEDULE_HEADER.search(page.text))
+
+
+def _cell_text(cell):
+    """Cell text on one line, rejoining words hyphenated across lines"""
+    if not cell:
+        return ""
+    return " ".join(re.sub(r'-\n(?=[a-z])', '-', cell).split())
+
+
+def parse_amount(value):
+    """Amount in a limit cell, 0 when it has none (percentages, day counts, "Up to Sum Insured")"""
+    amount = normalize_amount(value)
+    return amount.value if amount and amount.value else 0
+
+
+def _column_roles(row):
+    """Map a header row to column roles, or None when it is not a schedule header
+
+    The first cell must name the benefit column and no cell may hold a number,
+    so a data row such as "Cover for donor | INR 500,000" is not mistaken for
+    a header. Cells spanning several columns come back from pdfplumber as one
+    value followed by None; the None columns take the role of the cell on
+    their left.
+    """
+    if not row or not BENEFIT_COLUMN.match(_cell_text(row[0])) or len(_cell_text(row[0]).split()) > 4:
+        return None
+    if any(re.search(r'\d', cell) for cell in row if cell):
+        return None
+    roles = ['benefit']
+    for cell in row[1:]:
+        text = _cell_text(cell)
+        if cell is None:
+            roles.append(roles[-1] if roles[-1] != 'benefit' else 'limit')
+        elif not text:
+            roles.append(None)
+        else:
+            roles.append(next((role for role, pattern in COLUMN_ROLES if pattern.search(text)), 'limit'))
+    return roles if set(roles) & {'limit', 'sub_limit', 'waiting_period'} else None
+
+
+def _spread(row, roles):
+    """Fill spanned (None) cells with the value on their left within columns of the same role"""
+    values = []
+    for index, cell in enumerate(row):
+        spanned = cell is None and 1 < index < len(roles) and roles[index] == roles[index - 1]
+        values.append(values[-1] if spanned else _cell_text(cell))
+    return values
+
+
+def _row_record(values, roles, page_number):
+    benefit = NOTE.sub('', values[0]).rstrip(' *')
+    columns = {'limit': [], 'sub_limit': [], 'waiting_period': []}
+    for value, role in zip(values[1:], roles[1:]):
+        if role in columns:
+            columns[role].append(value)
+    plans = columns['limit']
+    limit = next((value for value in plans if value and not NOT_COVERED.match(value)), plans[0] if plans else "")
+    sub_limit = next((value for value in columns['sub_limit'] if value), "")
+    waiting = next((value for value in columns['waiting_period'] if value), "")
+    return ScheduleRow(benefit, limit, sub_limit, waiting, page_number, tuple(plans) if len(set(plans)) > 1 else ())
+
+
+def schedule_rows(table, page_number):
+    """Turn one extracted table (a list of rows of cells) into ScheduleRows
+
+    Tables without a schedule header row are not schedules and give no rows.
+    Header rows repeated inside a table (one per sub-schedule) restart the
+    column mapping; rows with a benefit but no values are sub-headings and are
+    skipped; rows with values but no benefit continue the row above.
+    """
+    rows, roles = [], None
+    for row in table:
+        header = _column_roles(row)
+        if header:
+            roles = header
+            continue
+        if roles is None:
+            continue
+        values = _spread(row, roles)
+        values += [""] * (len(roles) - len(values))
+        if not any(values[1:]):
+            continue
+        if not values[0]:
+            if rows:
+                previous = rows[-1]
+                extra = _row_record([previous.benefit] + values[1:], roles, page_number)
+                rows[-1] = previous._replace(limit=previous.limit or extra.limit,
+                                             sub_limit=previous.sub_limit or extra.sub_limit,
+                                             waiting_period=previous.waiting_period or extra.waiting_period)
+            continue
+        rows.append(_row_record(values, roles, page_number))
+    return rows
+
+
+class ScheduleTableReader:
+    """Pull benefit-schedule tables out of a PDF while its pages stream past
+
+    body_page(page) is called with each PageRecord in order. Candidate pages
+    (is_schedule_candidate) are re-opened with pdfplumber, which is only
+    loaded once the first candidate appears, and their tables run through
+    schedule_rows(). The page is returned with the lines of its schedule
+    tables overwritten by spaces, so the clause parser skips them while its
+    offsets still index the stored document text; the rows collect in
+    self.rows for apply() and the blanked [start, end) spans in self.blanked.
+    Other formats pass straight through.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.enabled = PDFPLUMBER_AVAILABLE and file_path.lower().endswith('.pdf')
+        self.rows = []
+        self.pages_checked = 0
+        self.table_pages = []
+        self.lines_removed = 0
+        self.blanked = []
+        self._pdf = None
+
+    @classmethod
+    def from_clauses(cls, clauses):
+        """Reader holding the schedule rows of a cached clause dict, for re-parsing without the file"""
+        reader = cls('')
+        reader.rows = [ScheduleRow(**{field: row[field] for field in ScheduleRow._fields if field in row})
+                       ._replace(plan_limits=tuple(row.get('plan_limits', ())))
+                       for row in clauses.get('benefit_schedule', [])]
+        return reader
+
+    def _tables(self, page_number):
+        """[(rows, table_lines)] for the schedule tables on a page"""
+        if self._pdf is None:
+            self._pdf = pdfplumber.open(self.file_path)
+        plumber_page = self._pdf.pages[page_number - 1]
+        try:
+            found = []
+            for table in plumber_page.find_tables():
+                rows = schedule_rows(table.extract(), page_number)
+                if rows:
+                    text = plumber_page.within_bbox(table.bbox).extract_text() or ""
+                    found.append((rows, {line_key(line) for line in text.split('\n') if line.strip()}))
+            return found
+        finally:
+            plumber_page.close()
+
+    def body_page(self, page):
+        """The page as the clause regexes should see it, with table lines blanked out"""
+        text = page.text
+        if self.enabled and is_schedule_candidate(page):
+            self.pages_checked += 1
+            try:
+                tables = self._tables(page.page_number)
+            except Exception as e:
+                print(f"⚠️ Table detection failed at page {page.page_number}: {e}")
+                tables = []
+            if tables:
+                self.table_pages.append(page.page_number)
+                table_lines = set()
+                for rows, lines in tables:
+                    self.rows.extend(rows)
+                    table_lines |= lines
+                lines = text.split('\n')
+                offset = page.start
+                for index, line in enumerate(lines):
+                    if line.strip() and line_key(line) in table_lines:
+                        lines[index] = " " * len(line)
+                        self.lines_removed += 1
+                        self.blanked.append([offset, offset + len(line)])
+                    offset += len(line) + 1
+                text = "\n".join(lines)
+                return page._replace(text=text)
+        return page
+
+    def close(self):
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+
+    def apply(self, clauses):
+        """Record the schedule rows in a clause dict
+
+        Rows go under 'benefit_schedule'; offered benefits are also entered
+        into inclusions and coverage_amounts (taking precedence over what the
+        regexes found), and stated waiting periods into waiting_periods.
+        """
+        clauses['benefit_schedule'] = [dict(row._asdict(), plan_limits=list(row.plan_limits)) for row in self.rows]
+        for row in self.rows:
+            service = row.benefit.lower()
+            if len(service) <= 3:
+                continue
+            if row.limit and not NOT_COVERED.match(row.limit):
+                clauses['inclusions'][service] = parse_amount(row.limit) or 1
+                clauses['coverage_amounts'][service] = row.limit
+            period = PERIOD.search(row.waiting_period)
+            if period:
+                clauses['waiting_periods'][service] = f"{period.group(1)} {period.group(2).lower()}"
+        return clauses
+
+    def stats(self):
+        """Table detection summary for the extraction stats"""
+        return {
+            'pages_checked': self.pages_checked,
+            'table_pages': self.table_pages,
+            'rows': len(self.rows),
+            'lines_removed': self.lines_removed
+        }
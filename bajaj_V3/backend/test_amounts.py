@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for ingest-time amount normalization
+"""
+
+import re
+
+from amounts import AMOUNT_GROUP, Amount, copay_percent, describe, normalize_clause_amounts, parse_amount
+
+
+def test_parse_amount_formats():
+    """Indian and international grouping, lakh/crore, currencies, percentages and per-unit limits"""
+    assert parse_amount('₹5,00,000') == Amount(500000, 'INR', None, None)
+    assert parse_amount('INR 500,000 per event') == Amount(500000, 'INR', None, 'event')
+    assert parse_amount('Rs. 2 crore').value == 20000000
+    assert parse_amount('Rs 1.5 lakhs per annum') == Amount(150000, 'INR', None, 'year')
+    assert parse_amount('₹5,000/day').per == 'day'
+    assert parse_amount('USD 7,500') == Amount(7500, 'USD', None, None)
+    assert parse_amount('1% of SI') == Amount(None, None, 1.0, None)
+    assert parse_amount('60 days') is None and parse_amount('Up to Sum Insured') is None
+    assert parse_amount('5000', bare=True).value == 5000 and parse_amount('5000') is None
+    assert copay_percent('A co-payment of 20% applies to every claim') == 20.0
+    assert copay_percent('10% co-pay for insured persons above 60') == 10.0
+
+
+def test_coverage_pattern_group():
+    """The amount group coverage patterns capture normalizes to the stated limit"""
+    pattern = re.compile(r'([a-z ]+):\s*covered up to\s*' + AMOUNT_GROUP, re.IGNORECASE)
+    match = pattern.search("Room rent: covered up to Rs. 5,000 per day")
+    amount = parse_amount(match.group(2), bare=True)
+    assert amount == Amount(5000, 'INR', None, 'day')
+    assert describe(amount) == "₹5,000 per day" and describe(None) == "Covered"
+    assert parse_amount(pattern.search("Cancer care: covered up to 5 lakh").group(2), bare=True).value == 500000
+
+
+def test_normalize_clause_amounts():
+    """Inclusions end up in whole rupees, with typed amounts alongside"""
+    clauses = {
+        'inclusions': {'room rent': 1, 'air ambulance': 7500, 'ambulance': 1},
+        'coverage_amounts': {'room rent': '₹5,000 per day', 'air ambulance': 'USD 7,500', 'ambulance': 'Covered'},
+        'benefit_schedule': [{'benefit': 'Cataract', 'limit': 'Rs. 40,000 per eye', 'sub_limit': '1% of SI'}],
+    }
+    normalize_clause_amounts(clauses)
+    assert clauses['inclusions'] == {'room rent': 5000, 'air ambulance': 1, 'ambulance': 1}
+    assert clauses['amounts']['room rent'] == {'value': 5000, 'currency': 'INR', 'percent': None, 'per': 'day'}
+    assert clauses['amounts']['air ambulance']['currency'] == 'USD' and 'ambulance' not in clauses['amounts']
+    row = clauses['benefit_schedule'][0]
+    assert row['limit_amount']['value'] == 40000 and row['limit_amount']['per'] == 'eye'
+    assert row['sub_limit_amount']['percent'] == 1.0
+
+
+if __name__ == "__main__":
+    print("🧪 Amount Normalization Tests")
+    print("=" * 40)
+    test_parse_amount_formats()
+    print("✅ Amount formats")
+    test_coverage_pattern_group()
+    print("✅ Coverage pattern amount group")
+    test_normalize_clause_amounts()
+    print("✅ Clause amounts normalized")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for header/footer stripping
+"""
+
+from boilerplate import BoilerplateStripper
+from pdf_extraction import PageRecord
+
+
+def make_pages(bodies, header=True):
+    pages = []
+    offset = 0
+    for number, body in enumerate(bodies, 1):
+        lines = []
+        if header:
+            lines += [f"UIN- BAJHLIP23020V012223 Global Health Care/ Policy Wordings/Page {number}",
+                      "Bajaj Allianz House, Airport Road, Yerawada, Pune - 411 006"]
+        lines += body
+        lines.append(f"Page {number} of {len(bodies)}")
+        text = "\n".join(lines)
+        pages.append(PageRecord(number, len(bodies), text, offset, offset + len(text), 'PyPDF2'))
+        offset += len(text) + 1
+    return pages
+
+
+def test_running_headers_and_page_numbers_are_stripped():
+    """Repeated header lines and page labels go; body text, even when it recurs, stays"""
+    words = ['room', 'ambulance', 'daycare', 'organ', 'donor', 'ayush', 'maternity', 'dental']
+    bodies = [[f"The {word} benefit applies to line {line} of this page." for line in range(12)] for word in words]
+    for number, body in enumerate(bodies):
+        body.insert(number % 4, "Cosmetic surgery is not covered.")
+    stripper = BoilerplateStripper()
+
+    pages = list(stripper.strip(iter(make_pages(bodies))))
+
+    assert [page.text for page in pages] == ["\n".join(body) for body in bodies]
+    text_content = "".join(page.text + "\n" for page in pages)
+    for page in pages:
+        assert text_content[page.start:page.end] == page.text
+
+    stats = stripper.stats()
+    assert stats['lines_stripped'] == 3 * len(bodies)
+    assert stats['page_numbers_stripped'] == len(bodies)
+    assert stats['repeated_lines'][0].startswith('UIN- BAJHLIP23020V012223')
+    assert 0.1 < stats['stripped_ratio'] < 0.3
+
+
+def test_text_without_furniture_is_unchanged():
+    """Pages with nothing repeated at their edges pass through untouched"""
+    bodies = [["Room rent", "Daily cash up to 1000"], ["Ambulance", "Road ambulance"], ["Organ donor", "Covered"]]
+    pages = make_pages(bodies, header=False)
+    pages = [page._replace(text=page.text.rsplit("\n", 1)[0]) for page in pages]
+    stripper = BoilerplateStripper()
+
+    assert [page.text for page in stripper.strip(iter(pages))] == [page.text for page in pages]
+    assert stripper.stats()['lines_stripped'] == 0
+
+
+def test_bare_numbers_follow_the_page_sequence():
+    """Bare page numbers are stripped; numeric table cells near the page edge stay"""
+    words = ['room', 'ambulance', 'daycare', 'organ', 'donor']
+    bodies = [[f"The {word} benefit applies to line {line} of this page." for line in range(9)]
+              + [f"{word.title()} waiting period (months)", str(30 - number), f"{word.title()} limit (days)",
+                 str(24 + number)] for number, word in enumerate(words)]
+    pages, offset = [], 0
+    for number, body in enumerate(bodies, 1):
+        # Printed numbers run two ahead of the page index (unnumbered cover pages)
+        text = "\n".join(body + [f"- {number + 2} -"] if number != 3 else body)
+        pages.append(PageRecord(number, len(bodies), text, offset, offset + len(text), 'PyPDF2'))
+        offset += len(text) + 1
+    stripper = BoilerplateStripper()
+
+    assert [page.text for page in stripper.strip(iter(pages))] == ["\n".join(body) for body in bodies]
+    assert stripper.stats()['page_numbers_stripped'] == 4
+
+
+if __name__ == "__main__":
+    print("🧪 Boilerplate Stripping Tests")
+    print("=" * 40)
+    test_running_headers_and_page_numbers_are_stripped()
+    print("✅ Running headers and page numbers stripped")
+    test_text_without_furniture_is_unchanged()
+    print("✅ Text without furniture unchanged")
+    test_bare_numbers_follow_the_page_sequence()
+    print("✅ Bare numbers follow the page sequence")
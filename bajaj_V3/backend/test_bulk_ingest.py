@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for bulk document ingestion
+"""
+
+import json
+import os
+import tempfile
+
+from bulk_ingest import directory_items, iter_bulk_results, ndjson_lines, resolve_import_directory
+
+
+def test_results_report_each_file():
+    """Every file gets a result: processed, failed or skipped"""
+    def ingest_one(filename, content):
+        if content == b'broken':
+            raise ValueError('corrupt PDF')
+        return {'size': len(content)}
+
+    items = [
+        ('a.pdf', b'%PDF-1.4 a'),
+        ('b.pdf', b'broken'),
+        ('scan.png', None),
+    ]
+    results = {result['filename']: result for result in iter_bulk_results(items, ingest_one, workers=2)}
+
+    assert results['a.pdf']['status'] == 'processed' and results['a.pdf']['size'] == 10
+    assert results['b.pdf']['status'] == 'failed' and results['b.pdf']['error'] == 'corrupt PDF'
+    assert results['scan.png']['status'] == 'skipped'
+    assert all('elapsed_ms' in result for result in results.values())
+
+
+def test_ndjson_ends_with_summary():
+    """Streamed results are one JSON object per line plus a summary line"""
+    lines = list(ndjson_lines(iter([{'filename': 'a.pdf', 'status': 'processed'},
+                                    {'filename': 'b.pdf', 'status': 'failed'}])))
+    summary = json.loads(lines[-1])['summary']
+    assert len(lines) == 3
+    assert (summary['files'], summary['processed'], summary['failed']) == (2, 1, 1)
+
+
+def test_directory_import_stays_inside_root():
+    """Directory imports resolve below the import root and list files in order"""
+    root = tempfile.mkdtemp()
+    catalog = os.path.join(root, 'catalog')
+    os.makedirs(os.path.join(catalog, 'nested'))
+    for name in ('b.pdf', 'a.pdf', os.path.join('nested', 'c.pdf')):
+        open(os.path.join(catalog, name), 'wb').close()
+
+    path, error = resolve_import_directory('catalog', import_root=root)
+    assert error is None
+    assert [name for name, _ in directory_items(path)] == ['a.pdf', 'b.pdf']
+    assert [name for name, _ in directory_items(path, recursive=True)] == ['a.pdf', 'b.pdf', 'c.pdf']
+
+    assert resolve_import_directory('../', import_root=root)[0] is None
+    assert resolve_import_directory('catalog', import_root='')[0] is None
+
+
+if __name__ == "__main__":
+    print("🧪 Bulk Ingestion Tests")
+    print("=" * 40)
+    test_results_report_each_file()
+    print("✅ Results report each file")
+    test_ndjson_ends_with_summary()
+    print("✅ NDJSON ends with summary")
+    test_directory_import_stays_inside_root()
+    print("✅ Directory import stays inside root")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming clause pipeline
+"""
+
+import re
+
+from conftest import clause_parser, make_pages, parse_whole, stream_pages
+
+EXCLUDED = re.compile(r'excluded:\s*(\w+)')
+
+
+def scan_window(window_text, accept, clauses, state):
+    for match in EXCLUDED.finditer(window_text):
+        if accept(match):
+            clauses['exclusions'].append(match.group(1))
+
+
+def test_streaming_matches_whole_document():
+    """Page-by-page parsing finds each clause once, including across page breaks"""
+    texts = ['intro excluded: cosmetic', 'surgery text excluded:', 'ivf and excluded: dental']
+    first_page_clauses = clause_parser(scan_window).feed(make_pages(texts)[0])
+    assert first_page_clauses['exclusions'] == ['cosmetic']
+
+    parser = clause_parser(scan_window)
+    streamed = stream_pages(parser, texts)
+    whole = parse_whole("".join(text + "\n" for text in texts), scan_window)
+    assert streamed['exclusions'] == whole['exclusions'] == ['cosmetic', 'ivf', 'dental']
+    assert parser.pages_parsed == 3
+
+
+if __name__ == "__main__":
+    print("🧪 Clause Pipeline Tests")
+    print("=" * 40)
+    test_streaming_matches_whole_document()
+    print("✅ Streaming parse matches whole document")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for clause records built at ingest
+"""
+
+import json
+
+from clause_records import ClauseIndex, document_clause_index, recorder_for
+from clause_segments import classify_segment, segment_text, split_items
+from conftest import clause_parser, make_pages, stream_pages
+from schedule_tables import ScheduleRow
+
+PAGE_TEXTS = [
+    "SECTION C - BENEFITS\n1.1 HOSPITALISATION\nRoom rent covered up to 5000 per day.",
+    "SECTION D - EXCLUSIONS\n1. Cosmetic surgery\n2. Dental treatment",
+    "TABLE OF BENEFITS\n",
+]
+
+
+def new_clauses():
+    return {'inclusions': {}, 'exclusions': [], 'waiting_periods': {}}
+
+
+def scan_window(window_text, accept, clauses, state):
+    recorder = recorder_for(state)
+    for segment in segment_text(window_text):
+        if not accept(segment):
+            continue
+        if segment.kind == 'heading':
+            recorder.enter_heading(segment)
+        for item in split_items(classify_segment(segment, state)):
+            clauses['exclusions'].append(item)
+            recorder.note('exclusion', item, segment.start, segment.end, keep_first=True)
+        if 'room rent' in segment.text.lower():
+            start = segment.start + segment.text.lower().index('room rent')
+            clauses['inclusions']['room rent'] = 5000
+            recorder.note('inclusion', 'room rent', start, start + len('room rent'))
+
+
+def parse_pages():
+    parser = clause_parser(scan_window, new_clauses)
+    clauses = stream_pages(parser, PAGE_TEXTS)
+    pages = make_pages(PAGE_TEXTS)
+    clauses['inclusions']['ambulance'] = 2000
+    rows = [ScheduleRow('Ambulance', 'INR 2,000', '', '', 3)]
+    return clauses, pages, recorder_for(parser.state).build(clauses, pages, rows)
+
+
+def test_records_cite_section_page_and_span():
+    """Records carry IDs, section paths and page numbers, and their spans index the stored text"""
+    clauses, pages, index = parse_pages()
+    text_content = "".join(page.text + "\n" for page in pages)
+
+    room = index.find('inclusion', 'room rent')
+    assert (room.clause_id, room.page_number, room.amount) == ('INC-1.1', 1, 5000)
+    assert room.section == 'SECTION C - BENEFITS > 1.1 HOSPITALISATION'
+    assert text_content[room.start:room.end] == 'Room rent'
+
+    dental = index.find('exclusion', 'dental treatment')
+    assert (dental.clause_id, dental.page_number, dental.section) == ('EXC-2.2', 2, 'SECTION D - EXCLUSIONS')
+    assert text_content[dental.start:dental.end] == '2. Dental treatment'
+
+    ambulance = index.find('inclusion', 'ambulance')
+    assert (ambulance.clause_id, ambulance.section, ambulance.page_number) == ('INC-3.1', 'Benefit schedule', 3)
+    assert index.cite('exclusion', 'cosmetic surgery')['clause_id'] == 'EXC-2.1'
+    assert index.cite('exclusion', 'not in this policy') is None
+
+
+def test_records_round_trip_through_the_cache():
+    """Rows survive JSON, give the same IDs when parsed again, and are indexed once per document"""
+    _, _, index = parse_pages()
+    _, _, again = parse_pages()
+    assert again.to_rows() == index.to_rows()
+
+    document = {'clause_records': json.loads(json.dumps(index.to_rows()))}
+    loaded = document_clause_index(document)
+    assert document_clause_index(document) is loaded
+    assert [clause.to_dict() for clause in loaded.clauses] == [clause.to_dict() for clause in index.clauses]
+    assert loaded.get('EXC-2.2').text == 'dental treatment'
+    assert len(ClauseIndex.from_rows([])) == 0
+
+
+if __name__ == "__main__":
+    print("🧪 Clause Record Tests")
+    print("=" * 40)
+    test_records_cite_section_page_and_span()
+    print("✅ Records cite section, page and span")
+    test_records_round_trip_through_the_cache()
+    print("✅ Records round-trip through the cache")
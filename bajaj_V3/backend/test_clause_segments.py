@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the one-pass clause segmenter
+"""
+
+import time
+
+from clause_segments import classify_segment, segment_text, split_items
+from conftest import clause_parser, parse_whole, stream_pages
+
+POLICY_TEXT = """SECTION C - EXCLUSIONS
+The Company shall not be liable to make any payment for:
+1. Cosmetic or plastic surgery
+unless necessary for reconstruction.
+2. Dental treatment; spectacles and contact lenses
+\uf0b7 Obesity treatment
+
+BENEFITS
+Room rent: covered up to 5000 per day.
+The following are not covered:
+a) Hearing aids
+b) Vitamins and tonics.
+Claims are settled within 30 days. Pre-existing diseases are excluded after renewal.
+"""
+
+
+def scan_window(window_text, accept, clauses, state):
+    for segment in segment_text(window_text):
+        if accept(segment):
+            excluded = classify_segment(segment, state)
+            clauses['exclusions'].extend(split_items(excluded))
+
+
+def test_segments_and_offsets():
+    """Headings, numbered clauses, bullets and paragraphs, each with its source span"""
+    segments = segment_text(POLICY_TEXT)
+
+    assert [(segment.kind, segment.label) for segment in segments] == [
+        ('heading', ''), ('paragraph', ''), ('clause', '1.'), ('clause', '2.'), ('item', '\uf0b7'),
+        ('heading', ''), ('paragraph', ''), ('paragraph', ''), ('clause', 'a)'), ('clause', 'b)'),
+        ('paragraph', '')]
+    for segment in segments:
+        assert POLICY_TEXT[segment.start:segment.end] == segment.text
+    assert segments[2].text.endswith('reconstruction.')
+    assert segments[-1].text.startswith('Claims are settled')
+
+
+def test_exclusions_by_context():
+    """Exclusion headings, introducing lines and inline phrases each give the right items"""
+    clauses = parse_whole(POLICY_TEXT, scan_window)
+
+    assert clauses['exclusions'] == [
+        'the company shall not be liable to make any payment for:',
+        'cosmetic or plastic surgery unless necessary for reconstruction',
+        'dental treatment', 'spectacles and contact lenses', 'obesity treatment',
+        'hearing aids', 'vitamins and tonics', 'after renewal']
+
+
+def test_streaming_matches_whole_document():
+    """Page-by-page segment parsing gives the same exclusions as one window"""
+    lines = POLICY_TEXT.split('\n')
+    texts = ['\n'.join(lines[:4]), '\n'.join(lines[4:10]), '\n'.join(lines[10:])]
+    streamed = stream_pages(clause_parser(scan_window), texts)
+    assert streamed['exclusions'] == parse_whole(POLICY_TEXT, scan_window)['exclusions']
+
+
+def test_parse_time_is_linear():
+    """Four times the text takes roughly four times as long, not sixteen"""
+    def best_time(text):
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            parse_whole(text, scan_window)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    small = POLICY_TEXT * 50
+    assert best_time(small * 4) < 8 * best_time(small)
+
+
+if __name__ == "__main__":
+    print("🧪 Clause Segment Tests")
+    print("=" * 40)
+    test_segments_and_offsets()
+    print("✅ Segments and offsets")
+    test_exclusions_by_context()
+    print("✅ Exclusions by context")
+    test_streaming_matches_whole_document()
+    print("✅ Streaming matches whole document")
+    test_parse_time_is_linear()
+    print("✅ Parse time is linear")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for the DOCX, text and email extractors
+"""
+
+import io
+import mailbox
+import os
+import tempfile
+import zipfile
+from email.message import EmailMessage
+
+from document_formats import TEXT_PAGE_CHARS, iter_document_pages, split_mailbox, split_stored_mailboxes
+from document_store import DocumentStore, hash_file
+
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'EDLHLGA23009V012223.pdf')
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def docx_bytes(body_xml):
+    """A minimal DOCX holding only word/document.xml"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('word/document.xml', f'<w:document {W}><w:body>{body_xml}</w:body></w:document>')
+    return buffer.getvalue()
+
+
+def paragraph(text):
+    return f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>'
+
+
+def write(folder, name, data):
+    path = os.path.join(folder, name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def test_docx_paragraphs_tables_and_page_breaks():
+    """Paragraphs stream in order, table rows become "cell | cell" lines, page breaks split pages"""
+    body = (paragraph('Section 1 Exclusions') + paragraph('Cosmetic surgery is not covered.')
+            + '<w:tbl><w:tr><w:tc>' + paragraph('Room rent') + '</w:tc><w:tc>' + paragraph('Rs 5000')
+            + '</w:tc></w:tr></w:tbl>'
+            + '<w:p><w:r><w:br w:type="page"/></w:r></w:p>' + paragraph('Section 2 Benefits'))
+    path = write(tempfile.mkdtemp(), 'policy.docx', docx_bytes(body))
+
+    pages = list(iter_document_pages(path))
+
+    assert [page.text for page in pages] == [
+        'Section 1 Exclusions\nCosmetic surgery is not covered.\nRoom rent | Rs 5000',
+        'Section 2 Benefits'
+    ]
+    assert {page.extractor for page in pages} == {'docx'}
+    assert pages[-1].page_number == pages[-1].page_count == 2
+
+
+def test_text_files_are_paged_and_decoded():
+    """Long text is cut into pages on line boundaries; non-UTF-8 bytes still decode"""
+    folder = tempfile.mkdtemp()
+    line = 'The policy covers hospitalisation expenses.\n'
+    path = write(folder, 'wording.txt', (line * (3 * TEXT_PAGE_CHARS // len(line))).encode())
+
+    pages = list(iter_document_pages(path))
+    text_content = "".join(page.text + "\n" for page in pages)
+
+    assert len(pages) == 3
+    assert all(page.text.endswith('expenses.') for page in pages)
+    for page in pages:
+        assert text_content[page.start:page.end] == page.text
+
+    latin = write(folder, 'latin.txt', 'Premium: 5000 € for caf\xe9 staff'.encode('cp1252'))
+    assert [page.text for page in iter_document_pages(latin)] == ['Premium: 5000 € for caf\xe9 staff']
+
+
+def test_mbox_yields_each_message_and_its_attachments():
+    """Every message of an mbox is read, with text from its DOCX, text and PDF attachments"""
+    folder = tempfile.mkdtemp()
+    box = mailbox.mbox(os.path.join(folder, 'claims.mbox'))
+    for number in range(1, 4):
+        message = EmailMessage()
+        message['From'] = 'claims@example.com'
+        message['Subject'] = f'Claim {number}'
+        message.set_content(f'Claim number {number} for knee surgery.')
+        if number == 1:
+            message.add_attachment(docx_bytes(paragraph('Hospital bill Rs 40000')), maintype='application',
+                                   subtype='vnd.openxmlformats-officedocument.wordprocessingml.document',
+                                   filename='bill.docx')
+            message.add_attachment('Discharge summary', filename='summary.txt')
+        if number == 2:
+            with open(SAMPLE_PDF, 'rb') as f:
+                message.add_attachment(f.read(), maintype='application', subtype='pdf', filename='policy.pdf')
+        box.add(message)
+    box.close()
+
+    pages = list(iter_document_pages(os.path.join(folder, 'claims.mbox')))
+
+    bodies = [page for page in pages if page.extractor == 'email']
+    assert [page.page_number for page in bodies] == [1, 2, 3]
+    assert all(page.page_count == 3 for page in pages)
+    assert 'Subject: Claim 2' in bodies[1].text and 'knee surgery' in bodies[1].text
+    first = [page.text for page in pages if page.page_number == 1]
+    assert first[1] == '[Attachment: bill.docx]\nHospital bill Rs 40000'
+    assert first[2] == '[Attachment: summary.txt]\nDischarge summary'
+    pdf_pages = [page for page in pages if page.page_number == 2 and page.extractor != 'email']
+    assert pdf_pages and pdf_pages[0].text.startswith('[Attachment: policy.pdf]')
+
+
+def claim_message(number):
+    message = EmailMessage()
+    message['Subject'] = f'Claim {number}'
+    message.set_content(f'Claim number {number} for knee surgery.')
+    message.add_attachment(f'Bill for claim {number}', filename='bill.txt')
+    return message
+
+
+def write_mailbox(path, messages):
+    box = mailbox.mbox(path)
+    for message in messages:
+        box.add(message)
+    box.close()
+
+
+def test_mailbox_splits_into_one_document_per_message():
+    """Each message is stored as its own .eml, hashed by its own bytes; the mbox is removed"""
+    folder = tempfile.mkdtemp()
+    store = DocumentStore(folder, parser_name='test', parser_version=1)
+    claims = [claim_message(number) for number in range(1, 5)]
+    write_mailbox(os.path.join(folder, 'claims.mbox'), claims[:3])
+
+    messages = list(split_mailbox(os.path.join(folder, 'claims.mbox'), folder, store))
+
+    assert [message[0] for message in messages] == ['claims-1.eml', 'claims-2.eml', 'claims-3.eml']
+    assert len({message[1] for message in messages}) == 3
+    assert all(hash_file(message[2]) == message[1] for message in messages)
+    assert not os.path.exists(os.path.join(folder, 'claims.mbox'))
+    texts = [page.text for page in iter_document_pages(messages[1][2])]
+    assert texts == ['Subject: Claim 2\n\nClaim number 2 for knee surgery.', '[Attachment: bill.txt]\nBill for claim 2']
+
+    # A message already stored from another mailbox is not written again
+    write_mailbox(os.path.join(folder, 'more.mbox'), claims[2:])
+    split_stored_mailboxes(folder, store)
+    stored = sorted(name for name in os.listdir(folder) if name.endswith('.eml'))
+    assert len(stored) == 4 and not any(name.endswith('.mbox') for name in os.listdir(folder))
+    assert [entry[1] for entry in store.scan(hash_files=False)] == [
+        name.split('_', 1)[1] for name in sorted(os.listdir(folder)) if name.endswith('.eml')]
+
+
+def test_eml_recurses_into_forwarded_messages():
+    """A forwarded message attached to an .eml is extracted like the outer one"""
+    inner = EmailMessage()
+    inner['Subject'] = 'Original claim'
+    inner.add_alternative('<html><body><p>Claim for <b>cataract</b> surgery</p><script>x()</script></body></html>',
+                          subtype='html')
+    outer = EmailMessage()
+    outer['Subject'] = 'Fwd: Original claim'
+    outer.set_content('See below.')
+    outer.add_attachment(inner)
+    path = write(tempfile.mkdtemp(), 'forward.eml', outer.as_bytes())
+
+    texts = [page.text for page in iter_document_pages(path)]
+
+    assert texts[0] == 'Subject: Fwd: Original claim\n\nSee below.'
+    assert texts[1] == '[Attachment: message/rfc822]\nSubject: Original claim\n\nClaim for cataract surgery'
+
+
+if __name__ == "__main__":
+    print("🧪 Document Format Tests")
+    print("=" * 40)
+    test_docx_paragraphs_tables_and_page_breaks()
+    print("✅ DOCX paragraphs, tables and page breaks")
+    test_text_files_are_paged_and_decoded()
+    print("✅ Text files paged and decoded")
+    test_mbox_yields_each_message_and_its_attachments()
+    print("✅ Mbox messages and attachments")
+    test_mailbox_splits_into_one_document_per_message()
+    print("✅ Mailbox split into one document per message")
+    test_eml_recurses_into_forwarded_messages()
+    print("✅ Forwarded messages recursed")
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed document store
+"""
+
+import io
+import os
+import tempfile
+
+from document_store import TEXT_INDEX_STRIDE, DocumentStore, DocumentText, UploadRejected, UploadStream, hash_file, save_stream
+
+
+def test_duplicate_uploads_share_one_copy():
+    """Identical bytes are stored once and parsed once"""
+    upload_folder = tempfile.mkdtemp()
+    store = DocumentStore()
+    parse_calls = []
+
+    def parse_document(file_path):
+        parse_calls.append(file_path)
+        return {'text_content': 'policy text', 'clauses': {'inclusions': {}, 'exclusions': []}}
+
+    content = b'%PDF-1.4 sample policy wording'
+    first_hash, first_path, first_size = save_stream(io.BytesIO(content), upload_folder, 'policy.pdf', store)
+    first_doc, first_hit = store.get_or_parse(first_hash, first_path, parse_document)
+
+    second_hash, second_path, second_size = save_stream(io.BytesIO(content), upload_folder, 'copy.pdf', store)
+    second_doc, second_hit = store.get_or_parse(second_hash, second_path, parse_document)
+
+    assert first_hash == second_hash == hash_file(first_path)
+    assert first_path == second_path
+    assert first_size == second_size == len(content)
+    assert not first_hit and second_hit
+    assert first_doc is second_doc
+    assert len(parse_calls) == 1
+    assert len([f for f in os.listdir(upload_folder) if not f.startswith('.')]) == 1
+
+
+def test_different_content_is_stored_separately():
+    """Different bytes get their own stored document"""
+    upload_folder = tempfile.mkdtemp()
+    store = DocumentStore()
+
+    first_hash, first_path, _ = save_stream(io.BytesIO(b'%PDF-1.4 one'), upload_folder, 'a.pdf', store)
+    second_hash, second_path, _ = save_stream(io.BytesIO(b'%PDF-1.4 two'), upload_folder, 'a.pdf', store)
+
+    assert first_hash != second_hash
+    assert first_path != second_path
+
+
+def test_uploads_reuse_copies_saved_under_other_names():
+    """Copies saved as "<uuid>_<name>" before content addressing are found by hash, not rewritten"""
+    upload_folder = tempfile.mkdtemp()
+    content = b'%PDF-1.4 legacy policy wording'
+    for prefix in ('0c7d', '9f1e'):
+        with open(os.path.join(upload_folder, f'{prefix}_EDLHLGA23009V012223.pdf'), 'wb') as f:
+            f.write(content)
+    with open(os.path.join(upload_folder, 'other.pdf'), 'wb') as f:
+        f.write(b'%PDF-1.4 other')
+
+    store = DocumentStore(upload_folder, parser_name='test', parser_version=1)
+    content_hash, file_path, _ = save_stream(io.BytesIO(content), upload_folder, 'EDLHLGA23009V012223.pdf', store)
+    assert os.path.basename(file_path) == '0c7d_EDLHLGA23009V012223.pdf'
+    assert len([f for f in os.listdir(upload_folder) if not f.startswith('.')]) == 3
+    assert store.stored_paths[content_hash] == file_path
+
+    # A hashing scan fills the index, so the next store reuses copies without hashing on upload
+    restarted = DocumentStore(upload_folder, parser_name='test', parser_version=1)
+    list(restarted.scan())
+    assert restarted.stored_path(content_hash) == file_path
+    assert save_stream(io.BytesIO(content), upload_folder, 'again.pdf', restarted)[1] == file_path
+
+
+def test_parse_cache_survives_restart():
+    """A fresh store loads parsed fields from the sidecar cache without re-parsing"""
+    upload_folder = tempfile.mkdtemp()
+    parse_calls = []
+
+    def parse_document(file_path):
+        parse_calls.append(file_path)
+        return {'text_content': 'policy text', 'clauses': {'inclusions': {'surgery': 5000}, 'exclusions': []}}
+
+    first_store = DocumentStore(upload_folder, parser_name='test', parser_version=1)
+    content_hash, file_path, file_size = save_stream(io.BytesIO(b'%PDF-1.4 cached'), upload_folder, 'policy.pdf', first_store)
+    first_store.get_or_parse(content_hash, file_path, parse_document)
+    first_store.record_alias('upload-1', 'policy.pdf', content_hash, file_path, file_size, '2024-01-01T00:00:00')
+
+    restarted_store = DocumentStore(upload_folder, parser_name='test', parser_version=1)
+    scanned = list(restarted_store.scan())
+    document, cache_hit = restarted_store.get_or_parse(content_hash, file_path, parse_document)
+
+    assert cache_hit
+    assert len(parse_calls) == 1
+    assert document['clauses']['inclusions'] == {'surgery': 5000}
+    assert 'text_content' not in document
+    assert document['text'].read() == 'policy text'
+    assert document['text_length'] == len('policy text')
+    assert [entry[0] for entry in scanned] == ['upload-1']
+
+    bumped_store = DocumentStore(upload_folder, parser_name='test', parser_version=2)
+    _, cache_hit = bumped_store.get_or_parse(content_hash, file_path, parse_document)
+    assert not cache_hit
+    assert len(parse_calls) == 2
+
+
+def test_scan_without_hashing_reads_no_file_contents():
+    """A lazy scan lists unaliased files without hashing them"""
+    upload_folder = tempfile.mkdtemp()
+    store = DocumentStore(upload_folder, parser_name='test', parser_version=1)
+    with open(os.path.join(upload_folder, 'legacy.pdf'), 'wb') as f:
+        f.write(b'%PDF-1.4 legacy')
+    content_hash, file_path, file_size = save_stream(io.BytesIO(b'%PDF-1.4 new'), upload_folder, 'new.pdf', store)
+    store.record_alias('upload-1', 'new.pdf', content_hash, file_path, file_size, '2024-01-01T00:00:00')
+
+    scanned = {entry[1]: entry for entry in store.scan(hash_files=False)}
+
+    assert scanned['new.pdf'][2] == content_hash
+    assert scanned['legacy.pdf'][2] is None
+    assert scanned['legacy.pdf'][4] == len(b'%PDF-1.4 legacy')
+
+
+def test_lazily_hashed_files_are_aliased_and_listed_once():
+    """A stub hashed after a lazy scan is found by hash, listed once after a restart, and re-read once modified"""
+    upload_folder = tempfile.mkdtemp()
+    file_path = os.path.join(upload_folder, '5f2b9c1e-upload_policy.pdf')
+    with open(file_path, 'wb') as f:
+        f.write(b'%PDF-1.4 uuid named copy')
+
+    store = DocumentStore(upload_folder, parser_name='test', parser_version=1)
+    [(file_id, filename, content_hash, _, file_size, upload_time)] = store.scan(hash_files=False)
+    assert content_hash is None
+
+    content_hash = hash_file(file_path)
+    store.record_alias(file_id, filename, content_hash, file_path, file_size, upload_time)
+    assert store.stored_path(content_hash) == file_path
+
+    restarted = DocumentStore(upload_folder, parser_name='test', parser_version=1)
+    assert list(restarted.scan(hash_files=False)) == [(file_id, filename, content_hash, file_path, file_size, upload_time)]
+    assert restarted.stored_path(content_hash) == file_path
+
+    with open(file_path, 'ab') as f:
+        f.write(b' amended')
+    os.utime(file_path, (0, 0))
+    rescanned = list(DocumentStore(upload_folder, parser_name='test', parser_version=1).scan(hash_files=False))
+    assert [(entry[0], entry[2]) for entry in rescanned] == [(file_id, None)]
+
+
+def test_document_text_slices_by_character_offset():
+    """Slices through the mmap match slicing the original string, across index strides"""
+    text = ("Room rent ₹5,000 per day; ICU — ₹10,000. " * 400)[:TEXT_INDEX_STRIDE * 3 + 17]
+    document_text = DocumentText.write(os.path.join(tempfile.mkdtemp(), 'doc.txt'), text)
+
+    assert len(document_text) == len(text)
+    assert document_text.read() == text
+    for start, end in [(0, 10), (TEXT_INDEX_STRIDE - 5, TEXT_INDEX_STRIDE + 5), (100, TEXT_INDEX_STRIDE * 2 + 3), (len(text) - 4, len(text) + 50)]:
+        assert document_text.slice(start, end) == text[start:end]
+    assert document_text.preview(20) == text[:20] + "..."
+    assert document_text.context(50, 60, margin=5) == text[45:65]
+
+
+def test_bad_uploads_are_rejected_while_streaming():
+    """Oversized, mis-typed and empty uploads raise UploadRejected and leave nothing on disk"""
+    upload_folder = tempfile.mkdtemp()
+    store = DocumentStore()
+    cases = [
+        (b'%PDF-1.4 ' + b'x' * 2048, 1024, 413),
+        (b'<html>not a pdf</html>', None, 400),
+        (b'', None, 400),
+    ]
+    for content, max_size, status_code in cases:
+        try:
+            save_stream(io.BytesIO(content), upload_folder, 'policy.pdf', store, max_size=max_size)
+        except UploadRejected as e:
+            assert e.status_code == status_code
+        else:
+            raise AssertionError(f"upload of {len(content)} bytes was accepted")
+    assert os.listdir(upload_folder) == []
+
+    upload = UploadStream(upload_folder, 'policy.pdf')
+    for chunk in (b'%P', b'DF-1.4 ', b'streamed'):
+        upload.write(chunk)
+    content_hash, file_path, file_size = save_stream(upload, upload_folder, 'policy.pdf', store)
+    upload.close()
+    assert file_size == len(b'%PDF-1.4 streamed')
+    assert content_hash == hash_file(file_path)
+    assert os.listdir(upload_folder) == [os.path.basename(file_path)]
+
+
+if __name__ == "__main__":
+    print("🧪 Document Store Tests")
+    print("=" * 40)
+    test_duplicate_uploads_share_one_copy()
+    print("✅ Duplicate uploads share one copy")
+    test_different_content_is_stored_separately()
+    print("✅ Different content stored separately")
+    test_uploads_reuse_copies_saved_under_other_names()
+    print("✅ Uploads reuse copies saved under other names")
+    test_parse_cache_survives_restart()
+    print("✅ Parse cache survives restart")
+    test_scan_without_hashing_reads_no_file_contents()
+    print("✅ Lazy scan skips hashing")
+    test_lazily_hashed_files_are_aliased_and_listed_once()
+    print("✅ Lazily hashed files are aliased and listed once")
+    test_document_text_slices_by_character_offset()
+    print("✅ Document text slices by character offset")
+    test_bad_uploads_are_rejected_while_streaming()
+    print("✅ Bad uploads rejected while streaming")
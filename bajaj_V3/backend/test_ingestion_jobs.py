@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for background ingestion jobs
+"""
+
+import threading
+
+from ingestion_jobs import JobManager
+from pdf_extraction import PageRecord
+
+
+def test_job_reports_stages_and_pages():
+    """A job moves through page progress to done with its result"""
+    manager = JobManager(max_workers=1, max_queued=1)
+    release = threading.Event()
+    started = threading.Event()
+    seen = []
+
+    def work(job):
+        for number in (1, 2):
+            job.page_done(PageRecord(number, 4, 'text', 0, 4, 'pdfplumber'))
+        seen.append(job.to_dict())
+        started.set()
+        release.wait(5)
+        job.set_stage('indexing')
+        return {'inclusions_found': 3}
+
+    job = manager.submit('doc-1', 'policy.pdf', work)
+    assert started.wait(5)
+    assert seen[0]['status'] == 'processing'
+    assert seen[0]['stage'] == 'extracting'
+    assert (seen[0]['pages_done'], seen[0]['page_count'], seen[0]['progress']) == (2, 4, 45)
+
+    release.set()
+    manager._executor.shutdown(wait=True)
+    progress = manager.get('doc-1').to_dict()
+    assert job.finished
+    assert (progress['status'], progress['stage'], progress['progress']) == ('completed', 'done', 100)
+    assert progress['processing_result'] == {'inclusions_found': 3}
+
+
+def test_failed_job_reports_error():
+    """Exceptions in the worker mark the job failed with the error"""
+    manager = JobManager(max_workers=1, max_queued=0)
+
+    def work(job):
+        raise ValueError('corrupt PDF')
+
+    manager.submit('doc-2', 'broken.pdf', work)
+    manager._executor.shutdown(wait=True)
+    progress = manager.get('doc-2').to_dict()
+    assert (progress['status'], progress['stage'], progress['error']) == ('error', 'failed', 'corrupt PDF')
+
+
+def test_full_queue_rejects_new_jobs():
+    """Submissions beyond workers + queue size are refused until a slot frees"""
+    manager = JobManager(max_workers=1, max_queued=1)
+    release = threading.Event()
+
+    assert manager.submit('a', 'a.pdf', lambda job: release.wait(5))
+    assert manager.submit('b', 'b.pdf', lambda job: None)
+    assert manager.submit('c', 'c.pdf', lambda job: None) is None
+    assert manager.pending() == 2
+
+    release.set()
+    manager._executor.shutdown(wait=True)
+    assert manager.pending() == 0
+    assert manager.get('c') is None
+
+
+if __name__ == "__main__":
+    print("🧪 Ingestion Job Tests")
+    print("=" * 40)
+    test_job_reports_stages_and_pages()
+    print("✅ Job reports stages and pages")
+    test_failed_job_reports_error()
+    print("✅ Failed job reports error")
+    test_full_queue_rejects_new_jobs()
+    print("✅ Full queue rejects new jobs")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the one-pass keyword scanner
+"""
+
+import re
+
+from keyword_scanner import AHOCORASICK_AVAILABLE, KeywordScanner
+
+RULES = {
+    'fertility': ['IVF', 'in vitro', 'fertility', 'infertility'],
+    'medical_terms': ['scan', 'ct scan', 'lab', 'ivf'],
+}
+
+TEXT = "ivf and in vitro fertilisation are excluded; infertility cover is available. a ct scan or scan at the lab."
+
+
+def scanners():
+    yield KeywordScanner(RULES, use_automaton=False)
+    if AHOCORASICK_AVAILABLE:
+        yield KeywordScanner(RULES, use_automaton=True)
+
+
+def test_overlapping_keywords_with_positions():
+    """Every occurrence of every keyword, including keywords inside other keywords"""
+    for scanner in scanners():
+        hits = scanner.scan(TEXT)
+        assert hits['ivf'] == [0]
+        assert hits['fertility'] == [TEXT.index('infertility') + 2]
+        assert hits['scan'] == [TEXT.index('ct scan') + 3, TEXT.index('or scan') + 3]
+        assert hits['ct scan'] == [TEXT.index('ct scan')]
+        assert hits['lab'] == [TEXT.index('available') + 4, TEXT.index('the lab') + 4]
+        assert scanner.found(hits, 'fertility') == ['ivf', 'in vitro', 'fertility', 'infertility']
+        assert scanner.found(hits, 'medical_terms') == ['scan', 'ct scan', 'lab', 'ivf']
+        assert scanner.scan("no keywords here") == {}
+
+
+def test_matches_per_keyword_substring_search():
+    """The one scan finds what `keyword in text` and re.finditer(keyword) found one keyword at a time"""
+    text = (TEXT + " ") * 20
+    keywords = sorted({keyword.lower() for keywords in RULES.values() for keyword in keywords})
+    expected = {keyword: [m.start() for m in re.finditer(f'(?={re.escape(keyword)})', text)]
+                for keyword in keywords if keyword in text}
+    for scanner in scanners():
+        assert scanner.scan(text) == expected
+
+
+if __name__ == "__main__":
+    print("🧪 Keyword Scanner Tests")
+    print("=" * 40)
+    test_overlapping_keywords_with_positions()
+    print("✅ Overlapping keywords with positions")
+    test_matches_per_keyword_substring_search()
+    print("✅ Matches per-keyword substring search")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for sandboxed document parsing
+"""
+
+import os
+import time
+
+from ingestion_jobs import IngestionJob
+from memory_budget import MemoryTracker
+import parse_sandbox
+from parse_sandbox import ParseFailed, ParserSandbox, ParseTimeout, sandbox_workers
+from pdf_extraction import PageRecord
+
+
+def parse_ok(file_path, job=None):
+    if job:
+        job.memory = MemoryTracker()
+        for number in (1, 2):
+            job.page_done(PageRecord(number, 2, "page text", 0, 9, 'test'))
+        job.set_stage('parsing')
+    return {'file': file_path, 'pid': os.getpid()}
+
+
+def parse_hangs(file_path):
+    time.sleep(60)
+
+
+def parse_grows(file_path):
+    return len(bytearray(512 * 1024 * 1024))
+
+
+def parse_crashes(file_path):
+    os._exit(3)
+
+
+def test_results_progress_and_worker_recycling():
+    """Results and job progress come back from the worker; workers are replaced after max_jobs"""
+    sandbox = ParserSandbox(workers=1, timeout=30, max_jobs=2, enabled=True)
+    job = IngestionJob('job-1', 'policy.pdf')
+
+    first = sandbox.run(parse_ok, 'a.pdf', job)
+    second = sandbox.run(parse_ok, 'b.pdf')
+    third = sandbox.run(parse_ok, 'c.pdf')
+    sandbox.shutdown()
+
+    assert first['file'] == 'a.pdf' and first['pid'] != os.getpid()
+    assert first['pid'] == second['pid'] != third['pid']
+    assert (job.pages_done, job.page_count, job.stage) == (2, 2, 'parsing')
+    assert job.to_dict()['memory']['budget_mb'] == MemoryTracker().budget_mb
+    assert sandbox.stats()['workers_started'] == 2 and sandbox.stats()['workers_recycled'] == 1
+
+
+def test_hung_parse_is_stopped_and_quarantined():
+    """A parse past the time limit is killed, fails fast next time, and others still run"""
+    sandbox = ParserSandbox(workers=1, timeout=1, enabled=True)
+
+    started = time.monotonic()
+    try:
+        sandbox.run(parse_hangs, 'hang.pdf')
+        assert False, "expected ParseTimeout"
+    except ParseTimeout:
+        pass
+    assert time.monotonic() - started < 10
+
+    try:
+        sandbox.run(parse_hangs, 'hang.pdf')
+        assert False, "expected ParseFailed"
+    except ParseFailed as e:
+        assert 'longer than 1s' in str(e)
+
+    assert sandbox.run(parse_ok, 'next.pdf')['file'] == 'next.pdf'
+    sandbox.shutdown()
+    assert sandbox.stats()['timed_out'] == 1 and sandbox.stats()['quarantined'] == 1
+
+
+def test_quarantine_follows_content_and_expires():
+    """Quarantine is keyed by content, not path, and lifts after its time or on release"""
+    sandbox = ParserSandbox(workers=1, timeout=1, enabled=True, quarantine_seconds=2)
+    try:
+        sandbox.run(parse_hangs, 'upload.pdf', key='hash-1')
+        assert False, "expected ParseTimeout"
+    except ParseTimeout:
+        pass
+
+    # The same bytes under another name are refused; other bytes at the same path are not
+    try:
+        sandbox.run(parse_ok, 'copy.pdf', key='hash-1')
+        assert False, "expected ParseFailed"
+    except ParseFailed:
+        pass
+    assert sandbox.run(parse_ok, 'upload.pdf', key='hash-2')['file'] == 'upload.pdf'
+
+    time.sleep(2)
+    assert sandbox.stats()['quarantined'] == 0
+    assert sandbox.run(parse_ok, 'copy.pdf', key='hash-1')['file'] == 'copy.pdf'
+
+    try:
+        sandbox.run(parse_hangs, 'upload.pdf', key='hash-1')
+    except ParseTimeout:
+        pass
+    assert sandbox.release_quarantine() == 1
+    assert sandbox.run(parse_ok, 'upload.pdf', key='hash-1')['file'] == 'upload.pdf'
+    sandbox.shutdown()
+
+
+def test_pool_sized_to_the_threads_feeding_it():
+    """Without PARSE_WORKERS the pool matches the largest feeding thread pool"""
+    parse_workers = parse_sandbox.PARSE_WORKERS
+    try:
+        parse_sandbox.PARSE_WORKERS = 0
+        assert sandbox_workers(2, 8) == 8
+        assert sandbox_workers() == sandbox_workers(1) == 2
+        parse_sandbox.PARSE_WORKERS = 3
+        assert sandbox_workers(2, 8) == 3
+    finally:
+        parse_sandbox.PARSE_WORKERS = parse_workers
+
+
+def test_memory_limit_and_crashes_fail_the_document():
+    """Running out of the worker's address space or killing the worker fails only that document"""
+    sandbox = ParserSandbox(workers=1, timeout=30, memory_limit_mb=128, enabled=True)
+
+    for target, message in ((parse_grows, 'MemoryError'), (parse_crashes, 'exit code 3')):
+        try:
+            sandbox.run(target, target.__name__ + '.pdf')
+            assert False, "expected ParseFailed"
+        except ParseFailed as e:
+            assert message in str(e)
+
+    assert sandbox.run(parse_ok, 'ok.pdf')['file'] == 'ok.pdf'
+    sandbox.shutdown()
+    assert sandbox.stats()['failed'] == 2
+
+
+if __name__ == "__main__":
+    print("🧪 Parse Sandbox Tests")
+    print("=" * 40)
+    test_results_progress_and_worker_recycling()
+    print("✅ Results, progress and worker recycling")
+    test_hung_parse_is_stopped_and_quarantined()
+    print("✅ Hung parse stopped and quarantined")
+    test_quarantine_follows_content_and_expires()
+    print("✅ Quarantine follows content and expires")
+    test_pool_sized_to_the_threads_feeding_it()
+    print("✅ Pool sized to the threads feeding it")
+    test_memory_limit_and_crashes_fail_the_document()
+    print("✅ Memory limit and crashes fail the document")
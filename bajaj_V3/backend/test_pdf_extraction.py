@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for the PDF extraction engine
+"""
+
+import os
+import tempfile
+
+import PyPDF2
+
+import pdf_extraction
+from memory_budget import MemoryBudgetExceeded, MemoryTracker
+from pdf_extraction import extract_page_texts, extraction_stats, iter_pages, page_ranges, score_text
+
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'EDLHLGA23009V012223.pdf')
+
+
+def test_page_ranges_cover_every_page_in_order():
+    """Ranges are contiguous, ordered and balanced"""
+    ranges = page_ranges(10, 3)
+    assert ranges == [(0, 4), (4, 7), (7, 10)]
+    assert page_ranges(2, 8) == [(0, 1), (1, 2)]
+
+
+def test_parallel_extraction_matches_serial():
+    """Pages extracted by the pool come back in document order"""
+    for strategy in ('adaptive', 'pdfplumber'):
+        serial = extract_page_texts(SAMPLE_PDF, workers=1, strategy=strategy)
+        parallel = extract_page_texts(SAMPLE_PDF, workers=2, min_parallel_pages=1, strategy=strategy)
+        assert parallel == serial
+        assert any(text.strip() for text in serial)
+
+
+def test_page_offsets_index_the_joined_text():
+    """PageRecord offsets slice the document text built from the streamed pages"""
+    pages = list(iter_pages(SAMPLE_PDF, workers=1))
+    text_content = "".join(page.text + "\n" for page in pages)
+    for page in pages:
+        assert text_content[page.start:page.end] == page.text
+    assert [page.page_number for page in pages] == sorted(page.page_number for page in pages)
+
+
+def test_score_text_flags_unusable_output():
+    """Clean prose scores high; garbage, empty and one-char-per-line text score low"""
+    prose = "The policy covers hospitalisation expenses for the insured person.\n" * 20
+    assert score_text(prose, 595 * 842) > 0.9
+    assert score_text("") == 0.0
+    assert score_text("\ufffd(cid:12)(cid:40)\ufffd text") < 0.6
+    assert score_text("\n".join("Policywording"), 595 * 842) < 0.6
+    assert score_text("Two words", 595 * 842) < 0.6
+
+
+def test_adaptive_strategy_records_extractor_per_page():
+    """Plain pages come from PyPDF2; pages PyPDF2 cannot read fall back to pdfplumber"""
+    pages = list(iter_pages(SAMPLE_PDF, workers=1, strategy='adaptive'))
+    assert {page.extractor for page in pages} == {'PyPDF2'}
+    assert all(page.score >= 0.6 for page in pages)
+
+    writer = PyPDF2.PdfWriter()
+    writer.add_blank_page(width=595, height=842)
+    blank_pdf = os.path.join(tempfile.mkdtemp(), 'blank.pdf')
+    with open(blank_pdf, 'wb') as f:
+        writer.write(f)
+    assert extract_page_texts(blank_pdf, workers=1, strategy='adaptive') == [""]
+
+    stats = extraction_stats(pages)
+    assert stats['extractors'] == {'PyPDF2': len(pages)}
+    assert [entry['page'] for entry in stats['per_page']] == [page.page_number for page in pages]
+
+
+def test_parallel_fallback_keeps_each_worker_to_its_range():
+    """When PyPDF2 cannot open the file, each worker's pdfplumber fallback stops at its range's end"""
+    def broken_reader(*args, **kwargs):
+        raise PyPDF2.errors.PdfReadError("forced failure")
+
+    expected = extract_page_texts(SAMPLE_PDF, workers=1, strategy='pdfplumber')
+    pdf_reader = PyPDF2.PdfReader
+    PyPDF2.PdfReader = broken_reader
+    pdf_extraction._reset_executor()  # forked workers must see the broken reader
+    try:
+        pages = list(iter_pages(SAMPLE_PDF, workers=2, min_parallel_pages=1, strategy='adaptive'))
+    finally:
+        PyPDF2.PdfReader = pdf_reader
+        pdf_extraction._reset_executor()
+    assert [page.text for page in pages] == [text for text in expected if text]
+    assert [page.page_number for page in pages] == sorted({page.page_number for page in pages})
+    assert {page.extractor for page in pages} == {'pdfplumber'}
+
+
+def test_low_memory_mode_reopens_without_changing_text():
+    """Low-memory extraction drops the readers every few pages and yields the same text"""
+    reopen_pages = pdf_extraction.LOW_MEMORY_REOPEN_PAGES
+    pdf_extraction.LOW_MEMORY_REOPEN_PAGES = 4
+    try:
+        for strategy in ('adaptive', 'pdfplumber'):
+            expected = [page.text for page in iter_pages(SAMPLE_PDF, workers=1, strategy=strategy)]
+            memory = MemoryTracker(low_memory=True)
+            pages = list(iter_pages(SAMPLE_PDF, workers=1, strategy=strategy, memory=memory))
+            assert [page.text for page in pages] == expected
+            assert memory.releases >= len(expected) // 4 - 1
+            report = extraction_stats(pages, memory)['memory']
+            assert report['low_memory'] and report['peak_rss_mb'] > 0
+    finally:
+        pdf_extraction.LOW_MEMORY_REOPEN_PAGES = reopen_pages
+
+
+def test_memory_budget_stops_extraction():
+    """Past the budget extraction switches to low-memory mode, then fails if releasing does not help"""
+    memory = MemoryTracker(budget_mb=1)
+    memory.baseline_mb -= 100  # pretend this document already grew RSS by 100 MB
+    try:
+        list(iter_pages(SAMPLE_PDF, workers=1, memory=memory))
+    except MemoryBudgetExceeded:
+        pass
+    else:
+        raise AssertionError("extraction over budget was not stopped")
+    assert memory.low_memory and memory.releases == 1
+
+
+if __name__ == "__main__":
+    print("🧪 PDF Extraction Tests")
+    print("=" * 40)
+    test_page_ranges_cover_every_page_in_order()
+    print("✅ Page ranges cover every page")
+    test_parallel_extraction_matches_serial()
+    print("✅ Parallel extraction matches serial")
+    test_page_offsets_index_the_joined_text()
+    print("✅ Page offsets index the joined text")
+    test_score_text_flags_unusable_output()
+    print("✅ Text scoring flags unusable output")
+    test_adaptive_strategy_records_extractor_per_page()
+    print("✅ Adaptive strategy records extractor per page")
+    test_parallel_fallback_keeps_each_worker_to_its_range()
+    print("✅ Parallel fallback keeps each worker to its range")
+    test_low_memory_mode_reopens_without_changing_text()
+    print("✅ Low-memory mode yields the same text")
+    test_memory_budget_stops_extraction()
+    print("✅ Memory budget stops extraction")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the parsed-query LRU cache
+"""
+
+import threading
+
+from benchmark_query_parsing import PROCEDURE_MAPPINGS
+from query_cache import ParsedQuery, QueryCache, canonical_query
+from query_parser import QueryParser
+
+
+def test_canonical_form():
+    """Case, punctuation and spacing variants share a key; amounts keep their separators"""
+    assert canonical_query("46M knee surgery, Pune;  3-month policy!") == "46m knee surgery pune 3 month policy"
+    assert canonical_query("46m Knee Surgery Pune 3 month policy") == "46m knee surgery pune 3 month policy"
+    assert canonical_query("Claim of ₹5,00,000 (2.5%).") == "claim of ₹5,00,000 2.5%"
+
+
+def test_lru_hits_misses_and_eviction():
+    """Variants of one query hit; misses parse the query as asked; the least recently used entry is evicted past maxsize"""
+    parsed = []
+    cache = QueryCache(lambda query: parsed.append(query) or {'query': query}, maxsize=2)
+
+    first = cache("46M knee surgery, Pune")
+    assert cache("46m KNEE SURGERY pune") is first
+    cache("IVF treatment")
+    cache("46M knee surgery, Pune")
+    cache("heart surgery")
+    cache("IVF treatment")
+    assert parsed == ["46M knee surgery, Pune", "IVF treatment", "heart surgery", "IVF treatment"]
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 2, 'misses': 4, 'hit_rate': 0.333}
+
+    uncached = QueryCache(lambda query: {'query': query}, maxsize=0)
+    uncached("a")
+    uncached("a")
+    assert uncached.stats()['size'] == 0 and uncached.stats()['misses'] == 2
+
+
+def test_miss_parses_query_as_asked():
+    """A cache miss gives exactly what parsing the query directly gives"""
+    parser = QueryParser(PROCEDURE_MAPPINGS)
+    query = "46M in-vitro fertilization, 2-year policy"
+    assert canonical_query(query) != query.lower()
+    assert QueryCache(parser.parse)(query) == parser.parse(query)
+
+
+def test_results_read_only_and_shared_across_threads():
+    """Cached results cannot be modified in place; copy() gives a private dict"""
+    cache = QueryCache(QueryParser(PROCEDURE_MAPPINGS).parse)
+    result = cache("46M knee surgery Pune 3 month policy")
+    assert isinstance(result, ParsedQuery) and result['age'] == 46
+    for mutate in (lambda: result.__setitem__('age', 1), lambda: result.update(age=1),
+                   lambda: result.pop('age'), result.clear):
+        try:
+            mutate()
+            assert False, "parsed query was modified"
+        except TypeError:
+            pass
+    private = result.copy()
+    private['age'] = 1
+    assert result['age'] == 46
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache("46m knee surgery pune 3-month policy")))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(shared is result for shared in results)
+    assert cache.stats()['hits'] == 8 and cache.stats()['misses'] == 1
+
+
+if __name__ == "__main__":
+    print("🧪 Query Cache Tests")
+    print("=" * 40)
+    test_canonical_form()
+    print("✅ Canonical form")
+    test_lru_hits_misses_and_eviction()
+    print("✅ LRU hits, misses and eviction")
+    test_miss_parses_query_as_asked()
+    print("✅ Miss parses the query as asked")
+    test_results_read_only_and_shared_across_threads()
+    print("✅ Results read-only and shared across threads")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled query parser
+"""
+
+from benchmark_query_parsing import PROCEDURE_MAPPINGS, QUERIES, legacy_extract
+from query_parser import QueryParser
+
+PARSER = QueryParser(PROCEDURE_MAPPINGS)
+
+# Ways of stating a policy's duration, each of the legacy duration patterns among them
+DURATION_QUERIES = [
+    "I am 35 years, my policy is 2 years old, need angioplasty",
+    "coverage of 1 year, 40 years old",
+    "policy active since 2 years",
+    "active for 6 months, 30 years old",
+    "my insurance is active for 2 years and I am 45 years old",
+    "46 years, 3 months policy",
+]
+
+
+def test_demographics_and_duration():
+    """Age, gender and policy duration from the usual ways of writing them"""
+    assert PARSER.parse("46M knee surgery Pune 3 month policy") == {
+        'age': 46, 'gender': 'male', 'procedure': 'medical surgery', 'procedure_confidence': 60,
+        'policy_duration': '3 months', 'policy_duration_months': 3}
+    assert PARSER.parse("46m knee surgery Pune 3 month policy") == PARSER.parse("46M KNEE SURGERY PUNE 3 MONTH POLICY")
+
+    parsed = PARSER.parse("25F IVF treatment, policy active for 2 years")
+    assert (parsed['age'], parsed['gender'], parsed['policy_duration_months']) == (25, 'female', 24)
+    parsed = PARSER.parse("46-year-old male, knee surgery, 3-month-old insurance policy")
+    assert (parsed['age'], parsed['gender'], parsed['policy_duration']) == (46, 'male', '3 months')
+    assert PARSER.parse("age: 52, coverage 6 months")['age'] == 52
+    assert PARSER.parse("pregnant woman")['gender'] == 'female'
+
+    # A policy's duration is not an age, and an age is not a duration
+    assert 'age' not in PARSER.parse("I have a 2 year policy and need an operation")
+    assert 'policy_duration' not in PARSER.parse("Does this policy cover surgery for a 62 yr old?")
+    # ...but a "years old" after "policy" is the policy's age
+    parsed = PARSER.parse("I am 35 years, my policy is 2 years old, need angioplasty")
+    assert (parsed['age'], parsed['policy_duration']) == (35, '2 years')
+
+
+def test_procedures_and_history():
+    """The longest synonym present decides the procedure; generic words are the fallback"""
+    parsed = PARSER.parse("30 years old man with history of diabetes, bypass surgery")
+    assert (parsed['procedure'], parsed['procedure_confidence']) == ('cardiac', 28)
+    assert parsed['has_medical_history'] is True
+    assert PARSER.parse("in vitro fertilization at 35")['procedure'] == 'IVF'
+    assert PARSER.parse("emergency room visit")['procedure'] == 'emergency'
+    assert PARSER.parse("dental scan") == {'procedure': 'medical scan', 'procedure_confidence': 60}
+    assert PARSER.parse("what is covered?") == {}
+
+
+def test_agrees_with_legacy_parsing():
+    """Procedures, gender and history parse as the per-pattern regexes did"""
+    for query in QUERIES:
+        old, new = legacy_extract(query), PARSER.parse(query)
+        for key in ('gender', 'procedure', 'procedure_confidence', 'has_medical_history'):
+            assert old.get(key) == new.get(key), (query, key)
+
+
+def test_durations_agree_with_legacy_parsing():
+    """Every legacy duration pattern still picks the same period, "a 62 yr old" aside"""
+    for query in QUERIES + DURATION_QUERIES:
+        old, new = legacy_extract(query), PARSER.parse(query)
+        if 'policy_duration' in old and ' a 62 yr old' not in query:
+            assert old['policy_duration'] == new.get('policy_duration'), query
+
+
+if __name__ == "__main__":
+    print("🧪 Query Parser Tests")
+    print("=" * 40)
+    test_demographics_and_duration()
+    print("✅ Demographics and duration")
+    test_procedures_and_history()
+    print("✅ Procedures and history")
+    test_agrees_with_legacy_parsing()
+    print("✅ Agrees with legacy parsing")
+    test_durations_agree_with_legacy_parsing()
+    print("✅ Durations agree with legacy parsing")
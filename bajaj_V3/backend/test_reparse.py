@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for re-parsing stale documents from their cached text
+"""
+
+import os
+import tempfile
+
+from conftest import make_pages
+from document_store import DocumentStore
+from parse_sandbox import ParserSandbox
+from reparse import cached_page_bodies, load_cached_parse, page_layout, reparse_stale
+from schedule_tables import ScheduleTableReader
+
+PAGE_TEXTS = ["Room rent: covered up to 5000\nBenefit  Limit\nDental  INR 500", "Cosmetic surgery is excluded"]
+
+
+def parse_fields(page_bodies, schedules, version):
+    """Stand-in clause parser: records each page body it was given"""
+    pages = [page for page, _ in page_bodies]
+    bodies = [body.text for _, body in page_bodies]
+    return {'clauses': {'bodies': bodies, 'version': version, 'benefit_schedule': []},
+            'layout': page_layout(pages, schedules)}
+
+
+def parse_document(file_path):
+    schedules = ScheduleTableReader(file_path)
+    pages = make_pages(PAGE_TEXTS)
+    table_start = pages[0].start + PAGE_TEXTS[0].index('Benefit')
+    schedules.blanked = [[table_start, pages[0].end]]
+    bodies = [(page, page) for page in pages]
+    fields = parse_fields(bodies, schedules, 1)
+    fields['text_content'] = "".join(page.text + "\n" for page in pages)
+    return fields
+
+
+def reparse_document(cache_path):
+    page_bodies, schedules = load_cached_parse(cache_path)
+    return parse_fields(page_bodies, schedules, 2)
+
+
+def test_cached_layout_rebuilds_page_bodies():
+    """Pages come back with the same offsets and with schedule-table lines blanked"""
+    text = "".join(page + "\n" for page in PAGE_TEXTS)
+    pages = make_pages(PAGE_TEXTS)
+    table_start = PAGE_TEXTS[0].index('Benefit')
+    layout = {'pages': page_layout(pages, ScheduleTableReader(''))['pages'], 'blanked': [[table_start, pages[0].end]]}
+    pairs = cached_page_bodies(text, layout)
+
+    assert [page for page, _ in pairs] == pages
+    first_body = pairs[0][1]
+    assert first_body.text == PAGE_TEXTS[0][:table_start] + " " * (len(PAGE_TEXTS[0]) - table_start)
+    assert first_body.start == pages[0].start and len(first_body.text) == len(pages[0].text)
+    assert pairs[1][1] is pairs[1][0]
+
+
+def test_stale_documents_reparsed_from_cached_text():
+    """A parser version bump re-runs clause parsing over the stored text, in parallel, without parse_document"""
+    upload_folder = tempfile.mkdtemp()
+    old_store = DocumentStore(upload_folder, parser_name='test', parser_version=1)
+    old_store.get_or_parse('a' * 64, 'a.pdf', parse_document)
+    old_store.get_or_parse('b' * 64, 'b.pdf', parse_document)
+
+    store = DocumentStore(upload_folder, parser_name='test', parser_version=2)
+    stale = store.stale_report()
+    assert [item['content_hash'] for item in stale] == ['a' * 64, 'b' * 64]
+    assert all(item['parser_version'] == 1 and item['reparseable'] for item in stale)
+
+    report = reparse_stale(store, reparse_document, ParserSandbox(workers=2, enabled=False))
+    assert report['reparsed'] == 2 and report['failed'] == 0 and store.stale_report() == []
+
+    def no_extraction(file_path):
+        raise AssertionError("document was extracted again")
+
+    document, cache_hit = store.get_or_parse('a' * 64, 'a.pdf', no_extraction)
+    assert cache_hit and document['clauses']['version'] == 2
+    assert document['clauses']['bodies'][0].rstrip() == PAGE_TEXTS[0][:PAGE_TEXTS[0].index('Benefit')].rstrip()
+    assert document['text'].read() == "".join(page + "\n" for page in PAGE_TEXTS)
+    assert os.path.exists(document['text'].path) and '.v2.' in document['text'].path
+
+
+def test_older_cache_reparsed_on_first_load():
+    """get_or_parse re-parses an older version's cache instead of extracting, and extracts when it cannot"""
+    upload_folder = tempfile.mkdtemp()
+    DocumentStore(upload_folder, parser_name='test', parser_version=1).get_or_parse('c' * 64, 'c.pdf', parse_document)
+    store = DocumentStore(upload_folder, parser_name='test', parser_version=3)
+    extracted = []
+
+    def extract(file_path):
+        extracted.append(file_path)
+        return parse_document(file_path)
+
+    document, _ = store.get_or_parse('c' * 64, 'c.pdf', extract, reparse_document)
+    assert document['clauses']['version'] == 2 and extracted == []
+
+    def failing_reparse(cache_path):
+        raise ValueError("bad cache")
+
+    fresh = DocumentStore(upload_folder, parser_name='test', parser_version=4)
+    document, _ = fresh.get_or_parse('c' * 64, 'c.pdf', extract, failing_reparse)
+    assert extracted == ['c.pdf'] and document['clauses']['version'] == 1
+
+
+if __name__ == "__main__":
+    print("🧪 Re-parse Tests")
+    print("=" * 40)
+    test_cached_layout_rebuilds_page_bodies()
+    print("✅ Cached layout rebuilds page bodies")
+    test_stale_documents_reparsed_from_cached_text()
+    print("✅ Stale documents re-parsed from cached text")
+    test_older_cache_reparsed_on_first_load()
+    print("✅ Older cache re-parsed on first load")
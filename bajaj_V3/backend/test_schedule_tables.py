@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for benefit-schedule table extraction
+"""
+
+import os
+
+from pdf_extraction import iter_pages
+from schedule_tables import ScheduleTableReader, parse_amount, schedule_rows
+
+SCHEDULE_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'BAJHLIP23020V012223.pdf')
+
+
+def test_schedule_rows_from_table_cells():
+    """Header roles, spanned plan cells, NA plans, continuation rows and non-schedule tables"""
+    table = [
+        ['Benefit', 'Silver Plan', 'Gold Plan', 'Sub-limit', 'Waiting Period'],
+        ['Room rent\n(per day)', 'INR 5,000', 'INR 10,000', '1% of SI', None],
+        ['Cataract surgery', 'Up to Sum Insured', None, 'Rs. 40,000 per eye', '24 months'],
+        ['Out-patient benefits', None, None, None, None],
+        ['Air ambulance*', 'NA', 'USD 7,500', '', ''],
+        [None, '', '', 'USD 2,000 per trip', ''],
+    ]
+
+    rows = schedule_rows(table, 4)
+
+    assert [row.benefit for row in rows] == ['Room rent (per day)', 'Cataract surgery', 'Air ambulance']
+    assert rows[0].limit == 'INR 5,000' and rows[0].sub_limit == '1% of SI'
+    assert rows[0].plan_limits == ('INR 5,000', 'INR 10,000')
+    assert rows[1].plan_limits == () and rows[1].waiting_period == '24 months'
+    assert rows[2].limit == 'USD 7,500' and rows[2].sub_limit == 'USD 2,000 per trip'
+    assert {row.page_number for row in rows} == {4}
+
+    assert schedule_rows([['Period in Risk', 'Premium Refund'], ['Within 15 Days', 'Free look']], 1) == []
+    assert schedule_rows([['Cover for donor', 'INR 500,000'], ['Ambulance', 'INR 2,000']], 1) == []
+    assert parse_amount('INR\n3,750,000') == 3750000 and parse_amount('60 days') == 0
+
+
+def test_schedule_tables_leave_the_regex_text():
+    """Schedule rows reach the clause store and their lines are blanked in the text the regexes scan"""
+    reader = ScheduleTableReader(SCHEDULE_PDF)
+    pages = list(iter_pages(SCHEDULE_PDF, workers=1))
+    body = [reader.body_page(page) for page in pages]
+    reader.close()
+
+    assert reader.table_pages == [13, 19, 20]
+    rows = {(row.page_number, row.benefit): row for row in reader.rows}
+    assert rows[(13, 'Living Donor Medical Costs')].limit == 'INR 500,000'
+    assert rows[(19, 'Rehabilitation')].plan_limits == ('USD 750',) * 3 + ('USD 2,300',) * 3
+
+    text_content = "".join(page.text + "\n" for page in body)
+    assert len(text_content) == sum(len(page.text) + 1 for page in pages)
+    for page in body:
+        assert text_content[page.start:page.end] == page.text
+    assert 'Living Donor Medical Costs INR 500,000' not in text_content
+    assert 'TABLE OF BENEFITS FOR DOMESTIC COVER' in text_content
+
+    clauses = reader.apply({'inclusions': {}, 'coverage_amounts': {}, 'waiting_periods': {}})
+    assert clauses['inclusions']['living donor medical costs'] == 30000
+    assert clauses['coverage_amounts']['air ambulance'] == 'USD 7,500'
+    assert len(clauses['benefit_schedule']) == len(reader.rows)
+    assert reader.stats()['pages_checked'] == 3
+
+
+if __name__ == "__main__":
+    print("🧪 Schedule Table Tests")
+    print("=" * 40)
+    test_schedule_rows_from_table_cells()
+    print("✅ Schedule rows from table cells")
+    test_schedule_tables_leave_the_regex_text()
+    print("✅ Schedule tables leave the regex text")
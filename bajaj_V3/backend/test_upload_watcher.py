@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the upload folder watcher
+"""
+
+import os
+import tempfile
+import time
+
+from document_store import hash_file
+from upload_watcher import UploadWatcher
+
+
+def make_watcher(folder, events):
+    watcher = UploadWatcher(folder, lambda path, content_hash: events.append(('change', os.path.basename(path), content_hash)),
+                            lambda path: events.append(('delete', os.path.basename(path))),
+                            debounce=1.0, use_inotify=False)
+    watcher._snapshot = watcher._scan()
+    return watcher
+
+
+def settle(watcher):
+    """Poll, then run two debounce checks (first records size/mtime, second acts)"""
+    now = time.time()
+    watcher.poll()
+    watcher.process_pending(now + 2)
+    return watcher.process_pending(now + 4)
+
+
+def test_new_changed_and_deleted_files():
+    """Added, rewritten and removed PDFs each produce one callback"""
+    folder = tempfile.mkdtemp()
+    events = []
+    watcher = make_watcher(folder, events)
+    path = os.path.join(folder, 'policy.pdf')
+
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4 first')
+    with open(os.path.join(folder, '.upload.part'), 'wb') as f:
+        f.write(b'partial')
+    settle(watcher)
+    assert [event[:2] for event in events] == [('change', 'policy.pdf')]
+
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4 second version')
+    settle(watcher)
+    assert len(events) == 2 and events[1][2] != events[0][2]
+
+    os.remove(path)
+    settle(watcher)
+    assert events[-1] == ('delete', 'policy.pdf')
+
+
+def test_unchanged_content_is_not_reingested():
+    """Touching a file without changing its bytes does not call on_change"""
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'policy.pdf')
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4 same')
+    events = []
+    watcher = make_watcher(folder, events)
+    watcher.seed({path: hash_file(path)})
+
+    os.utime(path, ns=(1, 1))
+    settle(watcher)
+    assert events == []
+
+
+def test_file_still_being_written_waits():
+    """A file that keeps growing between checks is not ingested yet"""
+    folder = tempfile.mkdtemp()
+    events = []
+    watcher = make_watcher(folder, events)
+    path = os.path.join(folder, 'big.pdf')
+
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4 part one')
+    now = time.time()
+    watcher.poll()
+    watcher.process_pending(now + 2)
+    with open(path, 'ab') as f:
+        f.write(b' part two')
+    assert watcher.process_pending(now + 4) == 0
+    assert events == []
+    assert watcher.process_pending(now + 6) == 1
+    assert len(events) == 1
+
+
+if __name__ == "__main__":
+    print("🧪 Upload Watcher Tests")
+    print("=" * 40)
+    test_new_changed_and_deleted_files()
+    print("✅ New, changed and deleted files")
+    test_unchanged_content_is_not_reingested()
+    print("✅ Unchanged content not re-ingested")
+    test_file_still_being_written_waits()
+    print("✅ File being written waits")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the waiting-period table built at ingest
+"""
+
+from clause_records import recorder_for
+from main_intelligent_fuzzy import analyze_coverage_with_confusion_matrix
+from clause_segments import segment_text
+from pdf_extraction import PageRecord
+from waiting_periods import UNCATEGORISED, WaitingPeriodTable, category_of, scan_waiting_periods, to_months
+
+POLICY_TEXT = (
+    "SECTION D - EXCLUSIONS\n"
+    "1) Pre-Existing Diseases\n"
+    "a. Coverage after the expiry of 36 months for any Pre-Existing Disease is subject to declaration.\n"
+    "2) Out-patient Treatment\n"
+    "a. During the first year, 30 days waiting period would be applicable for all claims under out-patient.\n"
+    "b. A waiting period of 2 years applies to maternity benefits.\n"
+    "c. Maternity expenses have a 9 months waiting period.\n"
+)
+
+
+def parse_waiting_periods(text):
+    clauses = {'inclusions': {}, 'exclusions': [], 'waiting_periods': {}}
+    state = {'window_start': 0}
+    recorder = recorder_for(state)
+    for segment in segment_text(text):
+        if segment.kind == 'heading':
+            recorder.enter_heading(segment)
+        scan_waiting_periods(segment, clauses, recorder)
+    return clauses, recorder
+
+
+def test_months_and_categories():
+    """Stated periods become whole months, categorized by the clause that states them"""
+    assert to_months(30, 'days') == 1 and to_months(90, 'day') == 3 and to_months(2, 'Years') == 24
+    assert category_of("90 days waiting period for all claims under Physiotherapy Benefit") == 'physiotherapy'
+    assert category_of("24 months waiting", "SECTION D > Cataract") == 'cataract'
+    assert category_of("a waiting period applies") == UNCATEGORISED
+
+    clauses, _ = parse_waiting_periods(POLICY_TEXT)
+    assert clauses['waiting_period_months'] == {'pre-existing': 36, 'out-patient': 1, 'maternity': 24}
+    assert clauses['waiting_periods']['maternity'] == "2 years"
+
+
+def test_table_lookup_with_clause_reference():
+    """Lookups by procedure category return required months and the citing clause"""
+    clauses, recorder = parse_waiting_periods(POLICY_TEXT)
+    pages = [PageRecord(1, 1, POLICY_TEXT, 0, len(POLICY_TEXT), 'test')]
+    index = recorder.build(clauses, pages)
+    table = WaitingPeriodTable(clauses['waiting_period_months'], clauses['waiting_periods'], index)
+
+    maternity = table.lookup('Maternity')
+    assert maternity.months == 24 and maternity.period == "2 years"
+    assert maternity.clause_id.startswith('WP-1.') and maternity.citation['page'] == 1
+    assert index.get(maternity.clause_id).text == 'maternity'
+    assert table.required_months('medical out-patient') == 1
+    assert table.lookup('cardiac') is None and table.required_months('cardiac', 48) == 48
+
+    defaults = WaitingPeriodTable.from_periods({'IVF': '12 months', 'surgery': '2 years'})
+    assert defaults.required_months('ivf') == 12 and defaults.required_months('surgery') == 24
+    assert defaults.lookup('IVF').clause_id is None
+
+
+def test_uncategorised_periods_do_not_apply():
+    """A period whose clause names no category never rejects a procedure of unknown type"""
+    text = "SECTION C - BENEFITS\n1) A waiting period of 24 months applies to the listed benefits.\n"
+    clauses, _ = parse_waiting_periods(text)
+    assert clauses['waiting_period_months'] == {UNCATEGORISED: 24}
+    table = WaitingPeriodTable(clauses['waiting_period_months'], clauses['waiting_periods'])
+    assert table.lookup('general') is None and table.lookup(UNCATEGORISED) is None
+
+    clauses['inclusions'] = {'general': 50000}
+    entities = {'procedure_type': 'general', 'procedure': 'medical checkup', 'policy_duration_months': 6}
+    result = analyze_coverage_with_confusion_matrix(clauses, entities, 'medical checkup, policy 6 months',
+                                                    waiting_table=table)
+    assert result['decision'] == 'APPROVED'
+
+
+if __name__ == "__main__":
+    print("🧪 Waiting Period Table Tests")
+    print("=" * 40)
+    test_months_and_categories()
+    print("✅ Months and categories")
+    test_table_lookup_with_clause_reference()
+    print("✅ Table lookup with clause reference")
+    test_uncategorised_periods_do_not_apply()
+    print("✅ Uncategorised periods do not apply")
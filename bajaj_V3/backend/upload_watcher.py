@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+👀 UPLOAD FOLDER WATCHER
+✅ Picks up documents added, changed or removed by other processes
+✅ inotify events through watchdog, polling when it is not installed
+✅ Debounces partial writes before a file is ingested
+✅ Changes detected by content hash, not timestamps
+"""
+
+import os
+import threading
+import time
+
+from document_store import DOCUMENT_EXTENSIONS, hash_file
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+# Seconds between directory scans in polling mode (and pending-file checks in both modes)
+POLL_INTERVAL = float(os.environ.get('UPLOAD_WATCH_INTERVAL', 2.0))
+
+# A file is ingested once it has gone this long without events or size/mtime changes
+DEBOUNCE_SECONDS = float(os.environ.get('UPLOAD_WATCH_DEBOUNCE', 2.0))
+
+
+def _watched(path, extensions):
+    name = os.path.basename(path)
+    return not name.startswith('.') and os.path.splitext(name)[1].lower() in extensions
+
+
+def _file_state(path):
+    """(size, mtime_ns) of a file, or None when it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+if WATCHDOG_AVAILABLE:
+    class _EventHandler(FileSystemEventHandler):
+        """Forward watchdog events for watched files to the UploadWatcher"""
+
+        def __init__(self, watcher):
+            self.watcher = watcher
+
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            self.watcher.touch(event.src_path)
+            if getattr(event, 'dest_path', None):
+                self.watcher.touch(event.dest_path)
+
+
+class UploadWatcher:
+    """Call on_change(file_path, content_hash) / on_delete(file_path) as the folder changes
+
+    Events (inotify or polling) only mark a path as pending. A path is acted on
+    once it has been quiet for DEBOUNCE_SECONDS and its size and mtime held
+    still between two checks, so files still being written are not ingested.
+    on_change is called only when the content hash differs from the last one
+    seen for that path.
+    """
+
+    def __init__(self, folder, on_change, on_delete, interval=None, debounce=None,
+                 extensions=DOCUMENT_EXTENSIONS, use_inotify=True):
+        self.folder = folder
+        self.on_change = on_change
+        self.on_delete = on_delete
+        self.interval = POLL_INTERVAL if interval is None else interval
+        self.debounce = DEBOUNCE_SECONDS if debounce is None else debounce
+        self.extensions = extensions
+        self.mode = 'inotify' if use_inotify and WATCHDOG_AVAILABLE else 'polling'
+        self.hashes = {}
+        self._pending = {}
+        self._snapshot = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._observer = None
+
+    def seed(self, known_hashes):
+        """Record {file_path: content_hash} for files already loaded, so they are not re-ingested"""
+        self.hashes.update(known_hashes)
+
+    def touch(self, path):
+        """Mark a path as changed; it is checked again after the debounce delay"""
+        if _watched(path, self.extensions):
+            with self._lock:
+                self._pending[os.path.join(self.folder, os.path.basename(path))] = (time.time(), None)
+
+    def start(self):
+        self._snapshot = self._scan()
+        if self.mode == 'inotify':
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), self.folder, recursive=False)
+            self._observer.start()
+        self._thread = threading.Thread(target=self._run, name='upload-watcher', daemon=True)
+        self._thread.start()
+        print(f"👀 Watching {self.folder} for new documents ({self.mode})")
+
+    def stop(self):
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _scan(self):
+        snapshot = {}
+        for name in os.listdir(self.folder):
+            path = os.path.join(self.folder, name)
+            if _watched(path, self.extensions):
+                state = _file_state(path)
+                if state:
+                    snapshot[path] = state
+        return snapshot
+
+    def poll(self):
+        """Diff the folder against the last scan and mark changed paths pending"""
+        snapshot = self._scan()
+        for path in set(snapshot) | set(self._snapshot):
+            if snapshot.get(path) != self._snapshot.get(path):
+                self.touch(path)
+        self._snapshot = snapshot
+
+    def process_pending(self, now=None):
+        """Handle pending paths that have settled; returns the number handled"""
+        now = time.time() if now is None else now
+        with self._lock:
+            due = [(path, seen) for path, seen in self._pending.items() if now - seen[0] >= self.debounce]
+
+        handled = 0
+        for path, (touched, last_state) in due:
+            state = _file_state(path)
+            if state is not None and state != last_state:
+                # Still changing (or never checked): look again after another quiet period
+                with self._lock:
+                    if self._pending.get(path, (None,))[0] == touched:
+                        self._pending[path] = (now, state)
+                continue
+
+            with self._lock:
+                if self._pending.get(path, (None,))[0] != touched:
+                    continue
+                del self._pending[path]
+            handled += 1
+            try:
+                self._apply(path, state)
+            except Exception as e:
+                print(f"❌ Watcher failed to handle {os.path.basename(path)}: {e}")
+        return handled
+
+    def _apply(self, path, state):
+        if state is None:
+            self.hashes.pop(path, None)
+            print(f"🗑️ Removed from uploads: {os.path.basename(path)}")
+            self.on_delete(path)
+            return
+
+        content_hash = hash_file(path)
+        if self.hashes.get(path) == content_hash:
+            return
+        print(f"📥 New or changed in uploads: {os.path.basename(path)}")
+        self.on_change(path, content_hash)
+        self.hashes[path] = content_hash
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self.mode == 'polling':
+                self.poll()
+            self.process_pending()
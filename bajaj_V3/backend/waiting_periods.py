@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+⏳ WAITING PERIOD TABLE
+✅ Waiting periods parsed once at ingest into category -> required months
+✅ Category taken from the clause text ("30 days waiting period ... under Physiotherapy Benefit")
+✅ O(1) lookup by procedure category, with the clause the period came from
+✅ Query-time checks are integer comparisons of months
+"""
+
+import re
+from collections import namedtuple
+
+from keyword_scanner import KeywordScanner
+
+# Keywords naming the procedure category a waiting period applies to;
+# the earliest keyword in a clause decides, rule order breaks ties
+WAITING_CATEGORIES = {
+    'pre-existing': ['pre-existing', 'pre existing', 'pre - existing', 'pre -existing'],
+    'specified disease': ['specified disease', 'listed condition', 'specific disease', 'specific waiting'],
+    'fertility': ['infertility', 'fertility', 'ivf', 'in vitro', 'assisted reproduction'],
+    'maternity': ['maternity', 'pregnancy', 'childbirth', 'delivery', 'newborn'],
+    'cardiac': ['cardiac', 'heart', 'coronary'],
+    'cancer': ['cancer', 'oncology', 'tumour', 'tumor'],
+    'bariatric': ['bariatric', 'obesity'],
+    'cataract': ['cataract'],
+    'out-patient': ['out-patient', 'out -patient', 'out patient', 'outpatient', 'opd'],
+    'physiotherapy': ['physiotherapy'],
+    'dental': ['dental'],
+    'alternate treatment': ['alternate', 'complementary', 'ayush'],
+    'surgery': ['surgery', 'surgical', 'operation'],
+    'initial': ['any illness', 'first policy commencement', 'initial waiting', '30-day waiting', '30 day waiting'],
+}
+
+# Procedure categories used by the query parsers that share a waiting-period category
+CATEGORY_ALIASES = {'ivf': 'fertility', 'infertility': 'fertility', 'heart': 'cardiac', 'oncology': 'cancer',
+                    'pregnancy': 'maternity', 'outpatient': 'out-patient', 'opd': 'out-patient'}
+
+# Phrases stating a waiting period
+WAITING_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # "30 days waiting period", "30-day waiting period", "24 months of continuous coverage"
+    r'(\d+)[\s-]*(days?|months?|years?)\s+(?:of\s+)?(?:waiting|continuous\s+coverage)',
+    # "waiting period of 2 years", "waiting period: 90 days"
+    r'waiting\s+(?:period|time)s?\b[^.\d]{0,60}?(\d+)\s*(days?|months?|years?)',
+    # "excluded until the expiry of 24 months"
+    r'(?:expiry|completion)\s+of\s+(\d+)\s*(days?|months?|years?)',
+]]
+
+CATEGORY_SCANNER = KeywordScanner(WAITING_CATEGORIES)
+KEYWORD_CATEGORY = {keyword: category for category, keywords in CATEGORY_SCANNER.rules.items()
+                    for keyword in keywords}
+CATEGORY_ORDER = {category: position for position, category in enumerate(WAITING_CATEGORIES)}
+
+# Table key of periods whose clause names no category; no procedure maps to it
+UNCATEGORISED = 'uncategorised'
+
+# Day counts round up to whole months of this many days
+DAYS_PER_MONTH = 30
+
+# One looked-up waiting period: required months, display text and the clause it came from
+WaitingPeriod = namedtuple('WaitingPeriod', ['category', 'months', 'period', 'clause_id', 'citation'])
+
+
+def to_months(count, unit):
+    """Whole months in "<count> <unit>" (30 days -> 1, 2 years -> 24)"""
+    unit = unit.lower().rstrip('s')
+    if unit == 'year':
+        return count * 12
+    if unit == 'month':
+        return count
+    return -(-count // DAYS_PER_MONTH)
+
+
+def category_of(text, fallback=''):
+    """Waiting-period category a clause's text is about
+
+    The fallback text (the section path) is checked when the clause names no
+    category; UNCATEGORISED when neither does.
+    """
+    hits = CATEGORY_SCANNER.scan(text.lower())
+    if not hits:
+        return category_of(fallback) if fallback else UNCATEGORISED
+    keyword = min(hits, key=lambda keyword: (hits[keyword][0], CATEGORY_ORDER[KEYWORD_CATEGORY[keyword]]))
+    return KEYWORD_CATEGORY[keyword]
+
+
+def scan_waiting_periods(segment, clauses, recorder):
+    """Record the waiting periods stated in one segment
+
+    clauses['waiting_periods'] keeps the display form ("24 months") and
+    clauses['waiting_period_months'] the required months per category; when a
+    category is stated more than once the longer period applies.
+    """
+    months_table = clauses.setdefault('waiting_period_months', {})
+    for pattern in WAITING_PATTERNS:
+        for match in pattern.finditer(segment.text):
+            count, unit = int(match.group(1)), match.group(2).lower()
+            months = to_months(count, unit)
+            sentence_start = segment.text.rfind('.', 0, match.start()) + 1
+            sentence_end = segment.text.find('.', match.end())
+            sentence = segment.text[sentence_start:sentence_end if sentence_end >= 0 else None]
+            category = category_of(sentence, recorder.section_path())
+            if category in months_table and months_table[category] >= months:
+                continue
+            months_table[category] = months
+            clauses['waiting_periods'][category] = f"{count} {unit.rstrip('s')}{'s' if count != 1 else ''}"
+            recorder.note('waiting_period', category, segment.start + match.start(), segment.start + match.end())
+
+
+def category_key(procedure):
+    """Table key for a procedure category or name ("IVF" -> 'fertility')"""
+    key = (procedure or '').strip().lower()
+    return CATEGORY_ALIASES.get(key, key)
+
+
+class WaitingPeriodTable:
+    """Required waiting months per procedure category for one document
+
+    lookup() is a dict lookup: the procedure's category, then its last word
+    ("medical surgery" -> 'surgery'); uncategorised periods never match.
+    Entries carry the clause ID and
+    citation of the clause that stated them when a ClauseIndex is given.
+    """
+
+    def __init__(self, months, periods=None, clause_index=None):
+        self.entries = {}
+        for category, required in months.items():
+            clause = clause_index.find('waiting_period', category) if clause_index else None
+            period = (periods or {}).get(category) or f"{required} months"
+            self.entries[category] = WaitingPeriod(category, required, period,
+                                                   clause.clause_id if clause else None,
+                                                   clause.citation() if clause else None)
+
+    @classmethod
+    def from_periods(cls, periods):
+        """Table from {category: "24 months"} display strings, such as built-in policy rules"""
+        months = {}
+        for category, period in periods.items():
+            count, unit = period.split()[:2]
+            months[category_key(category)] = to_months(int(count), unit)
+        return cls(months, {category_key(category): period for category, period in periods.items()})
+
+    def lookup(self, procedure):
+        """WaitingPeriod for a procedure category, or None when the document states none"""
+        key = category_key(procedure)
+        if key == UNCATEGORISED:
+            return None
+        entry = self.entries.get(key)
+        if entry is None and ' ' in key:
+            entry = self.entries.get(category_key(key.rsplit(' ', 1)[1]))
+        return entry
+
+    def required_months(self, procedure, default=0):
+        entry = self.lookup(procedure)
+        return entry.months if entry else default
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def document_waiting_table(document, clause_index=None):
+    """The WaitingPeriodTable of a stored document, built from its clauses on first use"""
+    table = document.get('waiting_table')
+    if table is None:
+        clauses = document.get('clauses', {})
+        table = document['waiting_table'] = WaitingPeriodTable(clauses.get('waiting_period_months', {}),
+                                                               clauses.get('waiting_periods', {}), clause_index)
+    return table
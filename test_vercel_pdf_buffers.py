@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the serverless API's in-memory PDF buffers
+"""
+
+import io
+import os
+import sys
+import tempfile
+
+import pdfplumber
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'api'))
+
+import vercel_index
+from vercel_index import DocumentProcessor
+
+SAMPLE_PDF = os.path.join(ROOT, 'bajaj_V3', 'backend', 'uploads', 'EDLHLGA23009V012223.pdf')
+
+
+def temp_file_text(pdf_content):
+    """Text as extracted before buffering: through a temp file on disk"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
+        tmp_file.write(pdf_content)
+        tmp_path = tmp_file.name
+    try:
+        with pdfplumber.open(tmp_path) as pdf:
+            return "".join(page.extract_text() + "\n" for page in pdf.pages if page.extract_text())
+    finally:
+        os.unlink(tmp_path)
+
+
+def test_bytes_are_read_in_place():
+    """Bytes already in memory never spill, even past the threshold"""
+    with open(SAMPLE_PDF, 'rb') as f:
+        pdf_content = f.read()
+    threshold = vercel_index.PDF_SPILL_THRESHOLD
+    vercel_index.PDF_SPILL_THRESHOLD = 1024
+    try:
+        with DocumentProcessor.open_pdf_buffer(pdf_content) as buffer:
+            assert isinstance(buffer, io.BytesIO)
+        assert DocumentProcessor.extract_text_from_pdf(pdf_content) == temp_file_text(pdf_content)
+    finally:
+        vercel_index.PDF_SPILL_THRESHOLD = threshold
+
+
+class ReadOnlyStream(io.RawIOBase):
+    """A stream that can only be read forward, like a raw request body"""
+
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self.data.readinto(buffer)
+
+
+def test_seekable_streams_are_read_in_place():
+    """A seekable stream is rewound and shared by both extractors, and left open"""
+    with open(SAMPLE_PDF, 'rb') as f:
+        pdf_content = f.read()
+    stream = io.BytesIO(pdf_content)
+    stream.seek(100)
+    assert DocumentProcessor.open_pdf_buffer(stream) is stream and stream.tell() == 0
+    assert DocumentProcessor.extract_text_from_pdf(stream) == temp_file_text(pdf_content)
+    assert not stream.closed
+
+
+def test_streams_spill_past_the_threshold():
+    """Uploads and unseekable streams stay in memory when small and spill to disk when large"""
+    with open(SAMPLE_PDF, 'rb') as f:
+        pdf_content = f.read()
+    threshold = vercel_index.PDF_SPILL_THRESHOLD
+    try:
+        for limit, spilled in ((len(pdf_content) + 1, False), (1024, True)):
+            vercel_index.PDF_SPILL_THRESHOLD = limit
+            upload = {'file': (io.BytesIO(pdf_content), 'policy.pdf')}
+            with vercel_index.app.test_request_context('/upload', method='POST', data=upload):
+                stream = vercel_index.request.files['file'].stream
+                assert stream._rolled == spilled
+                assert DocumentProcessor.open_pdf_buffer(stream) is stream
+
+            with DocumentProcessor.open_pdf_buffer(ReadOnlyStream(pdf_content)) as buffer:
+                assert buffer._rolled == spilled
+                assert buffer.read() == pdf_content
+            text = DocumentProcessor.extract_text_from_pdf(ReadOnlyStream(pdf_content))
+            assert text == temp_file_text(pdf_content)
+    finally:
+        vercel_index.PDF_SPILL_THRESHOLD = threshold
+
+
+if __name__ == "__main__":
+    print("🧪 Serverless PDF Buffer Tests")
+    print("=" * 40)
+    test_bytes_are_read_in_place()
+    print("✅ Bytes are read in place")
+    test_seekable_streams_are_read_in_place()
+    print("✅ Seekable streams are read in place")
+    test_streams_spill_past_the_threshold()
+    print("✅ Streams spill past the threshold")